@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Callable, List, Tuple
+
+
+class DynamicBatcher:
+    """
+    Collects concurrent /predict requests into micro-batches.
+
+    Requests are queued until either `max_batch_size` of them are waiting
+    or `max_wait_us` microseconds have passed since the first one arrived.
+    The whole batch is then scored with ONE `predict_many` call (and one
+    simulated latency sleep), and every caller gets its own prediction back.
+
+    This is the same trade-off real inference servers make: a tiny bit of
+    extra latency per request in exchange for much higher throughput per pod.
+    """
+
+    def __init__(
+        self,
+        predict_many: Callable[[List[List[float]]], List[float]],
+        max_batch_size: int = 32,
+        max_wait_us: int = 2000,
+        latency_ms: int = 0,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.predict_many = predict_many
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.latency_ms = latency_ms
+
+        self.batches = 0
+        self.items = 0
+
+        self._queue: "Queue[Tuple[List[float], Future]]" = Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="dynamic-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, features: List[float]) -> Future:
+        future: Future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features: List[float]) -> float:
+        return self.submit(features).result()
+
+    def stats(self) -> dict:
+        avg = self.items / self.batches if self.batches else 0.0
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(avg, 2),
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def _collect(self) -> List[Tuple[List[float], Future]]:
+        # Block for the first request, then keep filling until the batch
+        # is full or the wait window (measured from the first item) closes.
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_us / 1_000_000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                predictions = self.predict_many([features for features, _ in batch])
+            except Exception as exc:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(exc)
+                else:
+                    # One bad row fails the whole call: score the rows on
+                    # their own so only the caller that sent it gets the error
+                    self._run_singly(batch)
+                continue
+
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000.0)
+
+            self.batches += 1
+            self.items += len(batch)
+            if len(predictions) != len(batch):
+                # zip() would silently leave the unmatched callers waiting forever
+                error = RuntimeError(
+                    f"predict_many returned {len(predictions)} predictions "
+                    f"for {len(batch)} inputs"
+                )
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                future.set_result(prediction)
+
+    def _run_singly(self, batch: List[Tuple[List[float], Future]]) -> None:
+        outcomes = []
+        for features, _ in batch:
+            try:
+                outcomes.append((self.predict_many([features])[0], None))
+            except Exception as exc:
+                outcomes.append((None, exc))
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), (prediction, exc) in zip(batch, outcomes):
+            if exc is None:
+                future.set_result(prediction)
+            else:
+                future.set_exception(exc)
@@ -6,11 +6,29 @@ class Settings:
     app_env: str
     default_latency_ms: int
     max_batch_size: int
+    predict_mode: str
+    model_weights_path: str
+    dynamic_batching: bool
+    dynamic_batch_max_size: int
+    dynamic_batch_max_wait_us: int
 
     def __init__(self) -> None:
         self.app_env = os.getenv("APP_ENV", "local")
         self.default_latency_ms = int(os.getenv("DEFAULT_LATENCY_MS", "100"))
         self.max_batch_size = int(os.getenv("MAX_BATCH_SIZE", "1024"))
+        self.model_weights_path = os.getenv("MODEL_WEIGHTS_PATH", "")
+        self.predict_mode = os.getenv("PREDICT_MODE", "sync").lower()
+        if self.predict_mode not in ("sync", "async"):
+            raise ValueError("PREDICT_MODE must be 'sync' or 'async'")
+        self.dynamic_batching = os.getenv("DYNAMIC_BATCHING", "false").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.dynamic_batch_max_size = int(os.getenv("DYNAMIC_BATCH_MAX_SIZE", "32"))
+        self.dynamic_batch_max_wait_us = int(
+            os.getenv("DYNAMIC_BATCH_MAX_WAIT_US", "2000")
+        )
 
 
 @lru_cache
@@ -1,53 +1,244 @@
+import asyncio
+import math
 import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List
 
-from fastapi import FastAPI, Depends, HTTPException
+import numpy as np
+from fastapi import Body, FastAPI, Depends, HTTPException
 from pydantic import BaseModel, conlist
 
+from batcher import DynamicBatcher
 from config import get_settings, Settings
 from model import SimpleLinearModel
+from red_metrics import install as install_red_metrics
+from registry import ModelRegistry
 
-app = FastAPI(title="AI Lab Paid - Configurable Inference API")
+registry = ModelRegistry(
+    SimpleLinearModel, weights_path=get_settings().model_weights_path or None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm load: pay the model build cost once, before traffic arrives
+    registry.load()
+    yield
+
+
+app = FastAPI(title="AI Lab Paid - Configurable Inference API", lifespan=lifespan)
+red_metrics = install_red_metrics(app)
 
 
 class Features(BaseModel):
-    features: conlist(float, min_items=1)
+    features: conlist(float, min_length=1)
+
+
+class BatchFeatures(BaseModel):
+    batch: conlist(conlist(float, min_length=1), min_length=1)
 
 
 def get_model() -> SimpleLinearModel:
-    # In a real-world case, this might load a model from disk or remote storage
-    return SimpleLinearModel()
+    # Each request holds a reference to the live model for its whole duration,
+    # so a hot-swap never pulls the model out from under an in-flight request.
+    return registry.get()
+
+
+@lru_cache
+def get_batcher() -> DynamicBatcher:
+    # One batcher (and one background thread) per process, started on first use
+    settings = get_settings()
+
+    def predict_rows(rows: List[List[float]]) -> List[float]:
+        model = registry.get()
+        return model.predict_many(model.as_matrix(rows)).tolist()
+
+    return DynamicBatcher(
+        predict_rows,
+        max_batch_size=settings.dynamic_batch_max_size,
+        max_wait_us=settings.dynamic_batch_max_wait_us,
+        latency_ms=settings.default_latency_ms,
+    )
+
+
+def check_feature_count(
+    features: List[float], settings: Settings, model: SimpleLinearModel
+) -> None:
+    if len(features) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many features; max_batch_size={settings.max_batch_size}",
+        )
+    # Caught here, before a dynamic batch: a row of the wrong width would fail
+    # the model call for every request batched with it
+    if model.weights is not None and len(features) != len(model.weights):
+        raise HTTPException(
+            status_code=400,
+            detail=f"expected {len(model.weights)} features, got {len(features)}",
+        )
+    # Python's JSON parser accepts NaN/Infinity; the prediction would not encode
+    if not all(math.isfinite(x) for x in features):
+        raise HTTPException(status_code=422, detail="features must be finite numbers")
 
 
 @app.get("/health")
 def health(settings: Settings = Depends(get_settings)):
-    return {"status": "ok", "env": settings.app_env}
+    return {"status": "ok", "env": settings.app_env, **registry.status()}
+
+
+@app.get("/ready")
+def ready():
+    if not registry.ready:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    return registry.status()
+
+
+@app.post("/model/reload")
+def reload_model():
+    # Re-read MODEL_WEIGHTS_PATH and atomically swap it in. On failure the
+    # current model keeps serving.
+    try:
+        model = registry.load()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"reload failed: {exc}")
+    return {"model_name": model.name, **registry.status()}
 
 
-@app.post("/predict")
 def predict(
     payload: Features,
     settings: Settings = Depends(get_settings),
     model: SimpleLinearModel = Depends(get_model),
 ):
     features: List[float] = payload.features
+    check_feature_count(features, settings, model)
 
-    if len(features) > settings.max_batch_size:
+    simulated_latency_ms = settings.default_latency_ms
+
+    if settings.dynamic_batching:
+        # The batcher scores the whole queue at once and pays the simulated
+        # latency once per batch instead of once per request.
+        try:
+            prediction = get_batcher().predict(features)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    else:
+        try:
+            prediction = model.predict(features)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        time.sleep(simulated_latency_ms / 1000.0)
+
+    return {
+        "prediction": prediction,
+        "model_name": model.name,
+        "latency_ms": simulated_latency_ms,
+    }
+
+
+async def predict_async(
+    payload: Features,
+    settings: Settings = Depends(get_settings),
+    model: SimpleLinearModel = Depends(get_model),
+):
+    # Same contract as predict(), but the simulated latency is an
+    # asyncio.sleep: the request waits on the event loop instead of pinning
+    # one of Starlette's threadpool workers (40 by default) for the duration.
+    features: List[float] = payload.features
+    check_feature_count(features, settings, model)
+
+    simulated_latency_ms = settings.default_latency_ms
+
+    if settings.dynamic_batching:
+        try:
+            prediction = await asyncio.wrap_future(get_batcher().submit(features))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    else:
+        try:
+            prediction = model.predict(features)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        await asyncio.sleep(simulated_latency_ms / 1000.0)
+
+    return {
+        "prediction": prediction,
+        "model_name": model.name,
+        "latency_ms": simulated_latency_ms,
+    }
+
+
+# PREDICT_MODE picks the handler behind /predict. Both variants also stay
+# reachable on explicit paths so they can be load-tested side by side.
+PREDICT_HANDLERS = {"sync": predict, "async": predict_async}
+app.post("/predict")(PREDICT_HANDLERS[get_settings().predict_mode])
+app.post("/predict/sync")(predict)
+app.post("/predict/async")(predict_async)
+
+
+@app.post("/predict/batch")
+def predict_batch(
+    payload: BatchFeatures,
+    settings: Settings = Depends(get_settings),
+    model: SimpleLinearModel = Depends(get_model),
+):
+    batch: List[List[float]] = payload.batch
+
+    if len(batch) > settings.max_batch_size:
         raise HTTPException(
             status_code=400,
-            detail=f"Too many features; max_batch_size={settings.max_batch_size}",
+            detail=f"Too many vectors; max_batch_size={settings.max_batch_size}",
         )
+    for features in batch:
+        check_feature_count(features, settings, model)
 
     try:
-        prediction = model.predict(features)
+        predictions = model.predict_many(model.as_matrix(batch)).tolist()
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
+    # Client-side batching: one simulated model call for the whole batch
     simulated_latency_ms = settings.default_latency_ms
     time.sleep(simulated_latency_ms / 1000.0)
 
     return {
-        "prediction": prediction,
+        "predictions": predictions,
+        "count": len(predictions),
+        "model_name": model.name,
+        "latency_ms": simulated_latency_ms,
+    }
+
+
+@app.post("/predict/raw")
+def predict_raw(
+    body: bytes = Body(..., media_type="application/octet-stream"),
+    rows: int = 1,
+    settings: Settings = Depends(get_settings),
+    model: SimpleLinearModel = Depends(get_model),
+):
+    # Body is packed little-endian floats (model dtype, float64 by default):
+    # the bytes are viewed as a (rows, features) matrix without JSON parsing.
+    try:
+        matrix = model.from_bytes(body, rows=rows)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if rows > settings.max_batch_size or matrix.shape[1] > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large; max_batch_size={settings.max_batch_size}",
+        )
+    if not np.isfinite(matrix).all():
+        raise HTTPException(status_code=422, detail="features must be finite numbers")
+
+    predictions = model.predict_many(matrix).tolist()
+
+    simulated_latency_ms = settings.default_latency_ms
+    time.sleep(simulated_latency_ms / 1000.0)
+
+    return {
+        "predictions": predictions,
+        "count": len(predictions),
         "model_name": model.name,
         "latency_ms": simulated_latency_ms,
     }
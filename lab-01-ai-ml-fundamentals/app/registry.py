@@ -0,0 +1,91 @@
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+def read_weights(path: str) -> Dict[str, Any]:
+    """
+    Load a weights file. Expected JSON shape:
+
+    {"version": "v2", "weights": [0.5, 1.0, 2.0], "bias": 0.1}
+
+    Only "weights" is required.
+    """
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(spec, dict) or not spec.get("weights"):
+        raise ValueError(f"{path}: expected an object with a non-empty 'weights' list")
+    weights = spec["weights"]
+    if not isinstance(weights, list) or not all(_is_number(w) for w in weights):
+        raise ValueError(f"{path}: 'weights' must be a list of finite numbers")
+    if not _is_number(spec.get("bias", 0.0)):
+        raise ValueError(f"{path}: 'bias' must be a finite number")
+    return spec
+
+
+def _is_number(value: Any) -> bool:
+    # bool is an int subclass, but `true` is not a weight
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the live model.
+
+    The model is built once (warm load at startup) and handed out by
+    reference. `swap()` replaces that reference under a lock: requests that
+    already hold the old model finish with it, new requests get the new one,
+    and nothing is dropped.
+    """
+
+    def __init__(self, factory: Callable[..., Any], weights_path: Optional[str] = None):
+        self.factory = factory
+        self.weights_path = weights_path
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    def load(self, weights_path: Optional[str] = None) -> Any:
+        """Build a model (from a weights file if configured) and make it live."""
+        path = weights_path or self.weights_path
+        if path:
+            spec = read_weights(path)
+            model = self.factory(weights=spec["weights"], bias=spec.get("bias", 0.0))
+            version = str(spec.get("version", Path(path).name))
+        else:
+            model = self.factory()
+            version = "builtin"
+
+        # Build outside the lock; only the reference swap is serialized
+        self.swap(model, version)
+        return model
+
+    def swap(self, model: Any, version: str) -> None:
+        with self._lock:
+            self._model = model
+            self.version = version
+            self.loaded_at = time.time()
+
+    def get(self) -> Any:
+        model = self._model
+        if model is None:
+            # Startup hook did not run (e.g. TestClient without a context manager)
+            model = self.load()
+        return model
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "model_ready": self.ready,
+            "model_version": self.version,
+        }
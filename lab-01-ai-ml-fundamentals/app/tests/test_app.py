@@ -1,6 +1,14 @@
+import json
+
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
+from batcher import DynamicBatcher
+from config import Settings, get_settings
+import main
 from main import app
 from model import SimpleLinearModel
+from registry import ModelRegistry
 
 client = TestClient(app)
 
@@ -27,3 +35,188 @@ def test_predict_with_features():
     assert data["prediction"] == 4.0
     assert data["model_name"] == "simple-linear-demo"
     assert isinstance(data["latency_ms"], int)
+
+
+def test_model_predict_many():
+    model = SimpleLinearModel()
+    matrix = model.as_matrix([[1.0, 2.0], [3.0]])
+    assert model.predict_many(matrix).tolist() == [3.0, 3.0]
+
+
+def test_model_weights_and_bias():
+    model = SimpleLinearModel(weights=[2.0, 0.5], bias=1.0)
+    assert model.predict([1.0, 4.0]) == 5.0
+    with pytest.raises(ValueError):
+        model.predict([1.0, 2.0, 3.0])
+
+
+def test_model_from_bytes_is_zero_copy():
+    model = SimpleLinearModel()
+    data = np.array([1.0, 2.0, 3.0, 4.0], dtype="<f8").tobytes()
+    matrix = model.from_bytes(data, rows=2)
+    assert matrix.shape == (2, 2)
+    assert not matrix.flags.owndata
+    assert model.predict_many(matrix).tolist() == [3.0, 7.0]
+
+
+def test_predict_batch_endpoint():
+    payload = {"batch": [[0.5, 1.5, 2.0], [1.0], [2.0, 2.0]]}
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["predictions"] == [4.0, 1.0, 4.0]
+    assert data["count"] == 3
+
+
+def test_dynamic_batcher_groups_concurrent_requests():
+    calls = []
+
+    def predict_many(batch):
+        calls.append(len(batch))
+        return [sum(features) for features in batch]
+
+    batcher = DynamicBatcher(predict_many, max_batch_size=8, max_wait_us=200_000)
+    futures = [batcher.submit([float(i), 1.0]) for i in range(8)]
+
+    assert [f.result(timeout=5) for f in futures] == [i + 1.0 for i in range(8)]
+    assert sum(calls) == 8
+    assert len(calls) < 8
+
+
+def test_dynamic_batcher_fails_only_the_bad_request():
+    def predict_many(batch):
+        if any(len(features) != 2 for features in batch):
+            raise ValueError("every vector must have 2 features")
+        return [sum(features) for features in batch]
+
+    batcher = DynamicBatcher(predict_many, max_batch_size=3, max_wait_us=200_000)
+    good = batcher.submit([1.0, 2.0])
+    bad = batcher.submit([1.0, 2.0, 3.0])
+    other = batcher.submit([4.0, 4.0])
+
+    assert good.result(timeout=5) == 3.0
+    assert other.result(timeout=5) == 8.0
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+
+def test_dynamic_batcher_fails_callers_it_has_no_prediction_for():
+    batcher = DynamicBatcher(lambda batch: [0.0], max_batch_size=2, max_wait_us=200_000)
+    futures = [batcher.submit([1.0]), batcher.submit([2.0])]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="1 predictions for 2 inputs"):
+            future.result(timeout=5)
+
+
+def test_predict_rejects_wrong_width_before_batching(tmp_path, monkeypatch):
+    weights = tmp_path / "weights.json"
+    weights.write_text(json.dumps({"version": "w2", "weights": [1.0, 1.0]}))
+    settings = Settings()
+    settings.dynamic_batching = True
+    app.dependency_overrides[get_settings] = lambda: settings
+    main.registry.load(str(weights))
+    try:
+        resp = client.post("/predict/sync", json={"features": [1.0, 2.0, 3.0]})
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "expected 2 features, got 3"
+        resp = client.post("/predict/sync", json={"features": [1.0, 2.0]})
+        assert resp.json()["prediction"] == 3.0
+    finally:
+        app.dependency_overrides.clear()
+        main.registry.load()
+
+
+def test_predict_with_dynamic_batching():
+    settings = Settings()
+    settings.dynamic_batching = True
+    app.dependency_overrides[get_settings] = lambda: settings
+    try:
+        response = client.post("/predict", json={"features": [1.0, 2.0]})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.json()["prediction"] == 3.0
+
+
+def test_predict_raw_endpoint():
+    body = np.array([0.5, 1.5, 2.0], dtype="<f8").tobytes()
+    response = client.post(
+        "/predict/raw",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.status_code == 200
+    assert response.json()["predictions"] == [4.0]
+
+
+@pytest.mark.parametrize("bad", [float("nan"), float("inf"), -float("inf")])
+def test_non_finite_features_are_rejected(bad):
+    body = np.array([0.5, bad, 2.0], dtype="<f8").tobytes()
+    response = client.post(
+        "/predict/raw",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.status_code == 422
+
+    # Python's JSON parser accepts NaN/Infinity literals; pydantic must not
+    literal = json.dumps([0.5, bad])
+    for path, body in (
+        ("/predict/sync", f'{{"features": {literal}}}'),
+        ("/predict/batch", f'{{"batch": [{literal}]}}'),
+    ):
+        response = client.post(path, content=body, headers={"Content-Type": "application/json"})
+        assert response.status_code == 422
+
+
+def test_predict_async_variant():
+    payload = {"features": [0.5, 1.5, 2.0]}
+    sync_data = client.post("/predict/sync", json=payload).json()
+    response = client.post("/predict/async", json=payload)
+    assert response.status_code == 200
+    assert response.json() == sync_data
+
+
+def test_registry_hot_swap_from_weights_file(tmp_path):
+    weights = tmp_path / "weights.json"
+    weights.write_text(json.dumps({"version": "v2", "weights": [2.0, 2.0], "bias": 1.0}))
+    registry = ModelRegistry(SimpleLinearModel)
+
+    old = registry.get()
+    assert registry.version == "builtin"
+
+    registry.load(str(weights))
+    assert registry.version == "v2"
+    assert registry.get().predict([1.0, 1.0]) == 5.0
+    # A request that grabbed the old model keeps a working reference
+    assert old.predict([1.0, 1.0]) == 2.0
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"weights": [1.0, 1.0], "bias": "0.5"},
+        {"weights": [1.0, "two"]},
+        {"weights": [1.0, True]},
+        {"weights": 3.0},
+    ],
+)
+def test_reload_rejects_non_numeric_weights(tmp_path, monkeypatch, spec):
+    weights = tmp_path / "weights.json"
+    weights.write_text(json.dumps(spec))
+    monkeypatch.setattr(main.registry, "weights_path", str(weights))
+    before = main.registry.get()
+
+    resp = client.post("/model/reload")
+    assert resp.status_code == 400
+    assert "must be" in resp.json()["detail"]
+    # The current model keeps serving
+    assert main.registry.get() is before
+
+
+def test_health_reports_model_readiness():
+    with TestClient(app) as warm_client:
+        data = warm_client.get("/health").json()
+        assert data["model_ready"] is True
+        assert data["model_version"] == "builtin"
+        assert warm_client.get("/ready").status_code == 200
@@ -0,0 +1,91 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from red_metrics import OTHER, UNMATCHED, REDMetrics, benchmark, install
+
+
+def _app(**kwargs):
+    app = FastAPI()
+    metrics = install(app, REDMetrics(**kwargs))
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="missing")
+        return {"id": item_id}
+
+    @app.post("/echo")
+    def echo(body: dict):
+        return body
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return app, metrics
+
+
+def _count(metrics, method, route, status):
+    return {k: s.count for k, s in metrics.snapshot()}.get((method, route, status), 0)
+
+
+def test_records_route_template_and_status():
+    app, metrics = _app()
+    client = TestClient(app, raise_server_exceptions=False)
+    for i in range(1, 4):
+        client.get(f"/items/{i}")
+    client.get("/items/0")
+    client.get("/boom")
+
+    assert _count(metrics, "GET", "/items/{item_id}", "200") == 3
+    assert _count(metrics, "GET", "/items/{item_id}", "404") == 1
+    assert _count(metrics, "GET", "/boom", "500") == 1
+    assert metrics.in_flight == 0
+
+
+def test_unmatched_paths_share_one_label():
+    app, metrics = _app()
+    client = TestClient(app)
+    for i in range(5):
+        client.get(f"/scan/{i}")
+    assert _count(metrics, "GET", UNMATCHED, "404") == 5
+
+
+def test_route_cardinality_is_capped():
+    app, metrics = _app(max_routes=1)
+    client = TestClient(app)
+    client.get("/items/1")
+    client.post("/echo", json={"a": 1})
+
+    assert _count(metrics, "POST", OTHER, "200") == 1
+    assert metrics.overflow == 1
+
+
+def test_body_sizes_and_prometheus_endpoint():
+    app, metrics = _app()
+    client = TestClient(app)
+    resp = client.post("/echo", json={"hello": "world"})
+
+    (series,) = [s for k, s in metrics.snapshot() if k[1] == "/echo"]
+    assert series.request_bytes == int(resp.request.headers["content-length"])
+    assert series.response_bytes == len(resp.content)
+
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/echo",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/echo",status="200",le="+Inf"} 1' in text
+    assert "http_requests_in_flight 0" in text
+    # Scrapes are not counted
+    assert 'route="/metrics"' not in text
+
+
+def test_custom_gauge_is_rendered():
+    metrics = REDMetrics()
+    metrics.add_gauge("queue_depth", "Items waiting.", lambda: 7)
+    assert "queue_depth 7" in metrics.render()
+
+
+def test_overhead_within_budget():
+    result = benchmark(iterations=20_000)
+    # Budget is 10 us per request (about 4 us measured); the margin absorbs
+    # slow or noisy CI machines while still catching a real regression
+    assert 0 < result["overhead_us"] < 10.0 * 2.5
@@ -7,12 +7,26 @@ class Settings:
         self.app_env = os.getenv("APP_ENV", "local")
         self.cpu_burn_ms = int(os.getenv("CPU_BURN_MS", "50"))
         self.max_batch_size = int(os.getenv("MAX_BATCH_SIZE", "1024"))
+        self.model_weights_path = os.getenv("MODEL_WEIGHTS_PATH", "")
+        # inline = burn CPU in the request thread, process = in a process pool
+        self.execution_mode = os.getenv("EXECUTION_MODE", "inline").lower()
+        if self.execution_mode not in ("inline", "process"):
+            raise ValueError("EXECUTION_MODE must be 'inline' or 'process'")
+        # 0 = one worker per core allowed by the cgroup CPU quota
+        self.process_pool_workers = int(os.getenv("PROCESS_POOL_WORKERS", "0"))
+        self.resource_sample_interval_s = float(
+            os.getenv("RESOURCE_SAMPLE_INTERVAL_S", "5")
+        )
 
     def to_dict(self) -> dict:
         return {
             "app_env": self.app_env,
             "cpu_burn_ms": self.cpu_burn_ms,
             "max_batch_size": self.max_batch_size,
+            "model_weights_path": self.model_weights_path,
+            "execution_mode": self.execution_mode,
+            "process_pool_workers": self.process_pool_workers,
+            "resource_sample_interval_s": self.resource_sample_interval_s,
         }
 
 
@@ -1,4 +1,19 @@
 import argparse
+import json
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+HOURS_PER_MONTH = 730
+
+# Share of peak traffic in each hour of the day (00:00 .. 23:00):
+# quiet at night, a morning ramp and an early-evening peak.
+DEFAULT_DIURNAL = (
+    0.15, 0.10, 0.08, 0.08, 0.10, 0.15, 0.25, 0.40,
+    0.60, 0.75, 0.85, 0.90, 0.90, 0.85, 0.80, 0.80,
+    0.85, 0.95, 1.00, 0.95, 0.80, 0.60, 0.40, 0.25,
+)
 
 
 def estimate_cost(node_hourly: float, nodes: int, hours: int) -> float:
@@ -14,6 +29,264 @@ def estimate_cost(node_hourly: float, nodes: int, hours: int) -> float:
     return node_hourly * nodes * hours
 
 
+@dataclass
+class Measurement:
+    """One load-test data point: a setup under test and how it performed."""
+
+    source: str
+    cpu_burn_ms: Optional[float]
+    batch_size: int
+    replicas: int
+    achieved_rps: float
+    p95_ms: float
+    error_rate: float
+
+    @property
+    def rps_per_replica(self) -> float:
+        return self.achieved_rps / self.replicas
+
+
+def _float_tag(tags: Dict[str, Any], key: str) -> Optional[float]:
+    value = tags.get(key)
+    return None if value in (None, "") else float(value)
+
+
+def load_measurements(paths: Iterable[str]) -> List[Measurement]:
+    """
+    Read load_generator.py --json-out files.
+
+    The setup comes from the summary's tags (`--tag replicas=2 --tag
+    cpu_burn_ms=5 --tag batch_size=8`); replicas and batch_size default to 1.
+    An open-loop ramp contributes one data point per stage.
+    """
+    points: List[Measurement] = []
+    for path in paths:
+        summary = json.loads(Path(path).read_text(encoding="utf-8"))["summary"]
+        tags = summary.get("tags") or {}
+        setup = {
+            "source": str(path),
+            "cpu_burn_ms": _float_tag(tags, "cpu_burn_ms"),
+            "batch_size": int(_float_tag(tags, "batch_size") or 1),
+            "replicas": int(_float_tag(tags, "replicas") or 1),
+        }
+        for result in summary.get("stages") or [summary]:
+            completed = result["completed"]
+            points.append(
+                Measurement(
+                    achieved_rps=result["achieved_rps"],
+                    p95_ms=result["p95_latency_ms"],
+                    error_rate=result["errors"] / completed if completed else 1.0,
+                    **setup,
+                )
+            )
+    return points
+
+
+def capacity_per_replica(
+    points: Iterable[Measurement], slo_p95_ms: float, max_error_rate: float = 0.01
+) -> Optional[float]:
+    """
+    Highest throughput one replica sustained while meeting the SLO, or None
+    when no measurement met it.
+    """
+    ok = [
+        p.rps_per_replica
+        for p in points
+        if p.p95_ms <= slo_p95_ms and p.error_rate <= max_error_rate
+    ]
+    return max(ok) if ok else None
+
+
+def parse_diurnal(text: str) -> List[float]:
+    """Parse 24 comma-separated shares of peak traffic, one per hour."""
+    curve = [float(v) for v in text.split(",") if v.strip()]
+    if len(curve) != 24:
+        raise ValueError(f"Diurnal curve needs 24 hourly values, got {len(curve)}")
+    if any(v < 0 for v in curve) or max(curve) <= 0:
+        raise ValueError("Diurnal curve values must be >= 0 with a positive peak")
+    return curve
+
+
+def plan_capacity(
+    rps_per_replica: float,
+    peak_rps: float,
+    node_hourly: float,
+    replicas_per_node: int = 2,
+    diurnal: Sequence[float] = DEFAULT_DIURNAL,
+    headroom: float = 0.2,
+    min_replicas: int = 1,
+) -> Dict[str, Any]:
+    """
+    Size the deployment for a traffic profile.
+
+    The curve is normalised so its highest hour equals `peak_rps`. Each hour
+    needs enough replicas to carry that hour's traffic plus `headroom`.
+    `static` keeps peak capacity running all month. `autoscaled` follows the
+    curve hour by hour, which is the lower bound an HPA can reach.
+    """
+    if rps_per_replica <= 0:
+        raise ValueError("rps_per_replica must be > 0")
+    top = max(diurnal)
+    hourly_rps = [peak_rps * share / top for share in diurnal]
+
+    def replicas_for(rps: float) -> int:
+        return max(min_replicas, math.ceil(rps * (1 + headroom) / rps_per_replica))
+
+    hourly_replicas = [replicas_for(rps) for rps in hourly_rps]
+    hourly_nodes = [math.ceil(r / replicas_per_node) for r in hourly_replicas]
+    replicas = max(hourly_replicas)
+    nodes = math.ceil(replicas / replicas_per_node)
+
+    days = HOURS_PER_MONTH / 24
+    monthly_predictions = sum(hourly_rps) * 3600 * days
+    static_cost = estimate_cost(node_hourly, nodes, HOURS_PER_MONTH)
+    autoscaled_cost = node_hourly * sum(hourly_nodes) * days
+
+    def per_million(cost: float) -> Optional[float]:
+        if not monthly_predictions:
+            return None
+        return round(cost / monthly_predictions * 1_000_000, 4)
+
+    return {
+        "rps_per_replica": round(rps_per_replica, 2),
+        "peak_rps": peak_rps,
+        "replicas": replicas,
+        "nodes": nodes,
+        "monthly_predictions": round(monthly_predictions),
+        "static": {
+            "monthly_cost": round(static_cost, 2),
+            "cost_per_million": per_million(static_cost),
+        },
+        "autoscaled": {
+            "monthly_cost": round(autoscaled_cost, 2),
+            "cost_per_million": per_million(autoscaled_cost),
+            "hourly_replicas": hourly_replicas,
+        },
+    }
+
+
+def tradeoff_curve(
+    points: Iterable[Measurement],
+    peak_rps: float,
+    node_hourly: float,
+    replicas_per_node: int = 2,
+    diurnal: Sequence[float] = DEFAULT_DIURNAL,
+    headroom: float = 0.2,
+    slo_p95_ms: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Cost vs latency for every measured operating point: if each replica ran
+    at that point's throughput, what p95 would users see and what would the
+    fleet cost. Sorted by (cpu_burn_ms, batch_size, p95).
+    """
+    rows = []
+    for p in points:
+        if p.achieved_rps <= 0:
+            continue
+        plan = plan_capacity(
+            p.rps_per_replica, peak_rps, node_hourly, replicas_per_node, diurnal, headroom
+        )
+        rows.append(
+            {
+                "cpu_burn_ms": p.cpu_burn_ms,
+                "batch_size": p.batch_size,
+                "rps_per_replica": plan["rps_per_replica"],
+                "p95_ms": p.p95_ms,
+                "error_rate": round(p.error_rate, 4),
+                "replicas": plan["replicas"],
+                "nodes": plan["nodes"],
+                "monthly_cost": plan["static"]["monthly_cost"],
+                "cost_per_million": plan["static"]["cost_per_million"],
+                "meets_slo": slo_p95_ms is None or p.p95_ms <= slo_p95_ms,
+            }
+        )
+    rows.sort(key=lambda r: (r["cpu_burn_ms"] or 0.0, r["batch_size"], r["p95_ms"]))
+    return rows
+
+
+def plan_from_results(
+    paths: Iterable[str],
+    slo_p95_ms: float,
+    peak_rps: float,
+    node_hourly: float,
+    replicas_per_node: int = 2,
+    diurnal: Sequence[float] = DEFAULT_DIURNAL,
+    headroom: float = 0.2,
+    max_error_rate: float = 0.01,
+) -> Dict[str, Any]:
+    """
+    Full planner: pick the cheapest setting (cpu_burn_ms, batch_size) that
+    meets the SLO and size it for the traffic profile.
+    """
+    points = load_measurements(paths)
+    groups: Dict[tuple, List[Measurement]] = {}
+    for p in points:
+        groups.setdefault((p.cpu_burn_ms, p.batch_size), []).append(p)
+
+    settings = []
+    for (cpu_burn_ms, batch_size), group in groups.items():
+        capacity = capacity_per_replica(group, slo_p95_ms, max_error_rate)
+        entry: Dict[str, Any] = {"cpu_burn_ms": cpu_burn_ms, "batch_size": batch_size}
+        if capacity is None:
+            entry["plan"] = None
+        else:
+            entry["plan"] = plan_capacity(
+                capacity, peak_rps, node_hourly, replicas_per_node, diurnal, headroom
+            )
+        settings.append(entry)
+
+    feasible = [s for s in settings if s["plan"] is not None]
+    best = min(
+        feasible,
+        key=lambda s: (s["plan"]["static"]["monthly_cost"], s["plan"]["replicas"]),
+        default=None,
+    )
+    return {
+        "slo_p95_ms": slo_p95_ms,
+        "peak_rps": peak_rps,
+        "node_hourly": node_hourly,
+        "replicas_per_node": replicas_per_node,
+        "headroom": headroom,
+        "recommended": best,
+        "settings": settings,
+        "tradeoff": tradeoff_curve(
+            points, peak_rps, node_hourly, replicas_per_node, diurnal, headroom, slo_p95_ms
+        ),
+        "measurements": [asdict(p) for p in points],
+    }
+
+
+def print_plan(result: Dict[str, Any]) -> None:
+    best = result["recommended"]
+    if best is None:
+        print(f"❌ No measured setting meets p95 <= {result['slo_p95_ms']} ms.")
+    else:
+        plan = best["plan"]
+        print(
+            f"Recommended: cpu_burn_ms={best['cpu_burn_ms']}, batch_size={best['batch_size']} "
+            f"-> {plan['replicas']} replicas on {plan['nodes']} nodes "
+            f"({plan['rps_per_replica']} rps/replica at p95 <= {result['slo_p95_ms']} ms)"
+        )
+        print(
+            f"  static:     ${plan['static']['monthly_cost']:.2f}/month, "
+            f"${plan['static']['cost_per_million']}/1M predictions"
+        )
+        print(
+            f"  autoscaled: ${plan['autoscaled']['monthly_cost']:.2f}/month, "
+            f"${plan['autoscaled']['cost_per_million']}/1M predictions"
+        )
+
+    print("\nCost vs latency:")
+    print("cpu_burn_ms  batch  rps/replica   p95_ms  replicas  $/month  $/1M  slo")
+    for row in result["tradeoff"]:
+        print(
+            f"{str(row['cpu_burn_ms']):>11}  {row['batch_size']:>5}  "
+            f"{row['rps_per_replica']:>11}  {row['p95_ms']:>7}  {row['replicas']:>8}  "
+            f"{row['monthly_cost']:>7}  {row['cost_per_million']}  "
+            f"{'ok' if row['meets_slo'] else 'miss'}"
+        )
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Simple cost estimator for Lab 2.1 cluster"
@@ -36,11 +309,66 @@ def parse_args() -> argparse.Namespace:
         default=20,
         help="Total hours per month (default: 20)",
     )
+
+    planner = parser.add_argument_group("capacity planner")
+    planner.add_argument(
+        "--plan",
+        nargs="+",
+        metavar="RESULT_JSON",
+        help="Load generator --json-out files; switches to planner mode",
+    )
+    planner.add_argument(
+        "--slo-p95-ms",
+        type=float,
+        default=200.0,
+        help="Latency SLO: p95 in ms (default: 200)",
+    )
+    planner.add_argument(
+        "--peak-rps",
+        type=float,
+        default=50.0,
+        help="Peak traffic in requests/second (default: 50)",
+    )
+    planner.add_argument(
+        "--diurnal",
+        help="24 comma-separated hourly shares of peak traffic (default: built-in curve)",
+    )
+    planner.add_argument(
+        "--replicas-per-node",
+        type=int,
+        default=2,
+        help="Pods that fit on one node (default: 2)",
+    )
+    planner.add_argument(
+        "--headroom",
+        type=float,
+        default=0.2,
+        help="Spare capacity on top of the traffic, as a fraction (default: 0.2)",
+    )
+    planner.add_argument(
+        "--json-out",
+        help="Write the full plan (including tradeoff rows) to this JSON file",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    if args.plan:
+        result = plan_from_results(
+            args.plan,
+            slo_p95_ms=args.slo_p95_ms,
+            peak_rps=args.peak_rps,
+            node_hourly=args.node_hourly,
+            replicas_per_node=args.replicas_per_node,
+            diurnal=parse_diurnal(args.diurnal) if args.diurnal else DEFAULT_DIURNAL,
+            headroom=args.headroom,
+        )
+        print_plan(result)
+        if args.json_out:
+            Path(args.json_out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        return
+
     cost = estimate_cost(args.node_hourly, args.nodes, args.hours)
     print(
         f"Estimated monthly cost: ${cost:.2f} "
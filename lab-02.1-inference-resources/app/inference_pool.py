@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+
+class InferencePool:
+    """
+    Runs CPU-bound work in worker processes instead of the request thread.
+
+    Each worker has its own interpreter (and its own GIL), so CPU-heavy
+    requests can use every core the container is allowed, and they no
+    longer stall other requests handled by the same uvicorn worker.
+    """
+
+    def __init__(self, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.completed = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return self.submit(fn, *args).result()
+
+    def _on_done(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self.completed
+        return {
+            "workers": self.workers,
+            "in_flight": in_flight,
+            # Tasks beyond one per worker are waiting for a free process
+            "queue_depth": max(0, in_flight - self.workers),
+            "completed": completed,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import multiprocessing as mp
+import time
+from collections import defaultdict
+from dataclasses import replace
+from queue import Empty
+from typing import Any, Dict, List, Optional
+
+from latency_histogram import LatencyHistogram
+from load_generator import Stage, Stats, closed_loop, export, open_loop, summarize
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """Split `total` into `parts` integers that differ by at most one."""
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _worker_main(
+    index: int,
+    queue: Any,
+    url: str,
+    mode: str,
+    params: Dict[str, Any],
+    timeout: float,
+    report_interval_s: float,
+) -> None:
+    """
+    Runs one load engine in its own process and streams results back:
+    an "interval" message per report tick and one "final" message at the end.
+    """
+    seq = 0
+
+    def sink(hist: LatencyHistogram, errors: int, elapsed: float) -> None:
+        nonlocal seq
+        queue.put(
+            {
+                "worker": index,
+                "kind": "interval",
+                "seq": seq,
+                "elapsed_s": elapsed,
+                "errors": errors,
+                "histogram": hist.to_dict(),
+            }
+        )
+        seq += 1
+
+    start = time.perf_counter()
+    if mode == "closed":
+        stats, _ = asyncio.run(
+            closed_loop(
+                url,
+                params["total_requests"],
+                params["concurrency"],
+                timeout,
+                report_interval_s,
+                sink=sink,
+            )
+        )
+    else:
+        stage_stats, _ = asyncio.run(
+            open_loop(
+                url,
+                params["stages"],
+                params["max_in_flight"],
+                timeout,
+                report_interval_s,
+                sink=sink,
+            )
+        )
+        stats = Stats.merged(stage_stats)
+
+    queue.put(
+        {
+            "worker": index,
+            "kind": "final",
+            "total_time_s": time.perf_counter() - start,
+            "errors": stats.errors,
+            "errors_by_status": stats.errors_by_status,
+            "dropped": stats.dropped,
+            "histogram": stats.histogram.to_dict(),
+        }
+    )
+
+
+def _worker_params(
+    mode: str,
+    processes: int,
+    total_requests: int,
+    concurrency: int,
+    stages: List[Stage],
+    max_in_flight: int,
+) -> List[Dict[str, Any]]:
+    if mode == "closed":
+        # A process with no requests would be spawned for nothing
+        processes = min(processes, total_requests)
+        requests = split_evenly(total_requests, processes)
+        workers = split_evenly(max(concurrency, processes), processes)
+        return [
+            {"total_requests": r, "concurrency": c} for r, c in zip(requests, workers)
+        ]
+    # Open loop: every process runs the same schedule at 1/N of the rate
+    share = [replace(stage, rps=stage.rps / processes) for stage in stages]
+    return [
+        {"stages": share, "max_in_flight": max(1, max_in_flight // processes)}
+        for _ in range(processes)
+    ]
+
+
+def _merge_intervals(
+    intervals: Dict[int, List[Dict[str, Any]]], report_interval_s: float
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for seq in sorted(intervals):
+        merged = LatencyHistogram()
+        errors = 0
+        elapsed = 0.0
+        for msg in intervals[seq]:
+            merged.merge(LatencyHistogram.from_dict(msg["histogram"]))
+            errors += msg["errors"]
+            elapsed = max(elapsed, msg["elapsed_s"])
+        latency = merged.summary()
+        rows.append(
+            {
+                "t_s": round((seq + 1) * report_interval_s, 3),
+                "workers": len(intervals[seq]),
+                "count": merged.total,
+                "errors": errors,
+                "rps": round((merged.total + errors) / elapsed, 2) if elapsed else 0.0,
+                **{k: v for k, v in latency.items() if k not in ("count", "min_ms")},
+            }
+        )
+    return rows
+
+
+def run_distributed(
+    url: str,
+    processes: int,
+    mode: str = "closed",
+    total_requests: int = 50,
+    concurrency: int = 5,
+    stages: Optional[List[Stage]] = None,
+    max_in_flight: int = 1000,
+    timeout: float = 5.0,
+    report_interval_s: float = 1.0,
+    json_out: Optional[str] = None,
+    csv_out: Optional[str] = None,
+    tags: Optional[Dict[str, str]] = None,
+) -> dict:
+    """
+    Coordinator: start `processes` worker processes, each running the
+    asyncio load engine on its share of the load, and merge what they
+    stream back into one report (aggregate rps, errors by status code and
+    latency percentiles over every request from every worker).
+    """
+    if processes < 1:
+        raise ValueError("processes must be >= 1")
+    if mode not in ("closed", "open"):
+        raise ValueError("mode must be 'closed' or 'open'")
+    if mode == "open" and not stages:
+        raise ValueError("open mode needs at least one stage")
+    if mode == "closed" and total_requests < 1:
+        raise ValueError("closed mode needs total_requests >= 1")
+
+    # spawn: never fork a parent that may already hold an event loop or threads
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    params = _worker_params(
+        mode, processes, total_requests, concurrency, stages or [], max_in_flight
+    )
+    processes = len(params)
+    workers = [
+        ctx.Process(
+            target=_worker_main,
+            args=(i, queue, url, mode, p, timeout, report_interval_s),
+            daemon=True,
+        )
+        for i, p in enumerate(params)
+    ]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+
+    finals: Dict[int, Dict[str, Any]] = {}
+    intervals: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    while len(finals) < processes:
+        try:
+            msg = queue.get(timeout=1.0)
+        except Empty:
+            dead = [
+                i for i, w in enumerate(workers)
+                if i not in finals and not w.is_alive() and w.exitcode != 0
+            ]
+            if dead:
+                for w in workers:
+                    w.terminate()
+                raise RuntimeError(f"load worker(s) {dead} exited without a result")
+            continue
+        if msg["kind"] == "final":
+            finals[msg["worker"]] = msg
+        else:
+            intervals[msg["seq"]].append(msg)
+
+    for w in workers:
+        w.join()
+    total_time = time.perf_counter() - start
+
+    total = Stats()
+    per_worker = []
+    for index in sorted(finals):
+        msg = finals[index]
+        part = Stats(
+            histogram=LatencyHistogram.from_dict(msg["histogram"]),
+            errors=msg["errors"],
+            errors_by_status=msg["errors_by_status"],
+            dropped=msg["dropped"],
+        )
+        total.merge(part)
+        completed = part.histogram.total + part.errors
+        per_worker.append(
+            {
+                "worker": index,
+                "completed": completed,
+                "achieved_rps": round(completed / msg["total_time_s"], 2),
+                "errors": part.errors,
+            }
+        )
+
+    summary = {
+        "url": url,
+        "mode": mode,
+        "processes": processes,
+        "tags": tags or {},
+        **summarize(total, total_time),
+        "dropped": total.dropped,
+        "per_worker": per_worker,
+    }
+    timeseries = _merge_intervals(intervals, report_interval_s)
+    print(json.dumps(summary))
+    export(summary, timeseries, json_out, csv_out)
+    return summary
@@ -1,78 +1,364 @@
 import argparse
+import asyncio
 import json
-import threading
+import sys
 import time
 from dataclasses import dataclass, field
-from statistics import mean
-from typing import List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-import requests
+import httpx
+
+from latency_histogram import LatencyHistogram, write_csv, write_json
+
+PAYLOAD = {"features": [0.5, 1.5, 2.0]}
 
 
 @dataclass
 class Stats:
-    latencies: List[float] = field(default_factory=list)
+    """Results of one worker (closed loop) or one stage (open loop)."""
+
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
     errors: int = 0
+    # HTTP status code (e.g. "503") or exception name (e.g. "ReadTimeout") -> count
+    errors_by_status: Dict[str, int] = field(default_factory=dict)
+    # Open loop only: arrivals skipped because max_in_flight was reached
+    dropped: int = 0
+    # Since the last time-series tick; drained by IntervalReporter
+    interval: LatencyHistogram = field(default_factory=LatencyHistogram)
+    interval_errors: int = 0
 
+    def record(self, latency_ms: float) -> None:
+        self.histogram.record(latency_ms)
+        self.interval.record(latency_ms)
 
-def worker(url: str, requests_per_worker: int, stats: Stats) -> None:
-    payload = {"features": [0.5, 1.5, 2.0]}
-    for _ in range(requests_per_worker):
-        t0 = time.time()
-        try:
-            resp = requests.post(url, json=payload, timeout=5)
-            latency_ms = (time.time() - t0) * 1000.0
-            if resp.status_code == 200:
-                stats.latencies.append(latency_ms)
-            else:
-                stats.errors += 1
-        except Exception:
-            stats.errors += 1
-
-
-def run_load(url: str, total_requests: int, concurrency: int) -> None:
-    stats = Stats()
-    threads: List[threading.Thread] = []
-
-    per_worker = max(1, total_requests // concurrency)
-    remaining = total_requests - (per_worker * concurrency)
-
-    start = time.time()
-    for i in range(concurrency):
-        # Distribute remaining requests to the first few workers
-        extra = 1 if i < remaining else 0
-        t = threading.Thread(
-            target=worker,
-            args=(url, per_worker + extra, stats),
-            daemon=True,
-        )
-        threads.append(t)
-        t.start()
+    def record_error(self, reason: str) -> None:
+        self.errors += 1
+        self.interval_errors += 1
+        self.errors_by_status[reason] = self.errors_by_status.get(reason, 0) + 1
+
+    def merge(self, other: "Stats") -> None:
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        self.dropped += other.dropped
+        for reason, count in other.errors_by_status.items():
+            self.errors_by_status[reason] = self.errors_by_status.get(reason, 0) + count
+
+    @classmethod
+    def merged(cls, parts: Iterable["Stats"]) -> "Stats":
+        total = cls()
+        for part in parts:
+            total.merge(part)
+        return total
+
+
+class IntervalReporter:
+    """
+    Every `interval_s`, folds the per-worker interval histograms into one
+    time-series row (count, rps, errors and the latency percentiles for that
+    interval only) and resets them.
+
+    If `sink` is set it also receives every interval's merged histogram,
+    error count and length, e.g. to stream snapshots to a coordinator.
+    """
+
+    def __init__(
+        self,
+        parts: List[Stats],
+        interval_s: float = 1.0,
+        echo: bool = False,
+        sink: Optional[Callable[[LatencyHistogram, int, float], None]] = None,
+    ) -> None:
+        self.parts = parts
+        self.interval_s = interval_s
+        self.echo = echo
+        self.sink = sink
+        self.rows: List[Dict[str, Any]] = []
+        self._start = self._last = time.perf_counter()
+
+    def tick(self) -> None:
+        merged = LatencyHistogram()
+        errors = 0
+        for part in self.parts:
+            merged.merge(part.interval)
+            errors += part.interval_errors
+            part.interval.reset()
+            part.interval_errors = 0
 
-    for t in threads:
-        t.join()
-    total_time = time.time() - start
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        if elapsed <= 0:
+            return
+        if self.sink is not None:
+            self.sink(merged, errors, elapsed)
+        latency = merged.summary()
+        row = {
+            "t_s": round(now - self._start, 3),
+            "count": merged.total,
+            "errors": errors,
+            "rps": round((merged.total + errors) / elapsed, 2),
+            **{k: v for k, v in latency.items() if k not in ("count", "min_ms")},
+        }
+        self.rows.append(row)
+        if self.echo:
+            print(json.dumps(row), file=sys.stderr)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            self.tick()
+
+
+async def _with_reporter(reporter: IntervalReporter, work) -> None:
+    task = asyncio.create_task(reporter.run())
+    try:
+        await work
+    finally:
+        task.cancel()
+        reporter.tick()  # flush the last partial interval
+
+
+@dataclass
+class Stage:
+    rps: float
+    duration_s: float
+
+
+def parse_ramp(spec: str) -> List[Stage]:
+    """
+    Parse a ramp schedule such as "10:30,50:60,100:30", i.e. 10 rps for 30s,
+    then 50 rps for 60s, then 100 rps for 30s.
+    """
+    stages: List[Stage] = []
+    for part in spec.split(","):
+        rps, _, duration = part.strip().partition(":")
+        if not duration:
+            raise ValueError(f"bad ramp stage '{part}', expected <rps>:<seconds>")
+        stage = Stage(rps=float(rps), duration_s=float(duration))
+        if stage.rps <= 0 or stage.duration_s <= 0:
+            raise ValueError(f"bad ramp stage '{part}', values must be positive")
+        stages.append(stage)
+    return stages
+
+
+def make_client(concurrency: int, timeout: float) -> httpx.AsyncClient:
+    # One pooled client for the whole run: keep-alive connections are reused
+    # instead of paying a TCP handshake per request.
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
 
-    if stats.latencies:
-        avg_latency = mean(stats.latencies)
-        p95 = sorted(stats.latencies)[int(0.95 * len(stats.latencies)) - 1]
+
+async def send_one(
+    client: httpx.AsyncClient, url: str, stats: Stats, started: float
+) -> None:
+    try:
+        resp = await client.post(url, json=PAYLOAD)
+    except httpx.HTTPError as exc:
+        stats.record_error(type(exc).__name__)
+        return
+    latency_ms = (time.perf_counter() - started) * 1000.0
+    if resp.status_code == 200:
+        stats.record(latency_ms)
     else:
-        avg_latency = 0.0
-        p95 = 0.0
+        stats.record_error(str(resp.status_code))
+
+
+async def closed_loop(
+    url: str,
+    total_requests: int,
+    concurrency: int,
+    timeout: float = 5.0,
+    report_interval_s: float = 1.0,
+    echo: bool = False,
+    sink: Optional[Callable[[LatencyHistogram, int, float], None]] = None,
+) -> Tuple[Stats, List[Dict[str, Any]]]:
+    """
+    `concurrency` workers, each sending its next request only after the
+    previous one finished. Simple, but a slow server slows the load down too.
+    """
+    # More workers than requests would give each spare worker a phantom request
+    concurrency = max(1, min(concurrency, total_requests))
+    per_worker, remaining = divmod(total_requests, concurrency)
+
+    async def worker(count: int, stats: Stats) -> None:
+        for _ in range(count):
+            await send_one(client, url, stats, time.perf_counter())
+
+    worker_stats = [Stats() for _ in range(concurrency)]
+    reporter = IntervalReporter(worker_stats, report_interval_s, echo, sink)
+    async with make_client(concurrency, timeout) as client:
+        await _with_reporter(
+            reporter,
+            asyncio.gather(
+                *(
+                    # Distribute remaining requests to the first few workers
+                    worker(per_worker + (1 if i < remaining else 0), stats)
+                    for i, stats in enumerate(worker_stats)
+                )
+            ),
+        )
+    return Stats.merged(worker_stats), reporter.rows
+
+
+async def open_loop(
+    url: str,
+    stages: List[Stage],
+    max_in_flight: int = 1000,
+    timeout: float = 5.0,
+    report_interval_s: float = 1.0,
+    echo: bool = False,
+    sink: Optional[Callable[[LatencyHistogram, int, float], None]] = None,
+) -> Tuple[List[Stats], List[Dict[str, Any]]]:
+    """
+    Constant arrival rate: request i of a stage is due at
+    stage_start + i / rps whether or not earlier requests have finished.
+
+    Latency is measured from the *scheduled* send time, so time a request
+    spends waiting behind a slow server is counted instead of hidden
+    (coordinated omission).
+    """
+    in_flight: set = set()
+    stage_stats: List[Stats] = []
+    reporter = IntervalReporter(stage_stats, report_interval_s, echo, sink)
+
+    async def schedule() -> None:
+        stage_start = time.perf_counter()
+        for stage in stages:
+            stats = Stats()
+            stage_stats.append(stats)
+            interval = 1.0 / stage.rps
+            for i in range(int(stage.rps * stage.duration_s)):
+                due = stage_start + i * interval
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(in_flight) >= max_in_flight:
+                    stats.dropped += 1
+                    continue
+                task = asyncio.create_task(send_one(client, url, stats, due))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            stage_start += stage.duration_s
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async with make_client(max_in_flight, timeout) as client:
+        await _with_reporter(reporter, schedule())
+    return stage_stats, reporter.rows
+
+
+def summarize(stats: Stats, total_time: float) -> dict:
+    latency = stats.histogram.summary()
+    completed = stats.histogram.total + stats.errors
+    return {
+        "total_time_sec": round(total_time, 3),
+        "completed": completed,
+        "achieved_rps": round(completed / total_time, 2) if total_time > 0 else 0.0,
+        "avg_latency_ms": round(latency["mean_ms"], 2),
+        "p95_latency_ms": round(latency["p95_ms"], 2),
+        "errors": stats.errors,
+        "errors_by_status": dict(sorted(stats.errors_by_status.items())),
+        "latency": latency,
+    }
+
+
+def export(
+    summary: dict,
+    timeseries: List[Dict[str, Any]],
+    json_out: Optional[str] = None,
+    csv_out: Optional[str] = None,
+) -> None:
+    if json_out:
+        write_json(json_out, summary, timeseries)
+    if csv_out:
+        write_csv(csv_out, timeseries)
+
+
+def run_load(
+    url: str,
+    total_requests: int,
+    concurrency: int,
+    timeout: float = 5.0,
+    report_interval_s: float = 1.0,
+    json_out: Optional[str] = None,
+    csv_out: Optional[str] = None,
+    echo: bool = False,
+    tags: Optional[Dict[str, str]] = None,
+) -> dict:
+    start = time.perf_counter()
+    stats, timeseries = asyncio.run(
+        closed_loop(url, total_requests, concurrency, timeout, report_interval_s, echo)
+    )
+    total_time = time.perf_counter() - start
 
     summary = {
         "url": url,
+        "mode": "closed",
         "total_requests": total_requests,
         "concurrency": concurrency,
-        "total_time_sec": round(total_time, 3),
-        "avg_latency_ms": round(avg_latency, 2),
-        "p95_latency_ms": round(p95, 2),
-        "errors": stats.errors,
+        "tags": tags or {},
+        **summarize(stats, total_time),
+    }
+    print(json.dumps(summary))
+    export(summary, timeseries, json_out, csv_out)
+    return summary
+
+
+def run_open_loop(
+    url: str,
+    stages: List[Stage],
+    max_in_flight: int = 1000,
+    timeout: float = 5.0,
+    report_interval_s: float = 1.0,
+    json_out: Optional[str] = None,
+    csv_out: Optional[str] = None,
+    echo: bool = False,
+    tags: Optional[Dict[str, str]] = None,
+) -> dict:
+    start = time.perf_counter()
+    stage_stats, timeseries = asyncio.run(
+        open_loop(url, stages, max_in_flight, timeout, report_interval_s, echo)
+    )
+    total_time = time.perf_counter() - start
+
+    total = Stats.merged(stage_stats)
+    summary = {
+        "url": url,
+        "mode": "open",
+        "max_in_flight": max_in_flight,
+        "tags": tags or {},
+        **summarize(total, total_time),
+        "dropped": total.dropped,
+        "stages": [
+            {
+                "target_rps": stage.rps,
+                "duration_s": stage.duration_s,
+                **summarize(stats, stage.duration_s),
+                "dropped": stats.dropped,
+            }
+            for stage, stats in zip(stages, stage_stats)
+        ],
     }
     print(json.dumps(summary))
+    export(summary, timeseries, json_out, csv_out)
+    return summary
 
 
-def parse_args() -> argparse.Namespace:
+def parse_tags(items: List[str]) -> Dict[str, str]:
+    """Parse repeated --tag KEY=VALUE options into a dict."""
+    tags = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Invalid tag {item!r}, expected KEY=VALUE")
+        tags[key.strip()] = value.strip()
+    return tags
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Concurrent load generator for Lab 2.1 PAID API"
     )
@@ -85,20 +371,113 @@ def parse_args() -> argparse.Namespace:
         "--requests",
         type=int,
         default=50,
-        help="Total number of requests (default: 50)",
+        help="Closed loop: total number of requests (default: 50)",
     )
     parser.add_argument(
         "--concurrency",
         type=int,
         default=5,
-        help="Number of concurrent workers (default: 5)",
+        help="Closed loop: number of concurrent workers (default: 5)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        help="Open loop: constant arrival rate in requests/second",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        help="Open loop: seconds to run at --rps (default: 30)",
+    )
+    parser.add_argument(
+        "--ramp",
+        help="Open loop: ramp schedule '<rps>:<seconds>,...' (e.g. 10:30,50:60)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1000,
+        help="Open loop: cap on outstanding requests; extra arrivals are dropped",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="Per-request timeout in seconds (default: 5)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Split the load across N worker processes and merge their results",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Record the setup under test in the summary (e.g. --tag replicas=2 "
+        "--tag cpu_burn_ms=5); read by cost_estimator.py --plan",
+    )
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=1.0,
+        help="Seconds per time-series row; rows are echoed to stderr (default: 1)",
+    )
+    parser.add_argument(
+        "--json-out",
+        help="Write summary + per-interval time series as JSON to this file",
+    )
+    parser.add_argument(
+        "--csv-out",
+        help="Write the per-interval time series as CSV to this file",
+    )
+    return parser.parse_args(argv)
 
 
 def main() -> None:
     args = parse_args()
-    run_load(args.url, args.requests, args.concurrency)
+    tags = parse_tags(args.tag)
+    if args.ramp:
+        stages = parse_ramp(args.ramp)
+    elif args.rps:
+        stages = [Stage(rps=args.rps, duration_s=args.duration)]
+    else:
+        stages = []
+
+    if args.processes > 1:
+        from load_coordinator import run_distributed
+
+        run_distributed(
+            args.url,
+            args.processes,
+            mode="open" if stages else "closed",
+            total_requests=args.requests,
+            concurrency=args.concurrency,
+            stages=stages,
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout,
+            report_interval_s=args.report_interval,
+            json_out=args.json_out,
+            csv_out=args.csv_out,
+            tags=tags,
+        )
+        return
+
+    output = {
+        "timeout": args.timeout,
+        "report_interval_s": args.report_interval,
+        "json_out": args.json_out,
+        "csv_out": args.csv_out,
+        "echo": True,
+        "tags": tags,
+    }
+    if stages:
+        run_open_loop(args.url, stages, args.max_in_flight, **output)
+    else:
+        run_load(args.url, args.requests, args.concurrency, **output)
 
 
 if __name__ == "__main__":
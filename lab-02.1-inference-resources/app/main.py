@@ -1,17 +1,45 @@
+import math
 import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List
 
-from fastapi import Depends, FastAPI, HTTPException
+import numpy as np
+from fastapi import Body, Depends, FastAPI, HTTPException
 from pydantic import BaseModel, conlist
 
 from config import get_settings, Settings
+from inference_pool import InferencePool
 from model import ResourceAwareModel
+from red_metrics import install as install_red_metrics
+from registry import ModelRegistry
+from resources import ResourceSampler, effective_cpu_count
 
-app = FastAPI(title="Lab 2.1 Paid - Resource-Aware Inference API")
+registry = ModelRegistry(
+    ResourceAwareModel, weights_path=get_settings().model_weights_path or None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm load the model (and the worker processes) before the pod reports ready
+    registry.load()
+    get_sampler()
+    process_mode = get_settings().execution_mode == "process"
+    if process_mode:
+        get_pool()
+    yield
+    get_sampler().stop()
+    if process_mode:
+        get_pool().shutdown()
+
+
+app = FastAPI(title="Lab 2.1 Paid - Resource-Aware Inference API", lifespan=lifespan)
+red_metrics = install_red_metrics(app)
 
 
 class Features(BaseModel):
-    features: conlist(float, min_items=1)
+    features: conlist(float, min_length=1)
 
 
 def cpu_burn(milliseconds: int) -> None:
@@ -21,17 +49,81 @@ def cpu_burn(milliseconds: int) -> None:
         x += 1.0  # noqa: F841
 
 
+@lru_cache
+def get_pool() -> InferencePool:
+    # 0 = size the pool from the container's CPU quota, not the node's cores
+    workers = get_settings().process_pool_workers or effective_cpu_count()
+    return InferencePool(workers)
+
+
+if get_settings().execution_mode == "process":
+    red_metrics.add_gauge(
+        "inference_pool_queue_depth",
+        "cpu_burn tasks waiting for a free worker process.",
+        lambda: get_pool().stats()["queue_depth"],
+    )
+
+
+@lru_cache
+def get_sampler() -> ResourceSampler:
+    return ResourceSampler(interval_s=get_settings().resource_sample_interval_s)
+
+
+def run_cpu_work(settings: Settings) -> None:
+    get_sampler().record_request()
+    if settings.execution_mode == "process":
+        # The request thread just waits (GIL released) while a worker
+        # process burns the CPU time.
+        get_pool().run(cpu_burn, settings.cpu_burn_ms)
+    else:
+        cpu_burn(settings.cpu_burn_ms)
+
+
 def get_model() -> ResourceAwareModel:
-    return ResourceAwareModel()
+    # Shared, pre-built model; in-flight requests keep their reference
+    # across a hot-swap.
+    return registry.get()
 
 
 @app.get("/health")
 def health(settings: Settings = Depends(get_settings)):
-    return {
+    body = {
         "status": "ok",
         "env": settings.app_env,
         "cpu_burn_ms": settings.cpu_burn_ms,
+        "execution_mode": settings.execution_mode,
+        **registry.status(),
     }
+    if settings.execution_mode == "process":
+        body["pool"] = get_pool().stats()
+    return body
+
+
+@app.get("/resources")
+def resource_report(settings: Settings = Depends(get_settings)):
+    # Real cgroup numbers next to the configured per-request cost, so
+    # requests/limits can be tuned from measured throttling.
+    return {
+        "cpu_burn_ms": settings.cpu_burn_ms,
+        "execution_mode": settings.execution_mode,
+        **get_sampler().report(),
+    }
+
+
+@app.get("/ready")
+def ready():
+    if not registry.ready:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    return registry.status()
+
+
+@app.post("/model/reload")
+def reload_model():
+    try:
+        model = registry.load()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"reload failed: {exc}")
+    return {"model_name": model.name, **registry.status()}
 
 
 @app.post("/predict")
@@ -46,16 +138,53 @@ def predict(
             status_code=400,
             detail=f"Too many features; max_batch_size={settings.max_batch_size}",
         )
+    # Python's JSON parser accepts NaN/Infinity; the prediction would not encode
+    if not all(math.isfinite(x) for x in features):
+        raise HTTPException(status_code=422, detail="features must be finite numbers")
 
     try:
         prediction = model.predict(features)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
-    cpu_burn(settings.cpu_burn_ms)
+    run_cpu_work(settings)
 
     return {
         "prediction": prediction,
         "model_name": model.name,
         "cpu_burn_ms": settings.cpu_burn_ms,
     }
+
+
+@app.post("/predict/raw")
+def predict_raw(
+    body: bytes = Body(..., media_type="application/octet-stream"),
+    rows: int = 1,
+    settings: Settings = Depends(get_settings),
+    model: ResourceAwareModel = Depends(get_model),
+):
+    # Packed little-endian float64 values, viewed as a (rows, features) matrix
+    # without JSON parsing or per-value Python floats.
+    try:
+        matrix = model.from_bytes(body, rows=rows)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if rows > settings.max_batch_size or matrix.shape[1] > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large; max_batch_size={settings.max_batch_size}",
+        )
+
+    if not np.isfinite(matrix).all():
+        raise HTTPException(status_code=422, detail="features must be finite numbers")
+
+    predictions = model.predict_many(matrix).tolist()
+
+    run_cpu_work(settings)
+
+    return {
+        "predictions": predictions,
+        "model_name": model.name,
+        "cpu_burn_ms": settings.cpu_burn_ms,
+    }
@@ -0,0 +1,264 @@
+import math
+import os
+import resource
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+PROC_STATUS = Path("/proc/self/status")
+
+# cgroup v1 mounts the CPU controller under one of these names
+V1_CPU_DIRS = ("cpu,cpuacct", "cpu")
+V1_CPUACCT_DIRS = ("cpu,cpuacct", "cpuacct")
+
+# cgroup v1 reports "no memory limit" as a huge page-aligned number
+V1_UNLIMITED = 1 << 60
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path: Path) -> Optional[int]:
+    value = _read(path)
+    if value is None or value == "max":
+        return None
+    return int(value)
+
+
+def _read_kv(path: Path) -> Dict[str, int]:
+    """Parse flat "key value" files such as cpu.stat."""
+    text = _read(path)
+    if not text:
+        return {}
+    out: Dict[str, int] = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().lstrip("-").isdigit():
+            out[key] = int(value)
+    return out
+
+
+def cgroup_version(root: Path = CGROUP_ROOT) -> Optional[int]:
+    if (root / "cgroup.controllers").exists():
+        return 2
+    if any((root / d).is_dir() for d in V1_CPU_DIRS):
+        return 1
+    return None
+
+
+def cpu_quota_cores(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPU limit of this container in cores (e.g. 0.5 for `limits.cpu: 500m`),
+    or None when there is no limit.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read(root / "cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota == "max":
+            return None
+        return int(quota) / int(period or 100000)
+
+    # cgroup v1: quota of -1 means unlimited
+    for d in V1_CPU_DIRS:
+        quota = _read(root / d / "cpu.cfs_quota_us")
+        period = _read(root / d / "cpu.cfs_period_us")
+        if quota is not None and period is not None:
+            if int(quota) <= 0:
+                return None
+            return int(quota) / int(period)
+    return None
+
+
+def effective_cpu_count(root: Path = CGROUP_ROOT) -> int:
+    """
+    Cores this process can really use: the smaller of the CPU affinity mask
+    and the (rounded up) cgroup quota. os.cpu_count() alone reports the
+    node's cores, which oversizes pools inside a limited container.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+
+    quota = cpu_quota_cores(root)
+    if quota is not None:
+        available = min(available, math.ceil(quota))
+    return max(1, available)
+
+
+def cpu_stat(root: Path = CGROUP_ROOT) -> Dict[str, Optional[int]]:
+    """
+    Cumulative CPU usage and CFS throttling counters for the container.
+
+    throttled_usec is the total time the container was runnable but had
+    used up its quota for the current period.
+    """
+    if cgroup_version(root) == 2:
+        stat = _read_kv(root / "cpu.stat")
+        return {
+            "usage_usec": stat.get("usage_usec"),
+            "nr_periods": stat.get("nr_periods"),
+            "nr_throttled": stat.get("nr_throttled"),
+            "throttled_usec": stat.get("throttled_usec"),
+        }
+
+    stat: Dict[str, int] = {}
+    for d in V1_CPU_DIRS:
+        stat = _read_kv(root / d / "cpu.stat")
+        if stat:
+            break
+    usage_ns = None
+    for d in V1_CPUACCT_DIRS:
+        usage_ns = _read_int(root / d / "cpuacct.usage")
+        if usage_ns is not None:
+            break
+    throttled_ns = stat.get("throttled_time")
+    return {
+        "usage_usec": None if usage_ns is None else usage_ns // 1000,
+        "nr_periods": stat.get("nr_periods"),
+        "nr_throttled": stat.get("nr_throttled"),
+        "throttled_usec": None if throttled_ns is None else throttled_ns // 1000,
+    }
+
+
+def memory_stat(root: Path = CGROUP_ROOT) -> Dict[str, Optional[int]]:
+    if cgroup_version(root) == 2:
+        return {
+            "usage_bytes": _read_int(root / "memory.current"),
+            "limit_bytes": _read_int(root / "memory.max"),
+        }
+    limit = _read_int(root / "memory" / "memory.limit_in_bytes")
+    return {
+        "usage_bytes": _read_int(root / "memory" / "memory.usage_in_bytes"),
+        "limit_bytes": None if limit is None or limit >= V1_UNLIMITED else limit,
+    }
+
+
+def process_rss_bytes(status_path: Path = PROC_STATUS) -> int:
+    """Current resident set size of this process (peak RSS off Linux)."""
+    for line in (_read(status_path) or "").splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_cpu_usec() -> int:
+    """CPU time of this process and its reaped children, for hosts without cgroups."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    seconds = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    return int(seconds * 1_000_000)
+
+
+def read_snapshot(root: Path = CGROUP_ROOT) -> Dict[str, Any]:
+    cpu = cpu_stat(root)
+    if cpu["usage_usec"] is None:
+        cpu["usage_usec"] = process_cpu_usec()
+    return {
+        "timestamp": time.time(),
+        "cpu": cpu,
+        "memory": {**memory_stat(root), "rss_bytes": process_rss_bytes()},
+    }
+
+
+def _delta(new: Optional[int], old: Optional[int]) -> Optional[int]:
+    if new is None or old is None:
+        return None
+    return new - old
+
+
+class ResourceSampler:
+    """
+    Background thread that samples cgroup counters every `interval_s`.
+
+    Counters such as usage_usec and nr_throttled only ever grow, so the
+    interesting numbers are the rates between two samples: cores in use,
+    share of CFS periods that were throttled, and CPU time spent per request.
+    """
+
+    def __init__(self, interval_s: float = 5.0, root: Path = CGROUP_ROOT) -> None:
+        self.interval_s = interval_s
+        self.root = root
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._previous: Optional[Dict[str, Any]] = None
+        self._latest: Dict[str, Any] = read_snapshot(root)
+        self._latest["requests"] = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="resource-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def sample(self) -> None:
+        snapshot = read_snapshot(self.root)
+        with self._lock:
+            snapshot["requests"] = self.requests
+            self._previous, self._latest = self._latest, snapshot
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def rates(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            old, new = self._previous, self._latest
+        if old is None:
+            return {}
+
+        elapsed = new["timestamp"] - old["timestamp"]
+        usage = _delta(new["cpu"]["usage_usec"], old["cpu"]["usage_usec"])
+        periods = _delta(new["cpu"]["nr_periods"], old["cpu"]["nr_periods"])
+        throttled = _delta(new["cpu"]["nr_throttled"], old["cpu"]["nr_throttled"])
+        throttled_usec = _delta(
+            new["cpu"]["throttled_usec"], old["cpu"]["throttled_usec"]
+        )
+        requests = new["requests"] - old["requests"]
+
+        rates: Dict[str, Optional[float]] = {
+            "window_s": round(elapsed, 3),
+            "cpu_cores_used": None,
+            "throttled_period_ratio": None,
+            "throttled_ms_per_s": None,
+            "requests_per_s": None,
+            "cpu_ms_per_request": None,
+        }
+        if elapsed <= 0:
+            return rates
+
+        rates["requests_per_s"] = round(requests / elapsed, 2)
+        if usage is not None:
+            rates["cpu_cores_used"] = round(usage / 1_000_000 / elapsed, 3)
+            if requests:
+                rates["cpu_ms_per_request"] = round(usage / 1000 / requests, 2)
+        if throttled is not None and periods:
+            rates["throttled_period_ratio"] = round(throttled / periods, 4)
+        if throttled_usec is not None:
+            rates["throttled_ms_per_s"] = round(throttled_usec / 1000 / elapsed, 2)
+        return rates
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            latest = dict(self._latest)
+        return {
+            "cgroup_version": cgroup_version(self.root),
+            "cpu_quota_cores": cpu_quota_cores(self.root),
+            "effective_cpus": effective_cpu_count(self.root),
+            "sample_interval_s": self.interval_s,
+            "current": latest,
+            "rates": self.rates(),
+        }
@@ -1,6 +1,10 @@
+import json
+
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
-from main import app
-from config import get_settings
+from main import app, get_pool, registry
+from config import Settings, get_settings
 from model import ResourceAwareModel
 
 client = TestClient(app)
@@ -23,6 +27,12 @@ def test_model_predict():
     assert result == 6.0
 
 
+def test_model_predict_many_with_weights():
+    model = ResourceAwareModel(weights=[1.0, -1.0], bias=0.5)
+    matrix = np.array([[3.0, 1.0], [1.0, 1.0]])
+    assert model.predict_many(matrix).tolist() == [2.5, 0.5]
+
+
 def test_predict_endpoint():
     settings = get_settings()
     payload = {"features": [0.5, 1.5, 2.0]}
@@ -32,3 +42,91 @@ def test_predict_endpoint():
     assert data["prediction"] == 4.0
     assert data["model_name"] == "simple-linear-resource-aware"
     assert data["cpu_burn_ms"] == settings.cpu_burn_ms
+
+
+def test_predict_raw_endpoint():
+    body = np.array([1.0, 2.0, 3.0, 4.0], dtype="<f8").tobytes()
+    resp = client.post(
+        "/predict/raw?rows=2",
+        content=body,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["predictions"] == [3.0, 7.0]
+
+
+def test_non_finite_features_are_rejected():
+    body = np.array([1.0, float("nan")], dtype="<f8").tobytes()
+    resp = client.post(
+        "/predict/raw", content=body, headers={"Content-Type": "application/octet-stream"}
+    )
+    assert resp.status_code == 422
+
+    resp = client.post(
+        "/predict", content='{"features": [1.0, Infinity]}',
+        headers={"Content-Type": "application/json"},
+    )
+    assert resp.status_code == 422
+
+
+def test_reload_swaps_model_version(tmp_path, monkeypatch):
+    weights = tmp_path / "weights.json"
+    weights.write_text(json.dumps({"version": "v7", "weights": [1.0, 1.0, 1.0]}))
+    monkeypatch.setattr(registry, "weights_path", str(weights))
+    try:
+        resp = client.post("/model/reload")
+        assert resp.status_code == 200
+        assert resp.json()["model_version"] == "v7"
+        assert client.get("/health").json()["model_version"] == "v7"
+    finally:
+        monkeypatch.undo()
+        registry.load()
+
+
+def test_reload_rejects_non_numeric_bias(tmp_path, monkeypatch):
+    weights = tmp_path / "weights.json"
+    weights.write_text(json.dumps({"version": "v8", "weights": [1.0, 1.0], "bias": "x"}))
+    monkeypatch.setattr(registry, "weights_path", str(weights))
+    resp = client.post("/model/reload")
+    assert resp.status_code == 400
+    assert "'bias' must be a finite number" in resp.json()["detail"]
+    assert client.get("/health").json()["model_version"] != "v8"
+
+
+@pytest.fixture
+def process_mode():
+    settings = Settings()
+    settings.execution_mode = "process"
+    settings.cpu_burn_ms = 5
+    app.dependency_overrides[get_settings] = lambda: settings
+    yield settings
+    app.dependency_overrides.clear()
+    # Reap the worker processes instead of leaking them into later tests
+    get_pool().shutdown(wait=True)
+    get_pool.cache_clear()
+
+
+def test_predict_in_process_pool_mode(process_mode):
+    resp = client.post("/predict", json={"features": [1.0, 2.0]})
+    assert resp.status_code == 200
+    assert resp.json()["prediction"] == 3.0
+
+    pool = client.get("/health").json()["pool"]
+    assert pool["workers"] >= 1
+    assert pool["completed"] >= 1
+    assert pool["queue_depth"] == 0
+
+
+def test_resources_endpoint():
+    resp = client.get("/resources")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["cpu_burn_ms"] == get_settings().cpu_burn_ms
+    assert data["effective_cpus"] >= 1
+    assert data["current"]["memory"]["rss_bytes"] > 0
+
+
+def test_metrics_endpoint_reports_red_metrics():
+    client.get("/health")
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
@@ -1,7 +1,68 @@
-from cost_estimator import estimate_cost
+import json
+
+import pytest
+
+from cost_estimator import (
+    HOURS_PER_MONTH,
+    capacity_per_replica,
+    estimate_cost,
+    load_measurements,
+    parse_diurnal,
+    plan_capacity,
+    plan_from_results,
+)
 
 
 def test_estimate_cost_under_ten():
     cost = estimate_cost(node_hourly=0.01, nodes=1, hours=20)
     assert cost == 0.2
     assert cost < 10.0
+
+
+def _write_result(path, tags, stages):
+    summary = {
+        "tags": tags,
+        "stages": [
+            {"achieved_rps": rps, "p95_latency_ms": p95, "errors": 0, "completed": 1000}
+            for rps, p95 in stages
+        ],
+    }
+    path.write_text(json.dumps({"summary": summary, "timeseries": []}))
+    return str(path)
+
+
+def test_capacity_is_best_rps_within_slo(tmp_path):
+    result = _write_result(
+        tmp_path / "a.json",
+        {"replicas": "2", "cpu_burn_ms": "5"},
+        [(40, 20.0), (80, 60.0), (120, 400.0)],
+    )
+    points = load_measurements([result])
+    assert capacity_per_replica(points, slo_p95_ms=100) == 40.0
+    assert capacity_per_replica(points, slo_p95_ms=10) is None
+
+
+def test_plan_capacity_sizes_for_peak():
+    plan = plan_capacity(
+        rps_per_replica=10, peak_rps=95, node_hourly=0.01, replicas_per_node=4, headroom=0.0
+    )
+    assert plan["replicas"] == 10
+    assert plan["nodes"] == 3
+    assert plan["static"]["monthly_cost"] == round(0.01 * 3 * HOURS_PER_MONTH, 2)
+    # Following the diurnal curve never costs more than provisioning for the peak
+    assert plan["autoscaled"]["monthly_cost"] <= plan["static"]["monthly_cost"]
+    assert plan["autoscaled"]["cost_per_million"] > 0
+
+
+def test_plan_from_results_picks_cheapest_setting(tmp_path):
+    slow = _write_result(tmp_path / "slow.json", {"cpu_burn_ms": "20"}, [(10, 90.0)])
+    fast = _write_result(tmp_path / "fast.json", {"cpu_burn_ms": "5"}, [(40, 30.0)])
+    result = plan_from_results([slow, fast], slo_p95_ms=100, peak_rps=100, node_hourly=0.01)
+    assert result["recommended"]["cpu_burn_ms"] == 5.0
+    assert [row["cpu_burn_ms"] for row in result["tradeoff"]] == [5.0, 20.0]
+
+
+def test_parse_diurnal_requires_24_values():
+    assert len(parse_diurnal(",".join(["0.5"] * 24))) == 24
+    with pytest.raises(ValueError):
+        parse_diurnal("1,2,3")
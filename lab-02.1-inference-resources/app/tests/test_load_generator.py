@@ -0,0 +1,113 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from load_coordinator import run_distributed, split_evenly
+from load_generator import Stage, parse_ramp, run_load, run_open_loop
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = 500 if self.path.endswith("/fail") else 200
+        body = b'{"prediction": 4.0}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_parse_ramp():
+    assert parse_ramp("10:30, 50:60") == [Stage(10.0, 30.0), Stage(50.0, 60.0)]
+    with pytest.raises(ValueError):
+        parse_ramp("10")
+
+
+def test_closed_loop_counts_every_request(server_url, tmp_path):
+    out = tmp_path / "run.json"
+    summary = run_load(
+        f"{server_url}/predict",
+        total_requests=23,
+        concurrency=4,
+        report_interval_s=0.05,
+        json_out=str(out),
+    )
+    assert summary["completed"] == 23
+    assert summary["errors"] == 0
+    assert summary["latency"]["count"] == 23
+
+    report = json.loads(out.read_text())
+    assert sum(row["count"] for row in report["timeseries"]) == 23
+
+
+def test_closed_loop_with_fewer_requests_than_workers(server_url):
+    summary = run_load(f"{server_url}/predict", total_requests=3, concurrency=5)
+    assert summary["completed"] == 3
+
+
+def test_open_loop_errors_and_stages(server_url):
+    stages = [Stage(rps=40, duration_s=0.25), Stage(rps=80, duration_s=0.25)]
+    summary = run_open_loop(f"{server_url}/fail", stages)
+    assert summary["errors"] == 30
+    assert [s["completed"] for s in summary["stages"]] == [10, 20]
+
+
+def test_errors_broken_down_by_status(server_url):
+    summary = run_load(f"{server_url}/fail", total_requests=5, concurrency=2)
+    assert summary["errors_by_status"] == {"500": 5}
+
+
+def test_split_evenly():
+    assert split_evenly(10, 3) == [4, 3, 3]
+    assert sum(split_evenly(7, 7)) == 7
+
+
+def test_distributed_closed_loop_merges_workers(server_url, tmp_path):
+    out = tmp_path / "dist.json"
+    summary = run_distributed(
+        f"{server_url}/predict",
+        processes=2,
+        total_requests=31,
+        concurrency=4,
+        report_interval_s=0.2,
+        json_out=str(out),
+    )
+    assert summary["completed"] == 31
+    assert summary["latency"]["count"] == 31
+    assert [w["completed"] for w in summary["per_worker"]] == [16, 15]
+    assert json.loads(out.read_text())["summary"]["processes"] == 2
+
+
+def test_distributed_never_spawns_idle_processes(server_url):
+    # Fewer requests than processes (and than workers): exactly 2 are sent
+    summary = run_distributed(
+        f"{server_url}/predict", processes=3, total_requests=2, concurrency=6
+    )
+    assert summary["processes"] == 2
+    assert summary["completed"] == 2
+    assert [w["completed"] for w in summary["per_worker"]] == [1, 1]
+
+
+def test_distributed_open_loop_reports_status_codes(server_url):
+    summary = run_distributed(
+        f"{server_url}/fail",
+        processes=2,
+        mode="open",
+        stages=[Stage(rps=40, duration_s=0.5)],
+    )
+    assert summary["errors_by_status"] == {"500": 20}
@@ -0,0 +1,91 @@
+from resources import (
+    ResourceSampler,
+    cgroup_version,
+    cpu_quota_cores,
+    cpu_stat,
+    effective_cpu_count,
+    memory_stat,
+)
+
+
+def test_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory")
+    (tmp_path / "cpu.max").write_text("50000 100000\n")
+    assert cgroup_version(tmp_path) == 2
+    assert cpu_quota_cores(tmp_path) == 0.5
+    assert effective_cpu_count(tmp_path) == 1
+
+
+def test_cgroup_v2_unlimited(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory")
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cpu_quota_cores(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    cpu_dir = tmp_path / "cpu,cpuacct"
+    cpu_dir.mkdir()
+    (cpu_dir / "cpu.cfs_quota_us").write_text("250000\n")
+    (cpu_dir / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_version(tmp_path) == 1
+    assert cpu_quota_cores(tmp_path) == 2.5
+
+
+def test_no_cgroup_files(tmp_path):
+    assert cgroup_version(tmp_path) is None
+    assert cpu_quota_cores(tmp_path) is None
+    assert effective_cpu_count(tmp_path) >= 1
+
+
+def _write_v2(root, usage_usec, periods, throttled, throttled_usec):
+    (root / "cpu.stat").write_text(
+        f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n"
+        f"nr_periods {periods}\nnr_throttled {throttled}\n"
+        f"throttled_usec {throttled_usec}\n"
+    )
+
+
+def test_cgroup_v2_cpu_and_memory_stat(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory")
+    _write_v2(tmp_path, 5_000_000, 100, 20, 300_000)
+    (tmp_path / "memory.current").write_text("104857600\n")
+    (tmp_path / "memory.max").write_text("max\n")
+
+    assert cpu_stat(tmp_path) == {
+        "usage_usec": 5_000_000,
+        "nr_periods": 100,
+        "nr_throttled": 20,
+        "throttled_usec": 300_000,
+    }
+    assert memory_stat(tmp_path) == {"usage_bytes": 104857600, "limit_bytes": None}
+
+
+def test_cgroup_v1_throttling_converted_to_usec(tmp_path):
+    cpu_dir = tmp_path / "cpu,cpuacct"
+    cpu_dir.mkdir()
+    (cpu_dir / "cpu.stat").write_text(
+        "nr_periods 10\nnr_throttled 4\nthrottled_time 8000000\n"
+    )
+    (cpu_dir / "cpuacct.usage").write_text("2000000000\n")
+
+    stat = cpu_stat(tmp_path)
+    assert stat["usage_usec"] == 2_000_000
+    assert stat["throttled_usec"] == 8_000
+
+
+def test_sampler_rates(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory")
+    _write_v2(tmp_path, 1_000_000, 100, 0, 0)
+    sampler = ResourceSampler(interval_s=3600, root=tmp_path)
+    try:
+        for _ in range(10):
+            sampler.record_request()
+        _write_v2(tmp_path, 1_500_000, 200, 50, 250_000)
+        sampler.sample()
+
+        rates = sampler.rates()
+        assert rates["throttled_period_ratio"] == 0.5
+        assert rates["cpu_ms_per_request"] == 50.0
+        assert sampler.report()["current"]["requests"] == 10
+    finally:
+        sampler.stop()
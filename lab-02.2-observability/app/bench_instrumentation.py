@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from config import Settings
+from model import ObservabilityModel
+from otel_setup import build_tracer_provider
+
+
+class NullSpanExporter(SpanExporter):
+    """Accepts and discards spans, so the benchmark measures the SDK, not the network."""
+
+    def __init__(self) -> None:
+        self.exported = 0
+
+    def export(self, spans) -> SpanExportResult:
+        self.exported += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _settings(**overrides: str) -> Settings:
+    """Settings as if the given env vars were set, without touching os.environ."""
+    saved = {k: os.environ.get(k) for k in overrides}
+    os.environ.update(overrides)
+    try:
+        return Settings()
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+SCENARIOS: Dict[str, Optional[Dict[str, str]]] = {
+    "baseline (no telemetry)": None,
+    "trace 100%": {"TRACE_SAMPLE_RATIO": "1.0"},
+    "trace 10% head": {"TRACE_SAMPLE_RATIO": "0.1", "TRACE_KEEP_ERRORS": "false"},
+    "trace 10% head + tail slow/errors": {
+        "TRACE_SAMPLE_RATIO": "0.1",
+        "TRACE_KEEP_SLOW_MS": "50",
+    },
+    "trace 1% head": {"TRACE_SAMPLE_RATIO": "0.01", "TRACE_KEEP_ERRORS": "false"},
+}
+
+
+def _handler(env: Optional[Dict[str, str]]) -> Callable[[], None]:
+    """Build the same work /predict does, with or without telemetry."""
+    model = ObservabilityModel()
+    features = [float(i) for i in range(16)]
+    if env is None:
+        return lambda: model.predict(features)
+
+    resource = Resource.create({"service.name": "bench"})
+    provider = build_tracer_provider(resource, NullSpanExporter(), _settings(**env))
+    tracer = provider.get_tracer("bench")
+    meter = MeterProvider(metric_readers=[InMemoryMetricReader()]).get_meter("bench")
+    hist = meter.create_histogram("inference_latency_ms")
+
+    def handle() -> None:
+        with tracer.start_as_current_span("predict_span", attributes={"cpu_burn_ms": 0}) as span:
+            start = time.perf_counter()
+            model.predict(features)
+            latency_ms = (time.perf_counter() - start) * 1000
+            hist.record(latency_ms)
+            if span.is_recording():
+                span.set_attribute("latency_ms", latency_ms)
+
+    return handle
+
+
+def bench(iterations: int, scenarios: Sequence[str]) -> List[dict]:
+    rows = []
+    baseline_us = None
+    for name in scenarios:
+        handle = _handler(SCENARIOS[name])
+        for _ in range(min(1000, iterations)):
+            handle()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            handle()
+        per_call_us = (time.perf_counter() - start) / iterations * 1_000_000
+        if baseline_us is None:
+            baseline_us = per_call_us
+        rows.append(
+            {
+                "scenario": name,
+                "us_per_request": round(per_call_us, 2),
+                "overhead_us": round(per_call_us - baseline_us, 2),
+            }
+        )
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure OpenTelemetry overhead per /predict request"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20000,
+        help="Requests simulated per scenario (default: 20000)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rows = bench(args.iterations, list(SCENARIOS))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'scenario':<36} {'us/request':>11} {'overhead_us':>12}")
+    for row in rows:
+        print(f"{row['scenario']:<36} {row['us_per_request']:>11} {row['overhead_us']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,57 @@
 import os
 from functools import lru_cache
 
+# Fine-grained below 10 ms where CPU inference lives, coarse out to 5 s
+DEFAULT_LATENCY_BUCKETS_MS = "0.5,1,2,3,5,7.5,10,15,20,30,40,50,75,100,150,250,500,1000,2500,5000"
+
 
 class Settings:
     def __init__(self):
         self.app_env = os.getenv("APP_ENV", "local")
         self.cpu_burn_ms = int(os.getenv("CPU_BURN_MS", "40"))
+        self.model_weights_path = os.getenv("MODEL_WEIGHTS_PATH", "")
+
+        # Tracing cost controls
+        self.trace_sample_ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+        if not 0.0 <= self.trace_sample_ratio <= 1.0:
+            raise ValueError("TRACE_SAMPLE_RATIO must be between 0 and 1")
+        self.trace_keep_slow_ms = float(os.getenv("TRACE_KEEP_SLOW_MS", "0"))
+        self.trace_keep_errors = os.getenv("TRACE_KEEP_ERRORS", "true").lower() == "true"
+        self.span_queue_size = int(os.getenv("SPAN_QUEUE_SIZE", "2048"))
+        self.span_batch_size = int(os.getenv("SPAN_BATCH_SIZE", "512"))
+        self.span_export_delay_ms = int(os.getenv("SPAN_EXPORT_DELAY_MS", "5000"))
+
+        # Standard OTel switch: true = no SDK import, no-op tracer and meter
+        self.otel_sdk_disabled = os.getenv("OTEL_SDK_DISABLED", "false").lower() == "true"
+        # Telemetry export: otlp, memory (ring buffer), spool (disk-backed OTLP) or none
+        self.otel_exporter = os.getenv("OTEL_EXPORTER", "otlp").lower()
+        if self.otel_exporter not in ("otlp", "memory", "spool", "none"):
+            raise ValueError("OTEL_EXPORTER must be one of otlp, memory, spool, none")
+        self.otel_collector_endpoint = os.getenv(
+            "OTEL_COLLECTOR_ENDPOINT", "http://otel-collector:4318"
+        )
+        self.otel_spool_dir = os.getenv("OTEL_SPOOL_DIR", "/tmp/otel-spool")
+        self.otel_spool_max_mb = int(os.getenv("OTEL_SPOOL_MAX_MB", "64"))
+        self.otel_memory_max_spans = int(os.getenv("OTEL_MEMORY_MAX_SPANS", "10000"))
+
+        # Latency histogram layout: "explicit" (LATENCY_BUCKETS_MS) or "exponential"
+        self.latency_histogram = os.getenv("LATENCY_HISTOGRAM", "explicit").lower()
+        if self.latency_histogram not in ("explicit", "exponential"):
+            raise ValueError("LATENCY_HISTOGRAM must be 'explicit' or 'exponential'")
+        self.latency_buckets_ms = [
+            float(b)
+            for b in os.getenv("LATENCY_BUCKETS_MS", DEFAULT_LATENCY_BUCKETS_MS).split(",")
+        ]
+        if self.latency_buckets_ms != sorted(set(self.latency_buckets_ms)):
+            raise ValueError("LATENCY_BUCKETS_MS must be strictly increasing")
 
     def dict(self):
-        return {"app_env": self.app_env, "cpu_burn_ms": self.cpu_burn_ms}
+        return {
+            "app_env": self.app_env,
+            "cpu_burn_ms": self.cpu_burn_ms,
+            "trace_sample_ratio": self.trace_sample_ratio,
+            "trace_keep_slow_ms": self.trace_keep_slow_ms,
+        }
 
 
 @lru_cache
@@ -0,0 +1,146 @@
+import csv
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+def _percentile_key(p: float) -> str:
+    # 99.9 -> "p99_9_ms"
+    return "p" + f"{p:g}".replace(".", "_") + "_ms"
+
+
+class LatencyHistogram:
+    """
+    Constant-memory latency histogram in the style of HdrHistogram.
+
+    Values are stored in microseconds in log-linear buckets: every power-of-two
+    range is split into the same number of linear sub-buckets, so any reported
+    value is within ~10**-significant_digits of the true value (0.1% with the
+    default of 3), from 1 us up to `highest_us`. Memory is bounded by the
+    number of buckets (about 17k for 60 s at 3 digits), however many samples
+    are recorded, so multi-million-request soak tests cost the same as short runs.
+    """
+
+    def __init__(self, highest_us: int = 60_000_000, significant_digits: int = 3) -> None:
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+        # Enough linear sub-buckets to resolve 10**digits distinct values
+        self._sub_bits = math.ceil(math.log2(2 * 10**significant_digits))
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+        self.reset()
+
+    def reset(self) -> None:
+        # Sparse bucket index -> count; at most _index(highest_us) + 1 keys
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self._sub_count:
+            return value_us
+        shift = value_us.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + ((value_us >> shift) - self._half)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        offset = index - self._sub_count
+        shift = offset // self._half + 1
+        sub = offset % self._half + self._half
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        value_us = min(max(int(round(value_ms * 1000.0)), 0), self.highest_us)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum_us += value_us * count
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if (other.highest_us, other.significant_digits) != (
+            self.highest_us,
+            self.significant_digits,
+        ):
+            raise ValueError("cannot merge histograms with different settings")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def value_at_percentile(self, percentile: float) -> float:
+        """Latency in ms at or below which `percentile`% of samples fall."""
+        if self.total == 0:
+            return 0.0
+        target = max(1, math.ceil(percentile / 100.0 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[str, Any]:
+        mean_ms = self.sum_us / self.total / 1000.0 if self.total else 0.0
+        out: Dict[str, Any] = {
+            "count": self.total,
+            "min_ms": round((self.min_us or 0) / 1000.0, 3),
+            "mean_ms": round(mean_ms, 3),
+        }
+        for p in percentiles:
+            out[_percentile_key(p)] = round(self.value_at_percentile(p), 3)
+        out["max_ms"] = round(self.max_us / 1000.0, 3)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact, JSON-friendly snapshot (only non-empty buckets)."""
+        return {
+            "highest_us": self.highest_us,
+            "significant_digits": self.significant_digits,
+            "total": self.total,
+            "sum_us": self.sum_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "counts": {str(index): count for index, count in self.counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(data["highest_us"], data["significant_digits"])
+        hist.counts = {int(index): count for index, count in data["counts"].items()}
+        hist.total = data["total"]
+        hist.sum_us = data["sum_us"]
+        hist.min_us = data["min_us"]
+        hist.max_us = data["max_us"]
+        return hist
+
+
+def write_json(path: str, summary: Dict[str, Any], timeseries: List[Dict[str, Any]]) -> None:
+    Path(path).write_text(
+        json.dumps({"summary": summary, "timeseries": timeseries}, indent=2),
+        encoding="utf-8",
+    )
+
+
+def write_csv(path: str, timeseries: List[Dict[str, Any]]) -> None:
+    if not timeseries:
+        Path(path).write_text("", encoding="utf-8")
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(timeseries[0]))
+        writer.writeheader()
+        writer.writerows(timeseries)
@@ -1,26 +1,89 @@
 import argparse
+import json
 import time
-import statistics
+
 import requests
 
+from latency_histogram import LatencyHistogram, write_csv, write_json
+
+
+def run_load(url: str, count: int, report_interval_s: float = 1.0,
+             json_out: str = None, csv_out: str = None):
+    # Constant memory: latencies go into histograms, not a list, so this
+    # works the same for 50 requests and for a multi-million-request soak.
+    total = LatencyHistogram()
+    interval = LatencyHistogram()
+    errors = interval_errors = 0
+    timeseries = []
+
+    session = requests.Session()
+    start = last_tick = time.perf_counter()
+
+    def tick(now):
+        nonlocal interval_errors
+        elapsed = now - last_tick
+        latency = interval.summary()
+        row = {
+            "t_s": round(now - start, 3),
+            "count": interval.total,
+            "errors": interval_errors,
+            "rps": round((interval.total + interval_errors) / elapsed, 2) if elapsed > 0 else 0.0,
+            **{k: v for k, v in latency.items() if k not in ("count", "min_ms")},
+        }
+        timeseries.append(row)
+        print(json.dumps(row))
+        interval.reset()
+        interval_errors = 0
 
-def run_load(url: str, count: int):
-    latencies = []
-    for i in range(count):
-        t0 = time.time()
-        r = requests.post(url, json={"features": [1, 2, 3]}, timeout=5)
-        latencies.append((time.time() - t0) * 1000)
+    for _ in range(count):
+        t0 = time.perf_counter()
+        try:
+            r = session.post(url, json={"features": [1, 2, 3]}, timeout=5)
+            ok = r.status_code == 200
+        except requests.RequestException:
+            ok = False
+        latency_ms = (time.perf_counter() - t0) * 1000
 
-    print({
+        if ok:
+            total.record(latency_ms)
+            interval.record(latency_ms)
+        else:
+            errors += 1
+            interval_errors += 1
+
+        now = time.perf_counter()
+        if now - last_tick >= report_interval_s:
+            tick(now)
+            last_tick = now
+
+    end = time.perf_counter()
+    if interval.total or interval_errors:
+        tick(end)
+
+    latency = total.summary()
+    summary = {
         "count": count,
-        "avg_ms": round(statistics.mean(latencies), 2),
-        "p95_ms": round(statistics.quantiles(latencies, n=20)[18], 2)
-    })
+        "errors": errors,
+        "total_time_sec": round(end - start, 3),
+        "avg_ms": round(latency["mean_ms"], 2),
+        "p95_ms": round(latency["p95_ms"], 2),
+        "latency": latency,
+    }
+    print(summary)
+
+    if json_out:
+        write_json(json_out, summary, timeseries)
+    if csv_out:
+        write_csv(csv_out, timeseries)
+    return summary
 
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--url", required=True)
     ap.add_argument("--count", type=int, default=50)
+    ap.add_argument("--report-interval", type=float, default=1.0)
+    ap.add_argument("--json-out")
+    ap.add_argument("--csv-out")
     args = ap.parse_args()
-    run_load(args.url, args.count)
+    run_load(args.url, args.count, args.report_interval, args.json_out, args.csv_out)
@@ -1,54 +1,141 @@
+import math
+import threading
 import time
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, conlist
 
 from config import get_settings
 from model import ObservabilityModel
-from otel_setup import configure_otel
-
-tracer, meter = configure_otel()
+from red_metrics import install as install_red_metrics, register_otel
+from registry import ModelRegistry
+from telemetry import add_meter_hook, get_telemetry, telemetry_stats
 
-latency_hist = meter.create_histogram(
-    name="inference_latency_ms", description="Latency of inference calls"
+registry = ModelRegistry(
+    ObservabilityModel, weights_path=get_settings().model_weights_path or None
 )
 
-app = FastAPI(title="Lab 2.2 Paid - Observability API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the model once at startup instead of once per request
+    registry.load()
+    # Bring up telemetry off the startup path; the first /predict waits for it
+    # only if it is still loading.
+    threading.Thread(target=get_telemetry, name="otel-init", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Lab 2.2 Paid - Observability API", lifespan=lifespan)
+
+
+class ArrivalTimeMiddleware:
+    """Stamps each request with its arrival time for the queue-time histogram."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["arrived_at"] = time.perf_counter()
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(ArrivalTimeMiddleware)
+red_metrics = install_red_metrics(app)
+# Same RED numbers through OTel, read by observable callbacks at export time
+add_meter_hook(lambda meter: register_otel(meter, red_metrics))
+
+
+def cpu_burn(milliseconds: int) -> None:
+    end = time.perf_counter() + (milliseconds / 1000.0)
+    x = 0.0
+    while time.perf_counter() < end:
+        x += 1.0  # noqa: F841
 
 
 class Features(BaseModel):
-    features: conlist(float, min_items=1)
+    features: conlist(float, min_length=1)
 
 
 @app.get("/health")
 def health(settings=Depends(get_settings)):
-    return settings.dict()
+    return {**settings.dict(), **registry.status()}
+
+
+@app.get("/ready")
+def ready():
+    if not registry.ready:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    return registry.status()
+
+
+@app.get("/telemetry")
+def telemetry():
+    """Export pipeline health: buffered/spooled data and drop counters."""
+    return telemetry_stats()
+
+
+@app.post("/model/reload")
+def reload_model():
+    try:
+        model = registry.load()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"reload failed: {e}")
+    return {"model_name": model.name, **registry.status()}
 
 
 @app.post("/predict")
 def predict(
     payload: Features,
+    request: Request,
     settings=Depends(get_settings),
 ):
-    model = ObservabilityModel()
+    handler_start = time.perf_counter()
+    arrived_at = getattr(request.state, "arrived_at", handler_start)
+    model = registry.get()
+    cpu_ms = settings.cpu_burn_ms
+    otel = get_telemetry()
+
+    # Attributes known up front go in at span start; unsampled spans are
+    # non-recording, so the per-request attribute work is skipped for them.
+    with otel.tracer.start_as_current_span(
+        "predict_span", attributes={"cpu_burn_ms": cpu_ms}
+    ) as span:
+        # Recorded inside the span so each bucket's exemplar carries its trace ID
+        queue_ms = (handler_start - arrived_at) * 1000
+        otel.queue_hist.record(queue_ms)
+
+        # Python's JSON parser accepts NaN/Infinity; the prediction would not encode
+        if not all(math.isfinite(x) for x in payload.features):
+            raise HTTPException(status_code=422, detail="features must be finite numbers")
 
-    with tracer.start_as_current_span("predict_span") as span:
-        start = time.time()
+        start = time.perf_counter()
         try:
             result = model.predict(payload.features)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
+        cpu_burn(cpu_ms)
+        model_done = time.perf_counter()
+        model_ms = (model_done - start) * 1000
+        otel.model_hist.record(model_ms)
 
-        cpu_ms = settings.cpu_burn_ms
-        end = time.time()
-
-        latency_ms = (end - start) * 1000
-        latency_hist.record(latency_ms)
-
-        span.set_attribute("latency_ms", latency_ms)
-        span.set_attribute("cpu_burn_ms", cpu_ms)
+        latency_ms = (model_done - arrived_at) * 1000
+        response = JSONResponse(
+            {
+                "prediction": result,
+                "latency_ms": round(latency_ms, 2),
+                "cpu_burn_ms": cpu_ms,
+            }
+        )
+        end = time.perf_counter()
+        otel.serialization_hist.record((end - model_done) * 1000)
+        otel.latency_hist.record((end - arrived_at) * 1000)
 
-        return {
-            "prediction": result,
-            "latency_ms": round(latency_ms, 2),
-            "cpu_burn_ms": cpu_ms,
-        }
+        if span.is_recording():
+            span.set_attributes(
+                {"latency_ms": latency_ms, "queue_ms": queue_ms, "model_ms": model_ms}
+            )
+        return response
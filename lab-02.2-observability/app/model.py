@@ -1,11 +1,86 @@
-from typing import List
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+FeatureRows = Union[np.ndarray, Sequence[Sequence[float]]]
 
 
 class ObservabilityModel:
-    def __init__(self, name: str = "obs-linear-model"):
+    """
+    prediction = features @ weights + bias (sum(features) with no weights).
+    """
+
+    def __init__(
+        self,
+        name: str = "obs-linear-model",
+        weights: Optional[Sequence[float]] = None,
+        bias: float = 0.0,
+        dtype: str = "float64",
+    ) -> None:
         self.name = name
+        self.dtype = np.dtype(dtype)
+        self.weights = (
+            None if weights is None else np.ascontiguousarray(weights, dtype=self.dtype)
+        )
+        self.bias = float(bias)
 
     def predict(self, features: List[float]) -> float:
-        if not features:
+        if len(features) == 0:
             raise ValueError("Empty features")
-        return float(sum(features))
+        return float(self.predict_many(self.as_matrix([features]))[0])
+
+    def predict_many(self, matrix: np.ndarray) -> np.ndarray:
+        """Score a (rows, features) matrix in one vectorized call."""
+        # No copy when the input already has the right dtype and layout
+        matrix = np.ascontiguousarray(matrix, dtype=self.dtype)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.size == 0:
+            raise ValueError("batch must be a non-empty 2-D matrix")
+
+        if self.weights is None:
+            return matrix.sum(axis=1) + self.bias
+        if matrix.shape[1] != self.weights.shape[0]:
+            raise ValueError(
+                f"expected {self.weights.shape[0]} features, got {matrix.shape[1]}"
+            )
+        return matrix @ self.weights + self.bias
+
+    def as_matrix(self, rows: FeatureRows) -> np.ndarray:
+        """
+        Pack feature vectors into one contiguous 2-D array.
+
+        Rows may have different lengths when no weights are configured;
+        short rows are zero padded, which leaves sum(features) unchanged.
+        """
+        if isinstance(rows, np.ndarray):
+            return np.ascontiguousarray(rows, dtype=self.dtype)
+        if len(rows) == 0:
+            raise ValueError("batch cannot be empty")
+
+        width = max(len(row) for row in rows)
+        if self.weights is not None:
+            width = self.weights.shape[0]
+            if any(len(row) != width for row in rows):
+                raise ValueError(f"every vector must have {width} features")
+
+        matrix = np.zeros((len(rows), width), dtype=self.dtype)
+        for i, row in enumerate(rows):
+            if len(row) == 0:
+                raise ValueError("Empty features")
+            matrix[i, : len(row)] = row
+        return matrix
+
+    def from_bytes(self, data: bytes, rows: int = 1) -> np.ndarray:
+        """
+        Zero-copy view over a raw request body of packed little-endian floats.
+
+        The returned array shares memory with `data`; nothing is boxed into
+        Python floats on the way to `predict_many`.
+        """
+        dtype = self.dtype.newbyteorder("<")
+        if rows < 1 or len(data) == 0 or len(data) % (dtype.itemsize * rows):
+            raise ValueError(
+                f"body must hold {rows} row(s) of {dtype.itemsize}-byte floats"
+            )
+        return np.frombuffer(data, dtype=dtype).reshape(rows, -1)
@@ -1,28 +1,310 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
 from opentelemetry import trace, metrics
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.context import Context
+from opentelemetry.sdk.metrics import (
+    AlwaysOnExemplarFilter,
+    MeterProvider,
+    TraceBasedExemplarFilter,
+)
+from opentelemetry.sdk.metrics.export import MetricReader
+from opentelemetry.sdk.metrics.view import (
+    ExplicitBucketHistogramAggregation,
+    ExponentialBucketHistogramAggregation,
+    View,
+)
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.trace import SpanContext, StatusCode, TraceFlags
+
+from config import Settings, get_settings
+from telemetry_exporters import make_metric_reader, make_span_exporter
+
+# Components of the pipeline configure_otel() built, for telemetry_stats()
+_pipeline: Dict[str, Any] = {}
+
+
+class HeadSampler(Sampler):
+    """
+    Ratio-based head sampling that can keep unsampled spans recording.
+
+    A trace is sampled up front with probability `ratio` (children follow
+    their parent). When `record_unsampled` is set the remaining traces are
+    still recorded, but not flagged as sampled, so a tail processor can
+    decide at the end whether they were slow or failed and worth keeping.
+    Without it they become non-recording spans, the cheapest option.
+    """
+
+    def __init__(self, ratio: float, record_unsampled: bool = False) -> None:
+        self._ratio = TraceIdRatioBased(ratio)
+        self._unsampled = Decision.RECORD_ONLY if record_unsampled else Decision.DROP
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        parent = trace.get_current_span(parent_context).get_span_context()
+        if parent.is_valid:
+            sampled = parent.trace_flags.sampled
+        else:
+            sampled = self._ratio.should_sample(
+                parent_context, trace_id, name
+            ).decision.is_sampled()
+        decision = Decision.RECORD_AND_SAMPLE if sampled else self._unsampled
+        return SamplingResult(decision, attributes if decision.is_recording() else None)
+
+    def get_description(self) -> str:
+        return f"HeadSampler{{{self._ratio.rate}, {self._unsampled.name}}}"
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Forwards head-sampled spans unchanged and decides on the rest when their
+    local root span ends: the whole trace is kept if any of its spans took
+    at least `keep_slow_ms` or ended with an error, otherwise it is dropped.
+
+    Pending traces are bounded by `max_pending_traces`; the oldest is
+    discarded (and counted in `dropped_traces`) when the buffer is full.
+    """
+
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        keep_slow_ms: float = 0.0,
+        keep_errors: bool = True,
+        max_pending_traces: int = 4096,
+    ) -> None:
+        self._delegate = delegate
+        self._keep_slow_ns = int(keep_slow_ms * 1_000_000)
+        self._keep_errors = keep_errors
+        self._max_pending = max_pending_traces
+        self._pending: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.kept_traces = 0
+        self.dropped_traces = 0
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._delegate.on_start(span, parent_context=parent_context)
+
+    def _interesting(self, span: ReadableSpan) -> bool:
+        if self._keep_errors and span.status.status_code is StatusCode.ERROR:
+            return True
+        if self._keep_slow_ns and span.end_time and span.start_time:
+            return span.end_time - span.start_time >= self._keep_slow_ns
+        return False
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self._delegate.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        is_local_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            spans = self._pending.pop(trace_id, [])
+            spans.append(span)
+            if not is_local_root:
+                self._pending[trace_id] = spans
+                if len(self._pending) > self._max_pending:
+                    self._pending.popitem(last=False)
+                    self.dropped_traces += 1
+                return
+            keep = any(self._interesting(s) for s in spans)
+            if keep:
+                self.kept_traces += 1
+            else:
+                self.dropped_traces += 1
+
+        if keep:
+            for s in spans:
+                self._delegate.on_end(_mark_sampled(s))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "kept_traces": self.kept_traces,
+            "dropped_traces": self.dropped_traces,
+            "pending_traces": pending,
+        }
+
+    def shutdown(self) -> None:
+        self._delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._delegate.force_flush(timeout_millis)
+
+
+def _mark_sampled(span: ReadableSpan) -> ReadableSpan:
+    """Copy of `span` flagged as sampled so exporters accept it."""
+    ctx = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            ctx.trace_id,
+            ctx.span_id,
+            ctx.is_remote,
+            TraceFlags(TraceFlags.SAMPLED),
+            ctx.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+def build_span_processor(
+    exporter: SpanExporter, settings: Optional[Settings] = None
+) -> SpanProcessor:
+    """BatchSpanProcessor sized from settings, behind the tail sampler when it is on."""
+    settings = settings or get_settings()
+    processor: SpanProcessor = BatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.span_queue_size,
+        schedule_delay_millis=settings.span_export_delay_ms,
+        max_export_batch_size=min(settings.span_batch_size, settings.span_queue_size),
+    )
+    if _tail_sampling(settings):
+        processor = TailSamplingSpanProcessor(
+            processor,
+            keep_slow_ms=settings.trace_keep_slow_ms,
+            keep_errors=settings.trace_keep_errors,
+        )
+    return processor
+
+
+def _tail_sampling(settings: Settings) -> bool:
+    keep_rules = settings.trace_keep_slow_ms > 0 or settings.trace_keep_errors
+    return keep_rules and settings.trace_sample_ratio < 1.0
+
+
+def build_tracer_provider(
+    resource: Resource,
+    exporter: Optional[SpanExporter],
+    settings: Optional[Settings] = None,
+) -> TracerProvider:
+    """
+    TracerProvider with head sampling and, when `exporter` is given, the
+    span processor from build_span_processor(). Also used by the overhead
+    benchmark, with a no-op exporter.
+    """
+    settings = settings or get_settings()
+    provider = TracerProvider(
+        resource=resource,
+        sampler=HeadSampler(
+            settings.trace_sample_ratio, record_unsampled=_tail_sampling(settings)
+        ),
+    )
+    if exporter is not None:
+        provider.add_span_processor(build_span_processor(exporter, settings))
+    return provider
+
+
+def latency_views(settings: Optional[Settings] = None) -> Sequence[View]:
+    """
+    Histogram views for every `inference_*_ms` instrument.
+
+    The SDK default buckets (0, 5, 10, 25, ... 10000) put every sub-5 ms
+    inference in one bucket. "explicit" uses LATENCY_BUCKETS_MS instead;
+    "exponential" uses a base-2 exponential histogram that adapts its scale
+    to the recorded range, at the cost of needing a backend that supports it.
+    """
+    settings = settings or get_settings()
+    if settings.latency_histogram == "exponential":
+        aggregation = ExponentialBucketHistogramAggregation(max_size=160)
+    else:
+        aggregation = ExplicitBucketHistogramAggregation(
+            boundaries=settings.latency_buckets_ms
+        )
+    return [View(instrument_name="inference_*_ms", aggregation=aggregation)]
+
+
+def build_meter_provider(
+    resource: Resource,
+    readers: Sequence[MetricReader],
+    settings: Optional[Settings] = None,
+) -> MeterProvider:
+    """
+    MeterProvider with the latency views and exemplars.
+
+    Each histogram bucket keeps the trace ID of its latest measurement as an
+    exemplar, so a slow bucket links straight to a trace of a slow request.
+    With tail sampling on, unsampled requests are offered too: the slow ones
+    are exactly the traces the tail processor keeps.
+    """
+    settings = settings or get_settings()
+    if settings.trace_sample_ratio < 1.0 and settings.trace_keep_slow_ms > 0:
+        exemplar_filter = AlwaysOnExemplarFilter()
+    else:
+        exemplar_filter = TraceBasedExemplarFilter()
+    return MeterProvider(
+        resource=resource,
+        metric_readers=list(readers),
+        views=latency_views(settings),
+        exemplar_filter=exemplar_filter,
+    )
 
 
 def configure_otel(service_name: str = "ai-lab-2-2-paid"):
+    settings = get_settings()
     resource = Resource.create({"service.name": service_name})
 
-    # Tracing
-    trace_provider = TracerProvider(resource=resource)
-    span_exporter = OTLPSpanExporter(endpoint="http://otel-collector:4318/v1/traces")
-    trace_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    # Tracing: exporter chosen by OTEL_EXPORTER (otlp, memory, spool, none)
+    span_exporter = make_span_exporter(settings)
+    trace_provider = build_tracer_provider(resource, None, settings)
+    if span_exporter is not None:
+        processor = build_span_processor(span_exporter, settings)
+        trace_provider.add_span_processor(processor)
+        _pipeline["span_processor"] = processor
+    _pipeline["span_exporter"] = span_exporter
     trace.set_tracer_provider(trace_provider)
 
     # Metrics
-    metric_exporter = OTLPMetricExporter(
-        endpoint="http://otel-collector:4318/v1/metrics"
+    reader = make_metric_reader(settings)
+    _pipeline["metric_reader"] = reader
+    metrics.set_meter_provider(
+        build_meter_provider(resource, [reader] if reader else [], settings)
     )
-    reader = PeriodicExportingMetricReader(metric_exporter)
-    metrics_provider = MeterProvider(resource=resource, metric_readers=[reader])
-    metrics.set_meter_provider(metrics_provider)
 
     return trace.get_tracer(__name__), metrics.get_meter(__name__)
+
+
+def telemetry_stats() -> Dict[str, Any]:
+    """Buffer sizes and drop counters of the configured export pipeline."""
+    settings = get_settings()
+    out: Dict[str, Any] = {
+        "exporter": settings.otel_exporter,
+        "collector_endpoint": settings.otel_collector_endpoint,
+    }
+    processor = _pipeline.get("span_processor")
+    if isinstance(processor, TailSamplingSpanProcessor):
+        out["tail_sampling"] = processor.stats()
+    for key, name in (("span_exporter", "spans"), ("metric_reader", "metrics")):
+        component = _pipeline.get(key)
+        # PeriodicExportingMetricReader wraps the exporter that keeps the counters
+        exporter = getattr(component, "_exporter", component)
+        if hasattr(exporter, "stats"):
+            out[name] = exporter.stats()
+    return out
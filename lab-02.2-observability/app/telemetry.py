@@ -0,0 +1,81 @@
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from opentelemetry import metrics, trace
+
+from config import get_settings
+
+# Only the OTel API is imported here. The SDK and the OTLP/protobuf exporter
+# stack (otel_setup) load on first use, so the app can serve /health first.
+_lock = threading.Lock()
+_state: Optional[SimpleNamespace] = None
+_meter_hooks: List[Callable[[Any], None]] = []
+
+
+def _build() -> SimpleNamespace:
+    if get_settings().otel_sdk_disabled:
+        tracer = trace.NoOpTracer()
+        meter = metrics.NoOpMeter("disabled")
+    else:
+        from otel_setup import configure_otel
+
+        tracer, meter = configure_otel()
+    for hook in _meter_hooks:
+        hook(meter)
+
+    return SimpleNamespace(
+        tracer=tracer,
+        meter=meter,
+        latency_hist=meter.create_histogram(
+            name="inference_latency_ms",
+            unit="ms",
+            description="Request latency from arrival to serialized response",
+        ),
+        # Where the time goes: waiting for a worker thread, running the model,
+        # encoding the response. All four share the inference_*_ms bucket view.
+        queue_hist=meter.create_histogram(
+            name="inference_queue_ms",
+            unit="ms",
+            description="Arrival until the handler starts (validation + threadpool wait)",
+        ),
+        model_hist=meter.create_histogram(
+            name="inference_model_ms", unit="ms", description="Model predict + CPU burn"
+        ),
+        serialization_hist=meter.create_histogram(
+            name="inference_serialization_ms",
+            unit="ms",
+            description="Response JSON encoding",
+        ),
+    )
+
+
+def get_telemetry() -> SimpleNamespace:
+    """Tracer, meter and instruments, initialized on first call (thread-safe)."""
+    global _state
+    if _state is None:
+        with _lock:
+            if _state is None:
+                _state = _build()
+    return _state
+
+
+def add_meter_hook(hook: Callable[[Any], None]) -> None:
+    """Run `hook(meter)` once telemetry is up (right away if it already is)."""
+    _meter_hooks.append(hook)
+    if _state is not None:
+        hook(_state.meter)
+
+
+def is_initialized() -> bool:
+    return _state is not None
+
+
+def telemetry_stats() -> Dict[str, Any]:
+    if get_settings().otel_sdk_disabled:
+        return {"exporter": "disabled"}
+    if not is_initialized():
+        return {"exporter": get_settings().otel_exporter, "initialized": False}
+    from otel_setup import telemetry_stats as pipeline_stats
+
+    return {**pipeline_stats(), "initialized": True}
@@ -27,6 +27,14 @@ def test_model_prediction_logic():
     assert result == 6.0
 
 
+def test_model_predict_many_matrix():
+    """Vectorized path scores every row of a float32 matrix at once."""
+    model = ObservabilityModel(dtype="float32")
+    matrix = model.as_matrix([[1, 2, 3], [4, 5]])
+    assert matrix.dtype.name == "float32"
+    assert model.predict_many(matrix).tolist() == [6.0, 9.0]
+
+
 def test_predict_endpoint():
     """Ensure /predict endpoint returns prediction + telemetry attributes."""
     resp = client.post("/predict", json={"features": [1, 2, 3]})
@@ -39,3 +47,39 @@ def test_predict_endpoint():
     assert "latency_ms" in body
     assert "cpu_burn_ms" in body
     assert body["cpu_burn_ms"] == get_settings().cpu_burn_ms
+
+
+def test_predict_rejects_non_finite_features():
+    """NaN/Infinity parse as JSON in Python but are invalid features (422, not 500)."""
+    resp = client.post(
+        "/predict",
+        content='{"features": [1.0, NaN]}',
+        headers={"Content-Type": "application/json"},
+    )
+    assert resp.status_code == 422
+
+
+def test_health_reports_model_readiness():
+    """Warm load on startup marks the model ready in /health."""
+    with TestClient(app) as warm_client:
+        data = warm_client.get("/health").json()
+        assert data["model_ready"] is True
+        assert data["model_version"] == "builtin"
+
+
+def test_predict_burns_configured_cpu():
+    """The reported cpu_burn_ms is actually spent, so latency covers it."""
+    body = client.post("/predict", json={"features": [1, 2, 3]}).json()
+    assert body["latency_ms"] >= get_settings().cpu_burn_ms
+
+
+def test_telemetry_reports_exporter():
+    data = client.get("/telemetry").json()
+    assert data["exporter"] == get_settings().otel_exporter
+    assert "collector_endpoint" in data
+
+
+def test_metrics_endpoint_reports_red_metrics():
+    client.post("/predict", json={"features": [1, 2, 3]})
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/predict",status="200"}' in text
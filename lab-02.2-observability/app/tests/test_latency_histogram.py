@@ -0,0 +1,72 @@
+import json
+import math
+import random
+
+from latency_histogram import LatencyHistogram, write_csv, write_json
+
+
+def test_single_sample_does_not_crash():
+    hist = LatencyHistogram()
+    hist.record(12.5)
+    summary = hist.summary()
+    assert summary["count"] == 1
+    assert summary["p50_ms"] == 12.5
+    assert summary["p99_9_ms"] == 12.5
+    assert summary["max_ms"] == 12.5
+
+
+def test_empty_histogram_summary():
+    assert LatencyHistogram().summary()["p99_ms"] == 0.0
+
+
+def test_percentiles_within_precision():
+    rng = random.Random(42)
+    samples = [rng.lognormvariate(3, 1) for _ in range(20_000)]
+    hist = LatencyHistogram()
+    for s in samples:
+        hist.record(s)
+
+    ordered = sorted(samples)
+    for p in (50, 90, 99, 99.9):
+        exact = ordered[math.ceil(p / 100 * len(ordered)) - 1]
+        # 3 significant digits plus microsecond rounding
+        assert abs(hist.value_at_percentile(p) - exact) <= exact * 0.002 + 0.001
+
+
+def test_nearest_rank_is_not_off_by_one():
+    hist = LatencyHistogram()
+    for v in range(1, 21):  # 1..20 ms
+        hist.record(float(v))
+    # Reported values are the top of the bucket, within 0.1% of the sample
+    assert math.isclose(hist.value_at_percentile(95), 19.0, rel_tol=1e-3)
+    assert hist.value_at_percentile(100) == 20.0
+
+
+def test_memory_is_bounded():
+    hist = LatencyHistogram(highest_us=1_000_000)
+    for v in range(200_000):
+        hist.record(v / 100.0)
+    assert len(hist.counts) <= hist._index(hist.highest_us) + 1
+    # Values above the range are clamped, not dropped
+    hist.record(10_000.0)
+    assert hist.max_us == 1_000_000
+
+
+def test_merge_and_round_trip():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for v in (1.0, 2.0, 3.0):
+        a.record(v)
+    for v in (100.0, 200.0):
+        b.record(v)
+    a.merge(LatencyHistogram.from_dict(json.loads(json.dumps(b.to_dict()))))
+    assert a.total == 5
+    assert a.summary()["max_ms"] == 200.0
+    assert a.summary()["min_ms"] == 1.0
+
+
+def test_exports(tmp_path):
+    rows = [{"t_s": 1.0, "count": 10, "p99_ms": 5.0}]
+    write_json(str(tmp_path / "run.json"), {"completed": 10}, rows)
+    write_csv(str(tmp_path / "run.csv"), rows)
+    assert json.loads((tmp_path / "run.json").read_text())["timeseries"] == rows
+    assert (tmp_path / "run.csv").read_text().splitlines()[0] == "t_s,count,p99_ms"
@@ -1,4 +1,20 @@
-from otel_setup import configure_otel
+import time
+
+import pytest
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from config import Settings
+from otel_setup import (
+    HeadSampler,
+    TailSamplingSpanProcessor,
+    build_meter_provider,
+    build_tracer_provider,
+    configure_otel,
+)
 
 
 def test_otel_initialization():
@@ -33,3 +49,175 @@ def test_otel_histogram_creation():
     # Ensure .record() does not raise errors
     hist.record(12.5)
     hist.record(50)
+
+
+def _tail_provider(ratio, keep_slow_ms=0.0, keep_errors=True):
+    exporter = InMemorySpanExporter()
+    tail = TailSamplingSpanProcessor(
+        SimpleSpanProcessor(exporter), keep_slow_ms=keep_slow_ms, keep_errors=keep_errors
+    )
+    provider = TracerProvider(sampler=HeadSampler(ratio, record_unsampled=True))
+    provider.add_span_processor(tail)
+    return provider.get_tracer("test"), exporter, tail
+
+
+def test_head_sampler_ratio_bounds():
+    """Ratio 0 records nothing (DROP) unless unsampled spans are kept recording."""
+    tracer = TracerProvider(sampler=HeadSampler(0.0)).get_tracer("test")
+    with tracer.start_as_current_span("dropped") as span:
+        assert not span.is_recording()
+
+    tracer = TracerProvider(sampler=HeadSampler(1.0)).get_tracer("test")
+    with tracer.start_as_current_span("kept") as span:
+        assert span.get_span_context().trace_flags.sampled
+
+
+def test_tail_sampling_keeps_errors_and_drops_fast_traces():
+    tracer, exporter, tail = _tail_provider(0.0)
+
+    with tracer.start_as_current_span("fast"):
+        pass
+    try:
+        with tracer.start_as_current_span("failing"):
+            with tracer.start_as_current_span("child"):
+                pass
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    names = sorted(s.name for s in exporter.get_finished_spans())
+    assert names == ["child", "failing"]
+    assert all(s.context.trace_flags.sampled for s in exporter.get_finished_spans())
+    assert tail.stats() == {"kept_traces": 1, "dropped_traces": 1, "pending_traces": 0}
+
+
+def test_tail_sampling_keeps_slow_traces():
+    tracer, exporter, _ = _tail_provider(0.0, keep_slow_ms=5, keep_errors=False)
+
+    with tracer.start_as_current_span("slow"):
+        time.sleep(0.01)
+    with tracer.start_as_current_span("fast"):
+        pass
+
+    assert [s.name for s in exporter.get_finished_spans()] == ["slow"]
+
+
+def test_batch_processor_uses_span_settings(monkeypatch):
+    monkeypatch.setenv("SPAN_QUEUE_SIZE", "64")
+    monkeypatch.setenv("SPAN_BATCH_SIZE", "128")
+    monkeypatch.setenv("TRACE_SAMPLE_RATIO", "0.5")
+    provider = build_tracer_provider(Resource.create({}), InMemorySpanExporter(), Settings())
+    (processor,) = provider._active_span_processor._span_processors
+    assert isinstance(processor, TailSamplingSpanProcessor)
+    batch = processor._delegate
+    assert isinstance(batch, BatchSpanProcessor)
+    assert batch.max_queue_size == 64
+    # Batch size is capped at the queue size
+    assert batch.max_export_batch_size == 64
+    provider.shutdown()
+
+
+def test_bench_instrumentation_reports_each_scenario():
+    from bench_instrumentation import SCENARIOS, bench
+
+    rows = bench(50, list(SCENARIOS))
+    assert [r["scenario"] for r in rows] == list(SCENARIOS)
+    assert rows[0]["overhead_us"] == 0
+
+
+def _histogram_point(reader, name):
+    for rm in reader.get_metrics_data().resource_metrics:
+        for sm in rm.scope_metrics:
+            for metric in sm.metrics:
+                if metric.name == name:
+                    return metric.data.data_points[0]
+    raise AssertionError(f"{name} not exported")
+
+
+def test_latency_view_uses_explicit_ms_buckets_with_exemplars():
+    settings = Settings()
+    reader = InMemoryMetricReader()
+    meter = build_meter_provider(Resource.create({}), [reader], settings).get_meter("t")
+    hist = meter.create_histogram("inference_model_ms")
+    tracer = TracerProvider(sampler=HeadSampler(1.0)).get_tracer("t")
+
+    with tracer.start_as_current_span("slow") as span:
+        hist.record(180.0)
+        trace_id = span.get_span_context().trace_id
+    hist.record(0.7)
+
+    point = _histogram_point(reader, "inference_model_ms")
+    assert list(point.explicit_bounds) == settings.latency_buckets_ms
+    # Only the measurement taken inside a sampled span carries an exemplar
+    assert [e.trace_id for e in point.exemplars] == [trace_id]
+    assert point.exemplars[0].value == 180.0
+
+
+def test_latency_view_exponential(monkeypatch):
+    monkeypatch.setenv("LATENCY_HISTOGRAM", "exponential")
+    reader = InMemoryMetricReader()
+    provider = build_meter_provider(Resource.create({}), [reader], Settings())
+    hist = provider.get_meter("t").create_histogram("inference_queue_ms")
+    for v in (0.2, 1.5, 12.0):
+        hist.record(v)
+
+    point = _histogram_point(reader, "inference_queue_ms")
+    assert point.count == 3
+    assert hasattr(point, "scale")
+
+
+def test_invalid_bucket_boundaries_rejected(monkeypatch):
+    monkeypatch.setenv("LATENCY_BUCKETS_MS", "5,1,10")
+    with pytest.raises(ValueError):
+        Settings()
+
+
+def test_disabled_telemetry_uses_noop_objects(monkeypatch):
+    import telemetry
+    from config import get_settings
+
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setattr(telemetry, "_state", None)
+    get_settings.cache_clear()
+    try:
+        otel = telemetry.get_telemetry()
+        with otel.tracer.start_as_current_span("predict_span") as span:
+            assert not span.is_recording()
+        otel.latency_hist.record(1.0)
+        assert telemetry.telemetry_stats() == {"exporter": "disabled"}
+    finally:
+        monkeypatch.undo()
+        get_settings.cache_clear()
+
+
+def test_startup_bench_parses_importtime():
+    from startup_bench import import_profile, summarize
+
+    rows = import_profile("config")
+    report = summarize(rows, "config")
+    # Which modules are slowest varies from run to run; the parse does not
+    (top,) = [r for r in rows if r["module"] == "config" and r["depth"] == 0]
+    assert report["total_ms"] == round(top["cumulative_us"] / 1000, 1) > 0
+    assert report["modules_imported"] == len(rows)
+    assert 0 < len(report["slowest"]) <= 10
+
+
+def test_red_metrics_exported_through_otel():
+    from opentelemetry.sdk.metrics import MeterProvider
+    from red_metrics import REDMetrics, register_otel
+
+    red = REDMetrics()
+    red.record("GET", "/health", 200, 0.002, 0, 15)
+    reader = InMemoryMetricReader()
+    register_otel(MeterProvider(metric_readers=[reader]).get_meter("t"), red)
+
+    metrics = {
+        m.name: m.data.data_points
+        for rm in reader.get_metrics_data().resource_metrics
+        for sm in rm.scope_metrics
+        for m in sm.metrics
+    }
+    (point,) = metrics["http.server.requests"]
+    assert point.value == 1
+    assert point.attributes["http.route"] == "/health"
+    assert metrics["http.server.response.body.size_sum"][0].value == 15
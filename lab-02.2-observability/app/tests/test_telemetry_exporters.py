@@ -0,0 +1,153 @@
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    InMemoryMetricReader,
+    PeriodicExportingMetricReader,
+)
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from config import Settings
+from telemetry_exporters import (
+    REJECTED,
+    RETRY,
+    SENT,
+    FileSpool,
+    LocalCollector,
+    RingBufferSpanExporter,
+    SpoolingMetricExporter,
+    SpoolingSpanExporter,
+    make_metric_reader,
+    make_span_exporter,
+)
+
+
+@pytest.fixture
+def collector():
+    with LocalCollector() as c:
+        yield c
+
+
+def _tracer(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider.get_tracer("test")
+
+
+def test_ring_buffer_is_bounded_and_counts_evictions():
+    exporter = RingBufferSpanExporter(max_spans=3)
+    tracer = _tracer(exporter)
+    for i in range(5):
+        with tracer.start_as_current_span(f"s{i}"):
+            pass
+
+    assert [s.name for s in exporter.get_finished_spans()] == ["s2", "s3", "s4"]
+    assert exporter.stats() == {
+        "buffered_spans": 3,
+        "max_spans": 3,
+        "exported": 5,
+        "dropped": 2,
+    }
+
+
+def test_spool_replays_after_collector_outage(collector, tmp_path):
+    exporter = SpoolingSpanExporter(collector.endpoint, str(tmp_path), 1 << 20)
+    tracer = _tracer(exporter)
+
+    collector.available = False
+    for _ in range(3):
+        with tracer.start_as_current_span("during-outage"):
+            pass
+    assert collector.spans == 0
+    assert exporter.stats()["pending_batches"] == 3
+
+    collector.available = True
+    with tracer.start_as_current_span("after-recovery"):
+        pass
+
+    assert collector.spans == 4
+    stats = exporter.stats()
+    assert stats["pending_batches"] == 0
+    assert stats["replayed"] == 3
+    assert stats["dropped"] == 0
+
+
+def test_spool_survives_restart(tmp_path):
+    FileSpool(str(tmp_path), 1024).put(b"batch")
+    reopened = FileSpool(str(tmp_path), 1024)
+    assert reopened.stats()["pending_bytes"] == 5
+
+    sent = []
+    assert reopened.replay(lambda body: sent.append(body) or SENT) == 1
+    assert sent == [b"batch"]
+
+
+def test_spool_drops_oldest_when_full(tmp_path):
+    spool = FileSpool(str(tmp_path), max_bytes=10)
+    for body in (b"aaaa", b"bbbb", b"cccc"):
+        assert spool.put(body)
+    assert spool.put(b"x" * 11) is False
+
+    stats = spool.stats()
+    assert stats["pending_bytes"] == 8
+    assert stats["dropped"] == 2
+    sent = []
+    spool.replay(lambda body: sent.append(body) or SENT)
+    assert sent == [b"bbbb", b"cccc"]
+
+
+def test_rejected_batch_is_dropped_not_spooled(collector, tmp_path):
+    exporter = SpoolingSpanExporter(collector.endpoint, str(tmp_path), 1 << 20)
+    tracer = _tracer(exporter)
+
+    collector.reject = True
+    with tracer.start_as_current_span("malformed"):
+        pass
+    stats = exporter.stats()
+    assert stats["rejected"] == 1
+    assert stats["spooled"] == 0 and stats["pending_batches"] == 0
+
+
+def test_replay_skips_rejected_batches_and_stops_on_retry(tmp_path):
+    spool = FileSpool(str(tmp_path), 1024)
+    for body in (b"good", b"bad", b"later", b"last"):
+        spool.put(body)
+
+    outcomes = {b"good": SENT, b"bad": REJECTED, b"later": RETRY}
+    assert spool.replay(outcomes.get) == 1
+    # The rejected batch is gone; the one that hit a retryable error is
+    # still at the head of the spool
+    stats = spool.stats()
+    assert stats["pending_batches"] == 2 and stats["replayed"] == 1
+
+    sent = []
+    assert spool.replay(lambda body: sent.append(body) or SENT) == 2
+    assert sent == [b"later", b"last"]
+
+
+def test_spool_metric_exporter_delivers(collector, tmp_path):
+    exporter = SpoolingMetricExporter(collector.endpoint, str(tmp_path), 1 << 20)
+    reader = PeriodicExportingMetricReader(exporter, export_interval_millis=60_000)
+    provider = MeterProvider(metric_readers=[reader])
+    provider.get_meter("test").create_counter("requests").add(1)
+    provider.force_flush()
+
+    assert collector.metric_requests >= 1
+    assert exporter.stats()["sent"] >= 1
+    provider.shutdown()
+
+
+@pytest.mark.parametrize(
+    "kind, span_type, reader_type",
+    [
+        ("memory", RingBufferSpanExporter, InMemoryMetricReader),
+        ("spool", SpoolingSpanExporter, PeriodicExportingMetricReader),
+        ("none", type(None), type(None)),
+    ],
+)
+def test_exporter_selected_by_setting(monkeypatch, tmp_path, kind, span_type, reader_type):
+    monkeypatch.setenv("OTEL_EXPORTER", kind)
+    monkeypatch.setenv("OTEL_SPOOL_DIR", str(tmp_path))
+    settings = Settings()
+    assert isinstance(make_span_exporter(settings), span_type)
+    assert isinstance(make_metric_reader(settings), reader_type)
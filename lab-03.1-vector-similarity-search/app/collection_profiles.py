@@ -0,0 +1,135 @@
+"""
+Collection storage profiles for the Qdrant backend.
+
+A profile decides where vectors live and how they are compressed:
+
+- default:    float32 vectors, HNSW graph and payloads in RAM (the original setup)
+- int8:       scalar int8 quantization kept in RAM (4x smaller), float32
+              originals on disk; top candidates are rescored against them
+- binary:     1 bit per dimension in RAM (32x smaller), originals on disk,
+              heavier oversampling. Recall drops on small models; it pays
+              off mostly for 768+ dimensions
+- on_disk:    float32 vectors, HNSW graph and payloads all memory-mapped
+              from disk; RAM is only page cache
+- low_memory: int8 in RAM, everything else on disk, sparser graph (m=8)
+
+Profiles only apply when a collection is created. Changing one means
+ingesting into a new collection name.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Optional
+
+from qdrant_client.http import models as rest
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    quantization: Optional[str] = None  # None | "int8" | "binary"
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    on_disk_hnsw: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    # Query time: HNSW beam width (None = Qdrant default) and, for quantized
+    # profiles, how many extra candidates to rescore with full vectors
+    search_hnsw_ef: Optional[int] = None
+    rescore: bool = True
+    oversampling: float = 1.0
+    # Force HNSW on small collections (benchmarks); None keeps Qdrant defaults
+    indexing_threshold_kb: Optional[int] = None
+    full_scan_threshold_kb: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    p.name: p
+    for p in (
+        CollectionProfile("default"),
+        CollectionProfile("int8", quantization="int8", on_disk_vectors=True, oversampling=2.0),
+        CollectionProfile("binary", quantization="binary", on_disk_vectors=True, oversampling=3.0),
+        CollectionProfile("on_disk", on_disk_vectors=True, on_disk_payload=True, on_disk_hnsw=True),
+        CollectionProfile(
+            "low_memory",
+            quantization="int8",
+            on_disk_vectors=True,
+            on_disk_payload=True,
+            on_disk_hnsw=True,
+            hnsw_m=8,
+            oversampling=2.0,
+        ),
+    )
+}
+
+
+def get_profile(name: str, **overrides: Any) -> CollectionProfile:
+    """Built-in profile by name; `overrides` that are None are ignored."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile {name!r} (one of {', '.join(PROFILES)})")
+    return replace(PROFILES[name], **{k: v for k, v in overrides.items() if v is not None})
+
+
+def create_collection_kwargs(profile: CollectionProfile, vector_size: int) -> Dict[str, Any]:
+    """Arguments for QdrantClient.create_collection, minus the collection name."""
+    kwargs: Dict[str, Any] = {
+        "vectors_config": rest.VectorParams(
+            size=vector_size,
+            distance=rest.Distance.COSINE,
+            on_disk=profile.on_disk_vectors or None,
+        ),
+        "on_disk_payload": profile.on_disk_payload or None,
+        "hnsw_config": rest.HnswConfigDiff(
+            m=profile.hnsw_m,
+            ef_construct=profile.hnsw_ef_construct,
+            on_disk=profile.on_disk_hnsw or None,
+            full_scan_threshold=profile.full_scan_threshold_kb,
+        ),
+    }
+    if profile.quantization == "int8":
+        kwargs["quantization_config"] = rest.ScalarQuantization(
+            scalar=rest.ScalarQuantizationConfig(
+                type=rest.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    elif profile.quantization == "binary":
+        kwargs["quantization_config"] = rest.BinaryQuantization(
+            binary=rest.BinaryQuantizationConfig(always_ram=True)
+        )
+    elif profile.quantization is not None:
+        raise ValueError(f"Unknown quantization {profile.quantization!r} (int8|binary)")
+    if profile.indexing_threshold_kb is not None:
+        kwargs["optimizers_config"] = rest.OptimizersConfigDiff(
+            indexing_threshold=profile.indexing_threshold_kb
+        )
+    return kwargs
+
+
+def search_params(profile: CollectionProfile) -> Optional[rest.SearchParams]:
+    quantization = None
+    if profile.quantization is not None:
+        quantization = rest.QuantizationSearchParams(
+            rescore=profile.rescore, oversampling=profile.oversampling
+        )
+    if quantization is None and profile.search_hnsw_ef is None:
+        return None
+    return rest.SearchParams(hnsw_ef=profile.search_hnsw_ef, quantization=quantization)
+
+
+def estimate_memory(profile: CollectionProfile, points: int, dim: int) -> Dict[str, int]:
+    """
+    Rough RAM vs disk bytes, from Qdrant's storage layout: float32 vectors
+    (4 B/dim), int8 codes (1 B/dim), binary codes (1 bit/dim), and HNSW
+    level-0 links (2*m ids of 4 B per point). Payloads are not included.
+    """
+    full = points * dim * 4
+    codes = {"int8": points * dim, "binary": points * ((dim + 7) // 8)}.get(
+        profile.quantization or "", 0
+    )
+    graph = points * profile.hnsw_m * 2 * 4
+    ram = codes + (0 if profile.on_disk_vectors else full) + (0 if profile.on_disk_hnsw else graph)
+    disk = full + codes + graph
+    return {"ram_bytes": ram, "disk_bytes": disk}
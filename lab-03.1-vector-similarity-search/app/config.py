@@ -1,5 +1,10 @@
+from pathlib import Path
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
+DATA_DIR = Path(__file__).parent / "data"
+
 
 class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
@@ -7,13 +12,77 @@ class Settings(BaseSettings):
 
     qdrant_url: str = "http://localhost:6333"
     qdrant_collection: str = "runbooks"
+    # gRPC for points traffic (upserts, queries); collection admin stays on REST
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
+    # Upserts: points per request, parallel requests, retries with
+    # exponential backoff starting at backoff_s
+    qdrant_upsert_batch_size: int = 128
+    qdrant_upsert_workers: int = 4
+    qdrant_upsert_retries: int = 3
+    qdrant_upsert_backoff_s: float = 0.2
+    # Storage profile used when the collection is created (see
+    # app/collection_profiles.py): default | int8 | binary | on_disk | low_memory.
+    # The tuning knobs below override the profile when set.
+    collection_profile: str = "default"
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_hnsw_ef: Optional[int] = None
+    quantization_oversampling: Optional[float] = None
+
+    # Vector backend: "qdrant" or "local" (in-process NumPy index; persisted
+    # under local_store_dir when set, RAM-only otherwise)
+    vector_backend: str = "qdrant"
+    local_store_dir: str = ""
+    # Exact search below this many points, IVF (nprobe lists per query) above
+    local_ivf_min_points: int = 50_000
+    local_ivf_nprobe: int = 8
 
     # Small + popular; good quality; downloads on first run.
     embed_model: str = "sentence-transformers/all-MiniLM-L6-v2"
 
+    # Query embedding cache: in-memory LRU (0 disables the cache), optional
+    # memory-mapped disk tier when embed_cache_dir is set, TTL 0 = no expiry
+    embed_cache_size: int = 10_000
+    embed_cache_ttl_s: float = 0.0
+    embed_cache_dir: str = ""
+    embed_cache_disk_items: int = 100_000
+    # Fold case in cache keys; unset follows the model's tokenizer
+    # (do_lower_case), so cased models never share entries across case
+    embed_cache_casefold: Optional[bool] = None
+
+    # /search micro-batching: concurrent queries wait up to max_wait_ms to
+    # share one model.encode call (max_size 1 disables it)
+    query_batch_max_size: int = 32
+    query_batch_max_wait_ms: float = 2.0
+
+    # /search retrieval: "vector", "lexical" (BM25) or "hybrid" (both, fused
+    # with reciprocal rank fusion). Requests can override mode and budget.
+    search_mode: str = "vector"
+    search_candidates: int = 50
+    rrf_k: int = 60
+    # BM25 index kept next to the vectors; empty means
+    # "<data dir>/<collection>.bm25.sqlite"
+    lexical_index_path: str = ""
+    # Optional cross-encoder over the top rerank_top_n candidates, e.g.
+    # "cross-encoder/ms-marco-MiniLM-L-6-v2" (empty disables reranking)
+    rerank_model: str = ""
+    rerank_top_n: int = 20
+    # Latency budget per search; reranking is cut to fit (0 = no limit)
+    search_budget_ms: float = 0.0
+
+    # Streaming ingest: JSON array or JSONL, read incrementally
+    runbooks_path: str = str(DATA_DIR / "runbooks.json")
+    ingest_batch_size: int = 256
+    # Records committed so far; empty means "<runbooks_path>.checkpoint.json"
+    ingest_checkpoint_path: str = ""
+    # doc_id -> content hash of what is in the collection; empty means
+    # "<data dir>/<collection>.index.sqlite"
+    ingest_index_path: str = ""
+
     class Config:
         env_prefix = ""
         case_sensitive = False
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
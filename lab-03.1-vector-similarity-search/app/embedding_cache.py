@@ -0,0 +1,238 @@
+"""
+Two-tier cache for query embeddings.
+
+Tier 1 is an in-process LRU of float32 vectors. Tier 2 is a fixed-capacity
+memory-mapped file that survives restarts: a vectors matrix plus a
+key/timestamp table, filled as a ring so the oldest entry is overwritten
+when full (one writer process per directory). Keys hash the model name with the
+normalized text, so "Pod  CrashLoop" and "Pod CrashLoop" share an entry and
+two models never do. Case is folded only when the model lowercases its input
+itself (uncased tokenizers such as all-MiniLM-L6-v2's); for a cased model
+"OOMKilled" and "oomkilled" embed differently, so they keep separate entries.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_WS = re.compile(r"\s+")
+
+KEY_BYTES = 16
+# Raw key bytes (an "S" field would strip trailing NULs) and write time; ts 0 = empty slot
+_META_DTYPE = np.dtype([("key", "u1", (KEY_BYTES,)), ("ts", "<f8")])
+
+
+def normalize_text(text: str, casefold: bool = False) -> str:
+    """
+    NFKC and collapse whitespace; casefold only for models whose output does
+    not depend on case, or two queries would share one model's vector.
+    """
+    text = _WS.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return text.casefold() if casefold else text
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    return hashlib.blake2b(
+        f"{model_name}\0{text}".encode("utf-8"), digest_size=KEY_BYTES
+    ).digest()
+
+
+class LRUCache:
+    def __init__(self, max_items: int, ttl_s: float = 0.0):
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self._items: "OrderedDict[bytes, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            vector, stored_at = item
+            if self.ttl_s and time.monotonic() - stored_at > self.ttl_s:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        with self._lock:
+            self._items[key] = (vector, time.monotonic())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class DiskCache:
+    """
+    Memory-mapped vector store: `vectors.f32` is (capacity, dim) float32 and
+    `meta.bin` holds (key, unix time) per slot. Lookups go through a dict
+    rebuilt from meta.bin on open; reads are served straight from the
+    mapping, so a hit costs a page-cache read instead of a forward pass.
+    """
+
+    def __init__(self, directory: Path, dim: int, capacity: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._vectors = self._open(directory / "vectors.f32", np.float32, (capacity, dim))
+        self._meta = self._open(directory / "meta.bin", _META_DTYPE, (capacity,))
+        self._slots: Dict[bytes, int] = {
+            self._meta["key"][i].tobytes(): int(i) for i in np.flatnonzero(self._meta["ts"])
+        }
+        # Oldest slot first: continue the ring where the previous process stopped
+        self._next = int(np.argmin(self._meta["ts"])) if capacity else 0
+
+    @staticmethod
+    def _open(path: Path, dtype, shape) -> np.memmap:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not path.exists() or path.stat().st_size != size:
+            return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def get(self, key: bytes, ttl_s: float = 0.0) -> Optional[np.ndarray]:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return None
+            if ttl_s and time.time() - self._meta["ts"][slot] > ttl_s:
+                return None
+            return np.array(self._vectors[slot])
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._next
+                self._next = (slot + 1) % self.capacity
+                if self._meta["ts"][slot]:
+                    self._slots.pop(self._meta["key"][slot].tobytes(), None)
+                self._slots[key] = slot
+            self._vectors[slot] = vector
+            self._meta["key"][slot] = np.frombuffer(key, dtype=np.uint8)
+            self._meta["ts"][slot] = time.time()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            self._meta.flush()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+class EmbeddingCache:
+    """
+    LRU in front of an optional disk tier. bind() is called by the
+    embedding model once it knows its name, output dimension and whether it
+    lowercases its input. `casefold` None follows the model; True/False
+    force it.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 10_000,
+        ttl_s: float = 0.0,
+        disk_dir: Optional[str] = None,
+        disk_capacity: int = 100_000,
+        casefold: Optional[bool] = None,
+    ):
+        self.memory = LRUCache(max_items, ttl_s)
+        self.ttl_s = ttl_s
+        self.disk_dir = disk_dir
+        self.disk_capacity = disk_capacity
+        self.casefold_setting = casefold
+        self.casefold = bool(casefold)
+        self.disk: Optional[DiskCache] = None
+        self.model_name = ""
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        # get() runs on request threads and the query batcher's thread
+        self._stats_lock = threading.Lock()
+
+    def bind(self, model_name: str, dim: int, lowercases: bool = False) -> None:
+        self.model_name = model_name
+        self.casefold = lowercases if self.casefold_setting is None else self.casefold_setting
+        if self.disk_dir and self.disk_capacity:
+            safe = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+            self.disk = DiskCache(Path(self.disk_dir) / f"{safe}-{dim}", dim, self.disk_capacity)
+
+    def key(self, text: str) -> bytes:
+        # Folded and unfolded entries never mix, even in a disk tier written
+        # by an earlier run with the other setting
+        namespace = f"{self.model_name}\0casefold" if self.casefold else self.model_name
+        return cache_key(namespace, normalize_text(text, self.casefold))
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        vector = self.memory.get(key)
+        if vector is not None:
+            with self._stats_lock:
+                self.hits_memory += 1
+            return vector
+        if self.disk is not None:
+            vector = self.disk.get(key, self.ttl_s)
+            if vector is not None:
+                with self._stats_lock:
+                    self.hits_disk += 1
+                self.memory.put(key, vector)
+                return vector
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        key = self.key(text)
+        # Own copy: `vector` is usually a row view of a larger batch
+        vector = np.array(vector, dtype=np.float32)
+        self.memory.put(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            hits_memory, hits_disk, misses = self.hits_memory, self.hits_disk, self.misses
+        lookups = hits_memory + hits_disk + misses
+        return {
+            "hits_memory": hits_memory,
+            "hits_disk": hits_disk,
+            "misses": misses,
+            "hit_ratio": round((lookups - misses) / lookups, 4) if lookups else 0.0,
+            "casefold": self.casefold,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
+
+
+def split_hits(
+    cache: Optional[EmbeddingCache], texts: List[str]
+) -> Tuple[Dict[int, np.ndarray], List[int]]:
+    """Cached vectors by position, and the positions that must be encoded."""
+    if cache is None:
+        return {}, list(range(len(texts)))
+    hits: Dict[int, np.ndarray] = {}
+    misses: List[int] = []
+    for i, text in enumerate(texts):
+        vector = cache.get(text)
+        if vector is None:
+            misses.append(i)
+        else:
+            hits[i] = vector
+    return hits, misses
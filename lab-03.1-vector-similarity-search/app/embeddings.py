@@ -1,15 +1,42 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from app.embedding_cache import EmbeddingCache, split_hits
+
+
+def lowercases_input(model) -> bool:
+    """
+    True when the model lowercases text before tokenizing (an uncased
+    tokenizer, or sentence-transformers' own do_lower_case), so the case of
+    a query never changes its embedding.
+    """
+    if getattr(getattr(model, "tokenizer", None), "do_lower_case", False):
+        return True
+    first = model._first_module() if hasattr(model, "_first_module") else None
+    return bool(getattr(first, "do_lower_case", False))
+
 
 class EmbeddingModel:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, cache: Optional[EmbeddingCache] = None):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        self.cache = cache
+        if cache is not None:
+            cache.bind(model_name, self.dim, lowercases=lowercases_input(self.model))
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        (len(texts), dim) C-contiguous float32. Vectors stay in NumPy all the
+        way to the store; no per-float Python objects are created.
+        """
         # normalize_embeddings improves cosine similarity behavior
         vectors = self.model.encode(
             texts,
@@ -17,9 +44,24 @@ class EmbeddingModel:
             convert_to_numpy=True,
             show_progress_bar=False,
         )
-        if not isinstance(vectors, np.ndarray):
-            vectors = np.asarray(vectors)
-        return vectors.astype("float32").tolist()
+        # No copy when the encoder already returned contiguous float32
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        """Search queries: served from the cache when possible, misses encoded together."""
+        hits, misses = split_hits(self.cache, texts)
+        if not hits:
+            out = self.embed_texts(texts)
+        else:
+            out = np.empty((len(texts), self.dim), dtype=np.float32)
+            for i, vector in hits.items():
+                out[i] = vector
+            if misses:
+                out[misses] = self.embed_texts([texts[i] for i in misses])
+        if self.cache is not None:
+            for i in misses:
+                self.cache.put(texts[i], out[i])
+        return out
 
-    def embed_one(self, text: str) -> List[float]:
-        return self.embed_texts([text])[0]
\ No newline at end of file
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed_queries([text])[0]
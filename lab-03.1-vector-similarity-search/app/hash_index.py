@@ -0,0 +1,101 @@
+"""
+Content-hash index for incremental re-ingestion.
+
+One SQLite row per runbook: doc_id -> hash of the fields that feed the
+embedding and payload. Ingest compares against it to embed only new or
+changed runbooks, and the `seen` flag marks which doc_ids the current pass
+found, so anything left unseen at the end was removed from the source.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Fixed namespace: the same doc_id maps to the same point id on every host
+POINT_ID_NAMESPACE = uuid.UUID("8c5e3b1e-4f0c-5a7e-9a63-2f1d0b6c9e41")
+
+HASHED_FIELDS = ("title", "service", "severity", "content")
+
+
+def point_id(doc_id: str) -> str:
+    """Stable Qdrant point id (UUIDv5) for a runbook id."""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, doc_id))
+
+
+def content_hash(rb: Dict, salt: str = "") -> str:
+    """
+    sha256 over the hashed fields. `salt` is the embedding model name, so
+    switching models invalidates every stored hash.
+    """
+    body = json.dumps([salt] + [rb.get(f) for f in HASHED_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class HashIndex:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Written from the ingest upsert thread, read from the request thread
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " doc_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, seen INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def lookup(self, doc_ids: List[str]) -> Dict[str, str]:
+        if not doc_ids:
+            return {}
+        marks = ",".join("?" * len(doc_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id, content_hash FROM docs WHERE doc_id IN ({marks})", doc_ids
+            ).fetchall()
+        return dict(rows)
+
+    def start_pass(self) -> None:
+        """Begin a full pass over the source: nothing has been seen yet."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE docs SET seen = 0")
+
+    def mark_seen(self, doc_ids: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE docs SET seen = 1 WHERE doc_id = ?", ((d,) for d in doc_ids)
+            )
+
+    def record(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Store (doc_id, content_hash) once the vectors are committed."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO docs (doc_id, content_hash, seen) VALUES (?, ?, 1) "
+                "ON CONFLICT(doc_id) DO UPDATE SET content_hash = excluded.content_hash, seen = 1",
+                rows,
+            )
+
+    def unseen(self, batch_size: int = 1000) -> Iterator[List[str]]:
+        """doc_ids not seen by the current pass, in batches."""
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT doc_id FROM docs WHERE seen = 0")]
+        for i in range(0, len(ids), batch_size):
+            yield ids[i : i + batch_size]
+
+    def remove(self, doc_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM docs WHERE doc_id = ?", ((d,) for d in doc_ids))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM docs")
+
+    def close(self) -> None:
+        self._conn.close()
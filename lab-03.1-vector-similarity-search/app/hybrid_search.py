@@ -0,0 +1,170 @@
+"""
+Hybrid retrieval for /search: BM25 + dense vectors, fused with reciprocal
+rank fusion (RRF), then an optional cross-encoder rerank of the head.
+
+Modes:
+
+- vector:  the vector store only (scores are cosine similarities)
+- lexical: the BM25 index only (no query embedding at all)
+- hybrid:  `candidates` hits from each, fused by RRF: a document scores
+           sum(1 / (rrf_k + rank)) over the lists it appears in, so neither
+           retriever's raw score scale matters
+
+Reranking runs a cross-encoder over (query, title + content) pairs for the
+top `rerank_top_n` candidates; reranked hits take the cross-encoder score.
+It is the expensive stage, so it is the one the per-request latency budget
+trims: given the time already spent on retrieval and the measured cost per
+pair of earlier calls, it reranks only as many candidates as fit.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.ingest_pipeline import runbook_text
+from app.lexical_index import BM25Index
+from app.vector_store import VectorStore
+
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+
+def rrf_fuse(rankings: Sequence[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """Merge ranked hit lists by id; the first list's payload wins for duplicates."""
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for hits in rankings:
+        for rank, hit in enumerate(hits, start=1):
+            key = str(hit["id"])
+            entry = fused.setdefault(key, {**hit, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda h: h["score"], reverse=True)
+
+
+class CrossEncoderReranker:
+    """sentence-transformers CrossEncoder, imported only when configured."""
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = CrossEncoder(model_name)
+        self._lock = threading.Lock()
+        # Moving average of the cost of one (query, document) pair
+        self.ms_per_pair: Optional[float] = None
+        self.calls = 0
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        t0 = time.perf_counter()
+        scores = self.model.predict(
+            [(query, t) for t in texts], batch_size=self.batch_size, show_progress_bar=False
+        )
+        per_pair = (time.perf_counter() - t0) * 1000.0 / max(len(texts), 1)
+        with self._lock:
+            self.calls += 1
+            self.ms_per_pair = (
+                per_pair if self.ms_per_pair is None else 0.8 * self.ms_per_pair + 0.2 * per_pair
+            )
+        return np.asarray(scores, dtype=np.float32)
+
+    def affordable(self, remaining_ms: float) -> int:
+        """Pairs that fit in `remaining_ms`; unbounded until the first call is measured."""
+        if self.ms_per_pair is None:
+            return 1 << 30
+        return max(int(remaining_ms / self.ms_per_pair), 0)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "ms_per_pair": round(self.ms_per_pair, 3) if self.ms_per_pair is not None else None,
+        }
+
+
+class HybridSearcher:
+    def __init__(
+        self,
+        store: VectorStore,
+        lexical: BM25Index,
+        embed: Callable[[str], np.ndarray],
+        reranker: Optional[CrossEncoderReranker] = None,
+        rrf_k: int = 60,
+    ):
+        self.store = store
+        self.lexical = lexical
+        self.embed = embed
+        self.reranker = reranker
+        self.rrf_k = rrf_k
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        mode: str = "vector",
+        candidates: int = 50,
+        rerank_top_n: int = 0,
+        budget_ms: Optional[float] = None,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        {"hits", "reranked", "timings_ms"}. `score_threshold` applies to the
+        vector retriever's cosine scores; `budget_ms` (None or 0 = no limit)
+        caps how many candidates are reranked.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r} ({'|'.join(SEARCH_MODES)})")
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        rerank_top_n = rerank_top_n if self.reranker is not None else 0
+        # Single-retriever modes still fetch enough candidates for the reranker
+        depth = max(limit, rerank_top_n, candidates if mode == "hybrid" else 0)
+
+        rankings: List[List[Dict[str, Any]]] = []
+        if mode in ("vector", "hybrid"):
+            t0 = time.perf_counter()
+            qvec = self.embed(query)
+            timings["embed"] = (time.perf_counter() - t0) * 1000.0
+            t0 = time.perf_counter()
+            rankings.append(
+                self.store.search(
+                    qvec, limit=depth, score_threshold=score_threshold, filters=filters
+                )
+            )
+            timings["vector"] = (time.perf_counter() - t0) * 1000.0
+        if mode in ("lexical", "hybrid"):
+            t0 = time.perf_counter()
+            rankings.append(self.lexical.search(query, limit=depth, filters=filters))
+            timings["lexical"] = (time.perf_counter() - t0) * 1000.0
+
+        hits = rrf_fuse(rankings, k=self.rrf_k) if mode == "hybrid" else rankings[0]
+
+        reranked = min(rerank_top_n, len(hits))
+        if budget_ms and reranked:
+            spent = (time.perf_counter() - start) * 1000.0
+            reranked = min(reranked, self.reranker.affordable(budget_ms - spent))
+        if reranked:
+            # Even a single pair is scored, so every reranked hit carries a
+            # cross-encoder score
+            t0 = time.perf_counter()
+            head = hits[:reranked]
+            scores = self.reranker.score(query, [runbook_text(h["payload"]) for h in head])
+            order = np.argsort(-scores, kind="stable")
+            hits = [{**head[i], "score": float(scores[i])} for i in order] + hits[reranked:]
+            timings["rerank"] = (time.perf_counter() - t0) * 1000.0
+
+        timings["total"] = (time.perf_counter() - start) * 1000.0
+        return {
+            "hits": hits[:limit],
+            "reranked": reranked,
+            "timings_ms": {k: round(v, 2) for k, v in timings.items()},
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "lexical_index": self.lexical.describe(),
+            "reranker": self.reranker.describe() if self.reranker is not None else None,
+            "rrf_k": self.rrf_k,
+        }
@@ -0,0 +1,330 @@
+"""
+Streaming ingest: runbooks are read incrementally (JSON array or JSONL),
+embedded in batches, and each batch is upserted on a background thread
+while the next one is being embedded. After every committed batch the
+record count is written to a checkpoint file, so a failed run resumes
+where it stopped instead of starting over.
+
+Ingest is incremental: point ids are derived from doc_id, a content-hash
+index (hash_index.HashIndex) skips runbooks whose text did not change, and
+runbooks missing from the source are deleted at the end of a full pass.
+The optional BM25 index (lexical_index.BM25Index) is kept in step with the
+vector store: same point ids, written after each committed batch.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.hash_index import HashIndex, content_hash, point_id
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_CHARS = 1 << 16
+_decoder = json.JSONDecoder()
+
+
+def _skip_ws(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _iter_json_array(fh, chunk_chars: int) -> Iterator[Dict[str, Any]]:
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    buf = fh.read(chunk_chars)
+    pos = _skip_ws(buf, 0) + 1  # past "["
+    eof = False
+    while True:
+        pos = _skip_ws(buf, pos)
+        if pos < len(buf) and buf[pos] == ",":
+            pos = _skip_ws(buf, pos + 1)
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("need more data", buf, pos)
+            obj, pos = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("Truncated or malformed JSON array") from None
+            more = fh.read(chunk_chars)
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield obj
+
+
+def iter_runbooks(path: Path, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[Dict[str, Any]]:
+    """Records from a JSON array (runbooks.json) or JSONL file, one at a time."""
+    with open(path, "r", encoding="utf-8") as fh:
+        head = fh.read(chunk_chars)
+        fh.seek(0)
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(fh, chunk_chars)
+            return
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def runbook_text(rb: Dict[str, Any]) -> str:
+    return f"{rb['title']}\n{rb['content']}"
+
+
+def runbook_payload(rb: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": rb["title"],
+        "service": rb["service"],
+        "severity": rb["severity"],
+        "content": rb["content"],
+        "doc_id": rb["id"],
+    }
+
+
+class Checkpoint:
+    """
+    Number of leading records already upserted from one source file. The
+    file's size and mtime are stored with it; if the source changed the
+    checkpoint is ignored.
+    """
+
+    def __init__(self, path: Path, source: Path):
+        self.path = path
+        st = source.stat()
+        self.source = {"source": str(source), "size": st.st_size, "mtime": st.st_mtime}
+
+    def load(self) -> int:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return 0
+        if any(data.get(k) != v for k, v in self.source.items()):
+            return 0
+        return int(data.get("done", 0))
+
+    def save(self, done: int) -> None:
+        # Unique per writer, so a concurrent save never replaces our temp file
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({**self.source, "done": done}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class PointBatch:
+    ids: List[str]
+    # (n, dim) float32 straight from the encoder; never converted to lists here
+    vectors: np.ndarray
+    payloads: List[Dict[str, Any]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class IngestStats:
+    scanned: int = 0
+    inserted: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    resumed_from: int = 0
+    batches: int = 0
+    embed_s: float = 0.0
+    upsert_s: float = 0.0
+    elapsed_s: float = 0.0
+    # Unchanged runbooks added to a BM25 index that was rebuilt (no embedding)
+    lexical_rebuilt: int = 0
+
+    @property
+    def docs_per_s(self) -> float:
+        return self.scanned / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "docs_per_s": round(self.docs_per_s, 1)}
+
+
+# One ingest at a time: a second run's start_pass() would reset the "seen"
+# marks of a run in progress, whose sweep would then delete live runbooks
+_ingest_lock = threading.Lock()
+
+
+def run_ingest(
+    source: Path,
+    embedder,
+    store,
+    index: HashIndex,
+    batch_size: int = 256,
+    checkpoint_path: Optional[Path] = None,
+    resume: bool = True,
+    hash_salt: str = "",
+    on_progress: Optional[Callable[[IngestStats], None]] = None,
+    lexical=None,
+) -> IngestStats:
+    """
+    Bring the store in line with `source`. Only new or changed runbooks are
+    embedded and upserted; at most one upsert is in flight, so batch N is
+    written while batch N+1 is embedded and memory stays bounded to two
+    batches regardless of corpus size. Once the whole file has been read,
+    runbooks that are no longer in it are deleted.
+
+    `hash_salt` should be the embedding model name so a model change
+    re-embeds everything. A `lexical` index that is behind the hash index
+    (new, or lost) is rebuilt from the source records alone; the vectors are
+    left as they are. Concurrent calls run one after another.
+    """
+    with _ingest_lock:
+        return _run_ingest(
+            source,
+            embedder,
+            store,
+            index,
+            batch_size=batch_size,
+            checkpoint_path=checkpoint_path,
+            resume=resume,
+            hash_salt=hash_salt,
+            on_progress=on_progress,
+            lexical=lexical,
+        )
+
+
+def _run_ingest(
+    source: Path,
+    embedder,
+    store,
+    index: HashIndex,
+    batch_size: int,
+    checkpoint_path: Optional[Path],
+    resume: bool,
+    hash_salt: str,
+    on_progress: Optional[Callable[[IngestStats], None]],
+    lexical,
+) -> IngestStats:
+    checkpoint = Checkpoint(
+        checkpoint_path or source.with_name(source.name + ".checkpoint.json"), source
+    )
+    resumed_from = checkpoint.load() if resume else 0
+    if store.count() < index.count():
+        # Points were lost (collection dropped or recreated): the hashes no
+        # longer describe what is stored, so rebuild from scratch.
+        index.clear()
+        if lexical is not None:
+            lexical.clear()
+        resumed_from = 0
+    rebuild_lexical = lexical is not None and lexical.count() < index.count()
+    if rebuild_lexical:
+        # Every record is needed to re-index, including the ones a resumed
+        # run would skip; unchanged ones are still not re-embedded.
+        lexical.clear()
+        resumed_from = 0
+    if not resumed_from:
+        index.start_pass()
+
+    stats = IngestStats(resumed_from=resumed_from)
+    start = time.perf_counter()
+
+    def upsert(points: Optional[PointBatch], hashes: List[Tuple[str, str]], done: int) -> None:
+        if points:
+            t0 = time.perf_counter()
+            store.upsert_vectors(points.ids, points.vectors, points.payloads)
+            stats.upsert_s += time.perf_counter() - t0
+            if lexical is not None:
+                lexical.add(points.ids, points.payloads)
+            # Only after the vectors are committed, so a failed batch is retried
+            index.record(hashes)
+            stats.inserted += len(points)
+        stats.batches += 1
+        stats.elapsed_s = time.perf_counter() - start
+        checkpoint.save(done)
+        logger.info(
+            "ingest: %d records scanned, %d embedded (%.0f docs/s)",
+            done,
+            stats.inserted,
+            stats.docs_per_s,
+        )
+        if on_progress is not None:
+            on_progress(stats)
+
+    records = iter_runbooks(source)
+    # Committed by the interrupted run: only record that they still exist
+    for batch in batched(islice(records, resumed_from), batch_size):
+        index.mark_seen([rb["id"] for rb in batch])
+
+    done = resumed_from
+    collection_ready = False
+    pending: Optional[Future] = None
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-upsert") as pool:
+        for batch in batched(records, batch_size):
+            hashes = {rb["id"]: content_hash(rb, hash_salt) for rb in batch}
+            known = index.lookup(list(hashes))
+            index.mark_seen(list(known))
+            changed = [rb for rb in batch if known.get(rb["id"]) != hashes[rb["id"]]]
+            stats.scanned += len(batch)
+            stats.unchanged += len(batch) - len(changed)
+            done += len(batch)
+            if rebuild_lexical and len(changed) < len(batch):
+                unchanged = [rb for rb in batch if known.get(rb["id"]) == hashes[rb["id"]]]
+                lexical.add(
+                    [point_id(rb["id"]) for rb in unchanged],
+                    [{**runbook_payload(rb), "content_hash": hashes[rb["id"]]} for rb in unchanged],
+                )
+                stats.lexical_rebuilt += len(unchanged)
+
+            points: Optional[PointBatch] = None
+            if changed:
+                t0 = time.perf_counter()
+                vectors = embedder.embed_texts([runbook_text(rb) for rb in changed])
+                stats.embed_s += time.perf_counter() - t0
+                if not collection_ready:
+                    store.ensure_collection(vectors.shape[1])
+                    collection_ready = True
+                points = PointBatch(
+                    ids=[point_id(rb["id"]) for rb in changed],
+                    vectors=vectors,
+                    payloads=[
+                        {**runbook_payload(rb), "content_hash": hashes[rb["id"]]} for rb in changed
+                    ],
+                )
+            if pending is not None:
+                pending.result()  # backpressure: never more than one batch queued
+            pending = pool.submit(
+                upsert, points, [(rb["id"], hashes[rb["id"]]) for rb in changed], done
+            )
+        if pending is not None:
+            pending.result()
+
+    for doc_ids in index.unseen():
+        ids = [point_id(d) for d in doc_ids]
+        store.delete_points(ids)
+        if lexical is not None:
+            lexical.remove(ids)
+        index.remove(doc_ids)
+        stats.deleted += len(doc_ids)
+
+    stats.elapsed_s = time.perf_counter() - start
+    checkpoint.clear()
+    return stats
@@ -0,0 +1,186 @@
+"""
+BM25 inverted index over runbook `title` and `content`.
+
+Dense vectors are good at paraphrases and weak at exact tokens: error
+codes, pod names, "OOMKilled". This index keeps one posting per
+(term, point id) in SQLite next to the vector store, keyed by the same
+point ids, so its hits can be fused with vector hits (app/hybrid_search.py).
+
+Tokens are lowercased alphanumeric runs. Compound tokens such as
+"api-gateway-7d9f" or "kube-system/coredns" are indexed whole and as
+their parts, and CamelCase words ("CrashLoopBackOff") also index their
+words, so both the exact string and its pieces match. Title terms count
+`title_weight` times.
+
+Payloads are stored alongside the postings, so lexical-only hits can be
+returned without a round trip to the vector store.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[-_.:/][A-Za-z0-9]+)*")
+_PART_RE = re.compile(r"[-_.:/]")
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i if in is it of on or the to what when "
+    "why with my our".split()
+)
+
+
+def _subwords(token: str) -> Iterator[str]:
+    parts = _PART_RE.split(token)
+    for part in parts:
+        words = _CAMEL_RE.findall(part) if part.isalpha() else []
+        if len(parts) > 1:
+            yield part
+        if len(words) > 1:
+            yield from words
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Search terms of `text`, in order, with repeats (term frequency counts them)."""
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        for term in (token, *_subwords(token)):
+            term = term.lower()
+            if len(term) > 1 and term not in STOPWORDS:
+                yield term
+
+
+class BM25Index:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        title_weight: int = 2,
+    ):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._lock = threading.Lock()
+        # Written from the ingest upsert thread, read from request threads
+        self._conn = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " point_id TEXT PRIMARY KEY, length INTEGER NOT NULL, payload TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, point_id TEXT NOT NULL, tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term, point_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_point ON postings (point_id);"
+        )
+        # Corpus statistics for the length normalization, kept in memory
+        self._docs, self._total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+
+    def count(self) -> int:
+        return self._docs
+
+    def _terms(self, payload: Dict[str, Any]) -> Counter:
+        terms = Counter(tokenize(str(payload.get("content", ""))))
+        for term in tokenize(str(payload.get("title", ""))):
+            terms[term] += self.title_weight
+        return terms
+
+    def _delete(self, point_ids: List[str]) -> None:
+        """Drop existing rows for these ids; caller holds the lock and transaction."""
+        for pid in point_ids:
+            row = self._conn.execute("SELECT length FROM docs WHERE point_id = ?", (pid,)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute("DELETE FROM postings WHERE point_id = ?", (pid,))
+            self._conn.execute("DELETE FROM docs WHERE point_id = ?", (pid,))
+            self._docs -= 1
+            self._total_length -= row[0]
+
+    def add(self, point_ids: List[str], payloads: List[Dict[str, Any]]) -> None:
+        """Index (or re-index) documents under the vector store's point ids."""
+        with self._lock, self._conn:
+            self._delete(point_ids)
+            for pid, payload in zip(point_ids, payloads):
+                terms = self._terms(payload)
+                length = sum(terms.values())
+                self._conn.execute(
+                    "INSERT INTO docs (point_id, length, payload) VALUES (?, ?, ?)",
+                    (pid, length, json.dumps(payload, ensure_ascii=False)),
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings (term, point_id, tf) VALUES (?, ?, ?)",
+                    ((term, pid, tf) for term, tf in terms.items()),
+                )
+                self._docs += 1
+                self._total_length += length
+
+    def remove(self, point_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._delete(point_ids)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self._docs, self._total_length = 0, 0
+
+    def search(
+        self, query: str, limit: int = 5, filters: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Hits as {"id", "score", "payload"}, best BM25 score first."""
+        terms = sorted(set(tokenize(query)))
+        if not terms or not self._docs:
+            return []
+        marks = ",".join("?" * len(terms))
+        with self._lock:
+            df = dict(
+                self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term",
+                    terms,
+                ).fetchall()
+            )
+            if not df:
+                return []
+            n, avgdl = self._docs, self._total_length / self._docs
+            # Okapi BM25 idf, always positive
+            idf = [(t, math.log(1.0 + (n - d + 0.5) / (d + 0.5))) for t, d in df.items()]
+            where, params = "", []
+            for field, value in (filters or {}).items():
+                where += " AND json_extract(d.payload, ?) = ?"
+                params += [f"$.{field}", value]
+            sql = (
+                f"WITH q(term, idf) AS (VALUES {','.join(['(?, ?)'] * len(idf))}) "
+                "SELECT d.point_id, d.payload,"
+                " SUM(q.idf * p.tf * (? + 1) / (p.tf + ? * (1 - ? + ? * d.length / ?))) AS score "
+                "FROM q JOIN postings p ON p.term = q.term "
+                "JOIN docs d ON d.point_id = p.point_id "
+                f"WHERE 1 = 1{where} "
+                "GROUP BY d.point_id ORDER BY score DESC LIMIT ?"
+            )
+            args = [x for pair in idf for x in pair]
+            args += [self.k1, self.k1, self.b, self.b, avgdl, *params, limit]
+            rows = self._conn.execute(sql, args).fetchall()
+        return [
+            {"id": pid, "score": float(score), "payload": json.loads(payload)}
+            for pid, payload, score in rows
+        ]
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path) if self.path else None,
+            "documents": self._docs,
+            "avg_length": round(self._total_length / self._docs, 1) if self._docs else 0.0,
+            "k1": self.k1,
+            "b": self.b,
+            "title_weight": self.title_weight,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,318 @@
+"""
+In-process vector store: no network hop, sub-millisecond search on small
+corpora.
+
+Vectors live in one (capacity, dim) float32 matrix, L2-normalized on write
+so cosine similarity is a dot product (what Qdrant's COSINE distance does).
+Search is an exact matrix-vector product until the collection reaches
+`ivf_min_points`; from then on an IVF index (k-means coarse quantizer,
+`nprobe` lists scanned per query) keeps it sublinear.
+
+`service` and `severity` are stored as integer codes per row, so filters
+are vectorized masks rather than payload scans.
+
+With a directory the matrix is a memory-mapped file (`vectors.f32`) and
+ids/payloads go to SQLite (`points.sqlite`), so restarts reuse the data
+without re-embedding. Without one, everything stays in RAM (tests, demos).
+Deleted rows are tombstoned, not compacted.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.vector_store import Vector, VectorStore
+
+FILTER_FIELDS = ("service", "severity")
+MIN_CAPACITY = 1024
+_ASSIGN_CHUNK = 65_536
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the rows present at build time. Rows written
+    later go to `tail` and are scanned exactly until the next rebuild.
+    """
+
+    def __init__(self, centroids: np.ndarray, lists: List[np.ndarray], indexed: int):
+        self.centroids = centroids
+        self.lists = lists
+        self.indexed = indexed
+        self.tail: List[int] = []
+
+    @classmethod
+    def build(
+        cls, vectors: np.ndarray, rows: np.ndarray, iterations: int = 10, seed: int = 0
+    ) -> "IVFIndex":
+        nlist = max(1, int(np.sqrt(len(rows))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(rows, size=min(len(rows), 64 * nlist), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        # Spherical k-means: vectors are unit length, so assign by dot product
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        assign = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), _ASSIGN_CHUNK):
+            chunk = rows[start : start + _ASSIGN_CHUNK]
+            assign[start : start + len(chunk)] = np.argmax(vectors[chunk] @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        lists = [rows[order[bounds[i] : bounds[i + 1]]] for i in range(nlist)]
+        return cls(centroids, lists, len(rows))
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.lists))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        parts = [self.lists[i] for i in probe]
+        if self.tail:
+            parts.append(np.asarray(self.tail, dtype=np.int64))
+        return np.unique(np.concatenate(parts))
+
+    def stale(self) -> bool:
+        return len(self.tail) > 0.1 * self.indexed
+
+
+class LocalVectorStore(VectorStore):
+    def __init__(
+        self,
+        directory: Optional[str],
+        collection: str,
+        ivf_min_points: int = 50_000,
+        nprobe: int = 8,
+    ):
+        self.collection = collection
+        self.ivf_min_points = ivf_min_points
+        self.nprobe = nprobe
+        self.dir = Path(directory) / collection if directory else None
+        self._lock = threading.RLock()
+
+        self.dim = 0
+        self._n = 0
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._codes = {f: np.zeros(0, dtype=np.int32) for f in FILTER_FIELDS}
+        self._vocab: Dict[str, Dict[Any, int]] = {f: {} for f in FILTER_FIELDS}
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._ivf: Optional[IVFIndex] = None
+
+        self._db: Optional[sqlite3.Connection] = None
+        if self.dir is not None:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.dir / "points.sqlite"), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS points ("
+                " row INTEGER PRIMARY KEY, point_id TEXT UNIQUE, payload TEXT, alive INTEGER)"
+            )
+            self._db.commit()
+            self._load()
+
+    # -- persistence -------------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> Path:
+        assert self.dir is not None
+        return self.dir / "vectors.f32"
+
+    def _load(self) -> None:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        if row is None:
+            return
+        self.dim = int(row[0])
+        capacity = self._vectors_path.stat().st_size // (4 * self.dim)
+        if capacity:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+        else:
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._grow_arrays(capacity)
+        for r, point_id, payload, alive in self._db.execute(
+            "SELECT row, point_id, payload, alive FROM points ORDER BY row"
+        ):
+            assert r == len(self._ids), "points table rows must be dense"
+            self._ids.append(point_id)
+            self._payloads.append(json.loads(payload))
+            self._rows[point_id] = r
+            self._set_row_meta(r, self._payloads[r], bool(alive))
+        self._n = len(self._ids)
+
+    def _reserve(self, needed: int) -> None:
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        capacity = max(MIN_CAPACITY, 2 * capacity, needed)
+        if self.dir is None:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[: self._n] = self._vectors[: self._n]
+            self._vectors = grown
+        else:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            with open(self._vectors_path, "r+b") as fh:
+                fh.truncate(capacity * self.dim * 4)
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+        self._grow_arrays(capacity)
+
+    def _grow_arrays(self, capacity: int) -> None:
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self._alive)] = self._alive
+        self._alive = alive
+        for f in FILTER_FIELDS:
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[: len(self._codes[f])] = self._codes[f]
+            self._codes[f] = codes
+
+    def _set_row_meta(self, row: int, payload: Dict[str, Any], alive: bool) -> None:
+        self._alive[row] = alive
+        for f in FILTER_FIELDS:
+            value = payload.get(f)
+            vocab = self._vocab[f]
+            self._codes[f][row] = -1 if value is None else vocab.setdefault(value, len(vocab))
+
+    # -- VectorStore -------------------------------------------------------
+
+    def ensure_collection(self, vector_size: int) -> None:
+        with self._lock:
+            if self.dim:
+                if self.dim != vector_size:
+                    raise ValueError(
+                        f"Collection '{self.collection}' exists with vector size {self.dim}, "
+                        f"but model produces {vector_size}. Use a new collection name."
+                    )
+                return
+            self.dim = vector_size
+            self._vectors = np.zeros((0, vector_size), dtype=np.float32)
+            if self._db is not None:
+                self._vectors_path.touch()
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(vector_size),)
+                    )
+
+    def upsert_vectors(
+        self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]
+    ) -> None:
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            if not self.dim:
+                raise ValueError(f"Collection '{self.collection}' does not exist")
+            rows = []
+            for point_id, payload in zip(ids, payloads):
+                row = self._rows.get(point_id)
+                if row is None:
+                    row = self._rows[point_id] = len(self._ids)
+                    self._ids.append(point_id)
+                    self._payloads.append(payload)
+                else:
+                    self._payloads[row] = payload
+                rows.append(row)
+            self._reserve(len(self._ids))
+
+            self._vectors[rows] = vectors
+            for row, payload in zip(rows, payloads):
+                self._set_row_meta(row, payload, True)
+            self._n = len(self._ids)
+            if self._ivf is not None:
+                self._ivf.tail.extend(rows)
+
+            if self._db is not None:
+                self._vectors.flush()
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO points VALUES (?, ?, ?, 1)",
+                        (
+                            (row, self._ids[row], json.dumps(self._payloads[row]))
+                            for row in dict.fromkeys(rows)
+                        ),
+                    )
+
+    def delete_points(self, ids: List[str]) -> None:
+        with self._lock:
+            rows = [self._rows[i] for i in ids if i in self._rows]
+            self._alive[rows] = False
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "UPDATE points SET alive = 0 WHERE row = ?", ((r,) for r in rows)
+                    )
+
+    def count(self) -> int:
+        return int(self._alive[: self._n].sum())
+
+    def build_index(self) -> None:
+        """(Re)build the IVF index over all live rows."""
+        with self._lock:
+            rows = np.flatnonzero(self._alive[: self._n])
+            self._ivf = IVFIndex.build(self._vectors, rows) if len(rows) else None
+
+    def _mask(self, n: int, filters: Optional[Dict[str, str]]) -> np.ndarray:
+        mask = self._alive[:n].copy()
+        for field, value in (filters or {}).items():
+            if field not in self._codes:
+                raise ValueError(f"Filtering on {field!r} is not supported (use {FILTER_FIELDS})")
+            code = self._vocab[field].get(value)
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= self._codes[field][:n] == code
+        return mask
+
+    def search(
+        self,
+        query_vector: Vector,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        with self._lock:
+            n = self._n
+            if n >= self.ivf_min_points and (self._ivf is None or self._ivf.stale()):
+                self.build_index()
+            vectors, ivf = self._vectors, self._ivf
+            mask = self._mask(n, filters)
+
+        if ivf is not None and n >= self.ivf_min_points:
+            rows = ivf.candidates(query, self.nprobe)
+            rows = rows[mask[rows]]
+        elif mask.all():
+            rows = None
+        else:
+            rows = np.flatnonzero(mask)
+        scores = vectors[:n] @ query if rows is None else vectors[rows] @ query
+        if rows is None:
+            rows = np.arange(n)
+
+        if score_threshold is not None:
+            keep = scores >= score_threshold
+            rows, scores = rows[keep], scores[keep]
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+
+        return [
+            {"id": self._ids[rows[i]], "score": float(scores[i]), "payload": self._payloads[rows[i]]}
+            for i in order
+        ]
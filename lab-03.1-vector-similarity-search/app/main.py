@@ -1,28 +1,110 @@
 from __future__ import annotations
 
-import json
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from app.config import settings
+from app.config import DATA_DIR, settings
+from app.embedding_cache import EmbeddingCache
 from app.embeddings import EmbeddingModel
-from app.qdrant_store import QdrantVectorStore
-from qdrant_client.http import models as rest
-
-DATA_PATH = Path(__file__).parent / "data" / "runbooks.json"
-
-app = FastAPI(title="Lab 03.1 - Vector Similarity Search API", version="1.0.0")
+from app.hash_index import HashIndex
+from app.hybrid_search import SEARCH_MODES, CrossEncoderReranker, HybridSearcher
+from app.ingest_pipeline import run_ingest
+from app.lexical_index import BM25Index
+from app.query_batcher import QueryBatcher
+from app.red_metrics import install as install_red_metrics
+from app.vector_store import make_vector_store
+
+if settings.search_mode not in SEARCH_MODES:
+    raise ValueError(f"Unknown SEARCH_MODE {settings.search_mode!r} ({'|'.join(SEARCH_MODES)})")
+
+DATA_PATH = Path(settings.runbooks_path)
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Validate (or create) the collection once, with payload indexes, so
+    # /ingest and /search never re-fetch collection metadata.
+    try:
+        store.ensure_collection(embedder.dim)
+    except ValueError:
+        raise
+    except Exception as exc:
+        logger.warning("Vector store not reachable at startup (%s); will retry on /ingest", exc)
+    yield
+
+
+app = FastAPI(
+    title="Lab 03.1 - Vector Similarity Search API", version="1.0.0", lifespan=lifespan
+)
+red_metrics = install_red_metrics(
+    app, extra=lambda: query_batcher.render() if query_batcher is not None else ""
+)
+
+embedder = EmbeddingModel(
+    settings.embed_model,
+    cache=EmbeddingCache(
+        max_items=settings.embed_cache_size,
+        ttl_s=settings.embed_cache_ttl_s,
+        disk_dir=settings.embed_cache_dir or None,
+        disk_capacity=settings.embed_cache_disk_items,
+        casefold=settings.embed_cache_casefold,
+    )
+    if settings.embed_cache_size
+    else None,
+)
+if embedder.cache is not None:
+    for _stat, _help in (
+        ("hits_memory", "Query embeddings served from the in-memory LRU."),
+        ("hits_disk", "Query embeddings served from the memory-mapped disk tier."),
+        ("misses", "Query embeddings that ran the model."),
+        ("memory_entries", "Entries in the in-memory LRU."),
+    ):
+        red_metrics.add_gauge(
+            f"embed_cache_{_stat}", _help, lambda _stat=_stat: embedder.cache.stats()[_stat]
+        )
 
-embedder = EmbeddingModel(settings.embed_model)
-store = QdrantVectorStore(settings.qdrant_url, settings.qdrant_collection)
+query_batcher = (
+    QueryBatcher(embedder, settings.query_batch_max_size, settings.query_batch_max_wait_ms)
+    if settings.query_batch_max_size > 1
+    else None
+)
+
+store = make_vector_store(settings)
+hash_index = HashIndex(
+    Path(settings.ingest_index_path or DATA_DIR / f"{settings.qdrant_collection}.index.sqlite")
+)
+lexical_index = BM25Index(
+    Path(settings.lexical_index_path or DATA_DIR / f"{settings.qdrant_collection}.bm25.sqlite")
+)
+searcher = HybridSearcher(
+    store,
+    lexical_index,
+    embed=query_batcher.embed if query_batcher is not None else embedder.embed_one,
+    reranker=CrossEncoderReranker(settings.rerank_model) if settings.rerank_model else None,
+    rrf_k=settings.rrf_k,
+)
 
 
 class IngestResponse(BaseModel):
     collection: str
     inserted: int
+    scanned: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    resumed_from: int = 0
+    batches: int = 0
+    embed_s: float = 0.0
+    upsert_s: float = 0.0
+    elapsed_s: float = 0.0
+    docs_per_s: float = 0.0
+    lexical_rebuilt: int = 0
 
 
 class SearchRequest(BaseModel):
@@ -31,6 +113,11 @@ class SearchRequest(BaseModel):
     score_threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
     service: Optional[str] = None
     severity: Optional[str] = None
+    # Per-request overrides of the SEARCH_* / RERANK_* settings
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None
+    candidates: Optional[int] = Field(default=None, ge=1, le=500)
+    rerank_top_n: Optional[int] = Field(default=None, ge=0, le=200)
+    budget_ms: Optional[float] = Field(default=None, ge=0.0)
 
 
 class SearchHit(BaseModel):
@@ -46,6 +133,9 @@ class SearchResponse(BaseModel):
     query: str
     top_k: int
     hits: List[SearchHit]
+    mode: str = "vector"
+    reranked: int = 0
+    timings_ms: Dict[str, float] = {}
 
 
 @app.get("/health")
@@ -53,67 +143,60 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/stats")
+def stats() -> Dict[str, Any]:
+    return {
+        "embedding_cache": embedder.cache.stats() if embedder.cache is not None else None,
+        "query_batcher": query_batcher.stats() if query_batcher is not None else None,
+        "vector_store": store.describe(),
+        "search": searcher.describe(),
+    }
+
+
 @app.post("/ingest", response_model=IngestResponse)
-def ingest() -> IngestResponse:
+def ingest(
+    resume: bool = True,
+    batch_size: Optional[int] = Query(default=None, ge=1, le=10_000),
+) -> IngestResponse:
     if not DATA_PATH.exists():
-        raise HTTPException(status_code=500, detail="runbooks.json not found")
-
-    runbooks: List[Dict[str, Any]] = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    texts = [f"{rb['title']}\n{rb['content']}" for rb in runbooks]
-
-    vectors = embedder.embed_texts(texts)
-    vector_size = len(vectors[0])
-    store.ensure_collection(vector_size)
-
-    points: List[rest.PointStruct] = []
-    for idx, (rb, v) in enumerate(zip(runbooks, vectors), start=1):
-        payload = {
-            "title": rb["title"],
-            "service": rb["service"],
-            "severity": rb["severity"],
-            "content": rb["content"],
-        }
-        points.append(
-            rest.PointStruct(
-                id=idx,
-                vector=v,
-                payload={**payload, "doc_id": rb["id"]},
-            )
-        )
-
-    store.upsert_points(points)
-    return IngestResponse(collection=settings.qdrant_collection, inserted=len(points))
+        raise HTTPException(status_code=500, detail=f"{DATA_PATH.name} not found")
+
+    stats = run_ingest(
+        DATA_PATH,
+        embedder,
+        store,
+        hash_index,
+        batch_size=batch_size or settings.ingest_batch_size,
+        checkpoint_path=Path(settings.ingest_checkpoint_path) if settings.ingest_checkpoint_path else None,
+        resume=resume,
+        hash_salt=settings.embed_model,
+        lexical=lexical_index,
+    )
+    return IngestResponse(collection=settings.qdrant_collection, **stats.to_dict())
 
 
 @app.post("/search", response_model=SearchResponse)
 def search(req: SearchRequest) -> SearchResponse:
-    qvec = embedder.embed_one(req.query)
-
-    conditions: List[rest.FieldCondition] = []
+    filters: Dict[str, str] = {}
     if req.service:
-        conditions.append(
-            rest.FieldCondition(
-                key="service", match=rest.MatchValue(value=req.service)
-            )
-        )
+        filters["service"] = req.service
     if req.severity:
-        conditions.append(
-            rest.FieldCondition(
-                key="severity", match=rest.MatchValue(value=req.severity)
-            )
-        )
+        filters["severity"] = req.severity
 
-    filter_ = rest.Filter(must=conditions) if conditions else None
-
-    results = store.search(
-        query_vector=qvec,
+    mode = req.mode or settings.search_mode
+    result = searcher.search(
+        req.query,
         limit=req.top_k,
+        mode=mode,
+        candidates=req.candidates or settings.search_candidates,
+        rerank_top_n=settings.rerank_top_n if req.rerank_top_n is None else req.rerank_top_n,
+        budget_ms=settings.search_budget_ms if req.budget_ms is None else req.budget_ms,
         score_threshold=req.score_threshold,
-        filter_=filter_,
+        filters=filters,
     )
 
     hits: List[SearchHit] = []
-    for r in results:
+    for r in result["hits"]:
         p = r["payload"]
         hits.append(
             SearchHit(
@@ -126,4 +209,11 @@ def search(req: SearchRequest) -> SearchResponse:
             )
         )
 
-    return SearchResponse(query=req.query, top_k=req.top_k, hits=hits)
+    return SearchResponse(
+        query=req.query,
+        top_k=req.top_k,
+        hits=hits,
+        mode=mode,
+        reranked=result["reranked"],
+        timings_ms=result["timings_ms"],
+    )
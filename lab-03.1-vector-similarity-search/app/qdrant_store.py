@@ -1,55 +1,314 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as rest
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from app.collection_profiles import (
+    PROFILES,
+    CollectionProfile,
+    create_collection_kwargs,
+    search_params,
+)
+from app.vector_store import VectorStore
+
+# Keyword indexes so filtered searches use the payload index instead of a
+# full scan of the candidates
+INDEXED_FIELDS = ("service", "severity")
+
+UPSERT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+logger = logging.getLogger(__name__)
+
+
+def _retryable(exc: Exception) -> bool:
+    """Client errors (bad payload, wrong dimension) fail fast; everything else is retried."""
+    if isinstance(exc, UnexpectedResponse) and exc.status_code is not None:
+        return exc.status_code == 429 or exc.status_code >= 500
+    return not isinstance(exc, (ValueError, TypeError))
+
+
+class UpsertMetrics:
+    """Per-batch latency histogram, retries and throughput of the last upsert call."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.points = 0
+        self.retries = 0
+        self.failures = 0
+        self.latency_buckets = [0] * (len(UPSERT_BUCKETS_MS) + 1)
+        self.latency_ms_sum = 0.0
+        self.last_call: Dict[str, float] = {}
+
+    def record_batch(self, points: int, latency_ms: float) -> None:
+        with self._lock:
+            self.batches += 1
+            self.points += points
+            self.latency_ms_sum += latency_ms
+            self.latency_buckets[bisect_left(UPSERT_BUCKETS_MS, latency_ms)] += 1
 
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
 
-class QdrantVectorStore:
-    def __init__(self, url: str, collection: str):
-        self.client = QdrantClient(url=url)
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def record_call(self, points: int, batches: int, elapsed_s: float) -> None:
+        with self._lock:
+            self.last_call = {
+                "points": points,
+                "batches": batches,
+                "elapsed_s": round(elapsed_s, 3),
+                "points_per_s": round(points / elapsed_s, 1) if elapsed_s else 0.0,
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "points": self.points,
+                "retries": self.retries,
+                "failures": self.failures,
+                "mean_batch_ms": round(self.latency_ms_sum / self.batches, 2)
+                if self.batches
+                else 0.0,
+                "batch_latency_ms_histogram": {
+                    **{str(b): n for b, n in zip(UPSERT_BUCKETS_MS, self.latency_buckets)},
+                    "+Inf": self.latency_buckets[-1],
+                },
+                "last_call": dict(self.last_call),
+            }
+
+
+@dataclass(frozen=True)
+class CollectionSchema:
+    vector_size: int
+    distance: str
+    indexed_fields: Tuple[str, ...]
+    quantization: Optional[str]
+    on_disk_vectors: bool
+
+
+class QdrantVectorStore(VectorStore):
+    def __init__(
+        self,
+        url: str,
+        collection: str,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        upsert_batch_size: int = 128,
+        upsert_workers: int = 4,
+        max_retries: int = 3,
+        backoff_s: float = 0.2,
+        backoff_max_s: float = 5.0,
+        profile: Optional[CollectionProfile] = None,
+    ):
+        # location also accepts ":memory:" (local mode, used by tests)
+        self.client = QdrantClient(location=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
         self.collection = collection
+        self.prefer_grpc = prefer_grpc
+        self.profile = profile or PROFILES["default"]
+        self._search_params = search_params(self.profile)
+        # Validated once (startup or first ingest), then trusted
+        self.schema: Optional[CollectionSchema] = None
+
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_workers = upsert_workers
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.upsert_metrics = UpsertMetrics()
+        self._pool: Optional[ThreadPoolExecutor] = None
 
     def ensure_collection(self, vector_size: int) -> None:
-        collections = self.client.get_collections().collections
-        exists = any(c.name == self.collection for c in collections)
-
-        if exists:
-            info = self.client.get_collection(self.collection)
-            existing_size = info.config.params.vectors.size  # type: ignore
-            if existing_size != vector_size:
-                raise ValueError(
-                    f"Collection '{self.collection}' exists with vector size {existing_size}, "
-                    f"but model produces {vector_size}. Use a new collection name."
-                )
+        if self.schema is not None:
+            self._check_size(self.schema.vector_size, vector_size)
             return
 
-        self.client.create_collection(
-            collection_name=self.collection,
-            vectors_config=rest.VectorParams(
-                size=vector_size,
-                distance=rest.Distance.COSINE,
-            ),
+        if not self.client.collection_exists(self.collection):
+            self.client.create_collection(
+                collection_name=self.collection,
+                **create_collection_kwargs(self.profile, vector_size),
+            )
+
+        info = self.client.get_collection(self.collection)
+        params = info.config.params.vectors  # type: ignore
+        self._check_size(params.size, vector_size)
+
+        existing = info.payload_schema or {}
+        for field in INDEXED_FIELDS:
+            if field not in existing:
+                self.client.create_payload_index(
+                    collection_name=self.collection,
+                    field_name=field,
+                    field_schema=rest.PayloadSchemaType.KEYWORD,
+                    wait=True,
+                )
+        quantization = info.config.quantization_config
+        self.schema = CollectionSchema(
+            vector_size=params.size,
+            distance=str(params.distance.value),
+            indexed_fields=tuple(sorted(set(existing) | set(INDEXED_FIELDS))),
+            quantization={
+                rest.ScalarQuantization: "int8",
+                rest.BinaryQuantization: "binary",
+            }.get(type(quantization), None if quantization is None else "other"),
+            on_disk_vectors=bool(params.on_disk),
         )
+        if self.schema.quantization != self.profile.quantization:
+            # Profiles only apply at creation time
+            logger.warning(
+                "Collection '%s' uses quantization=%s but profile '%s' expects %s; "
+                "ingest into a new collection to change it",
+                self.collection,
+                self.schema.quantization,
+                self.profile.name,
+                self.profile.quantization,
+            )
+
+    def _check_size(self, existing_size: int, vector_size: int) -> None:
+        if existing_size != vector_size:
+            raise ValueError(
+                f"Collection '{self.collection}' exists with vector size {existing_size}, "
+                f"but model produces {vector_size}. Use a new collection name."
+            )
 
-    def upsert_points(self, points: List[rest.PointStruct]) -> None:
-        self.client.upsert(collection_name=self.collection, points=points)
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **super().describe(),
+            "transport": "grpc" if self.prefer_grpc else "http",
+            "profile": self.profile.to_dict(),
+            "schema": asdict(self.schema) if self.schema is not None else None,
+            "upsert": self.upsert_metrics.snapshot(),
+        }
+
+    def upsert_vectors(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Split into `upsert_batch_size` requests sent by `upsert_workers`
+        threads. At most 2 x workers requests are in flight (each holds its
+        slice converted for the wire), so memory stays bounded however many
+        points are passed. Requests use wait=False; once all are accepted,
+        one wait=True write acts as a barrier: Qdrant applies a shard's
+        updates in order, so when it returns every earlier batch is
+        searchable.
+        """
+        n = len(ids)
+        if not n:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.upsert_workers, thread_name_prefix="qdrant-upsert"
+            )
+
+        start = time.perf_counter()
+        inflight: Deque[Future] = deque()
+        batches = 0
+        try:
+            for lo in range(0, n, self.upsert_batch_size):
+                hi = min(lo + self.upsert_batch_size, n)
+                if len(inflight) >= 2 * self.upsert_workers:
+                    inflight.popleft().result()  # backpressure
+                inflight.append(
+                    self._pool.submit(
+                        self._send_batch, ids[lo:hi], vectors[lo:hi], payloads[lo:hi], False
+                    )
+                )
+                batches += 1
+            while inflight:
+                inflight.popleft().result()
+        except Exception:
+            for future in inflight:
+                future.cancel()
+            raise
+
+        # Consistency barrier: re-write the last point (idempotent) and wait
+        self._send_batch(ids[-1:], vectors[-1:], payloads[-1:], True)
+        self.upsert_metrics.record_call(n, batches, time.perf_counter() - start)
+
+    def _send_batch(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, Any]],
+        wait: bool,
+    ) -> None:
+        batch = rest.Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads)
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter()
+            try:
+                self.client.upsert(collection_name=self.collection, points=batch, wait=wait)
+            except Exception as exc:
+                if attempt == self.max_retries or not _retryable(exc):
+                    self.upsert_metrics.record_failure()
+                    raise
+                self.upsert_metrics.record_retry()
+                # Exponential backoff with full jitter
+                delay = min(self.backoff_max_s, self.backoff_s * 2**attempt)
+                logger.warning(
+                    "upsert of %d points failed (%s); retry %d in %.2fs",
+                    len(ids),
+                    exc,
+                    attempt + 1,
+                    delay,
+                )
+                time.sleep(random.uniform(0, delay))
+                continue
+            self.upsert_metrics.record_batch(len(ids), (time.perf_counter() - t0) * 1000.0)
+            return
+
+    def count(self) -> int:
+        """Points in the collection (0 if it does not exist yet)."""
+        if self.schema is None and not self.client.collection_exists(self.collection):
+            return 0
+        return self.client.count(collection_name=self.collection, exact=True).count
+
+    def delete_points(self, ids: List[str]) -> None:
+        if ids:
+            self.client.delete(
+                collection_name=self.collection,
+                points_selector=rest.PointIdsList(points=ids),
+            )
 
     def search(
         self,
-        query_vector: List[float],
+        query_vector: Union[np.ndarray, Sequence[float]],
         limit: int = 5,
         score_threshold: Optional[float] = None,
-        filter_: Optional[rest.Filter] = None,
+        filters: Optional[Dict[str, str]] = None,
     ) -> List[Dict[str, Any]]:
-        hits = self.client.search(
+        conditions = [
+            rest.FieldCondition(key=key, match=rest.MatchValue(value=value))
+            for key, value in (filters or {}).items()
+        ]
+        filter_ = rest.Filter(must=conditions) if conditions else None
+        hits = self.client.query_points(
             collection_name=self.collection,
-            query_vector=query_vector,
+            query=query_vector,
             limit=limit,
             score_threshold=score_threshold,
             query_filter=filter_,
+            search_params=self._search_params,
             with_payload=True,
-        )
+        ).points
         out: List[Dict[str, Any]] = []
         for h in hits:
             out.append(
@@ -0,0 +1,156 @@
+"""
+Request coalescing for query embeddings.
+
+/search handlers run on Starlette's threadpool; each one hands its query to
+QueryBatcher.embed() and blocks on a Future. A single background thread
+takes the first queued query, keeps collecting for up to `max_wait_ms` (or
+until `max_batch` queries), runs one model.encode for the whole batch and
+resolves every caller. Cache hits are answered before queueing, so they
+never pay the wait budget.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+_STOP = object()
+
+
+class QueryBatcher:
+    def __init__(self, embedder, max_batch: int = 32, max_wait_ms: float = 2.0):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+
+        # queries/cache_hits are bumped on request threads; the rest only
+        # by the batcher thread
+        self._count_lock = threading.Lock()
+        self.queries = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.encode_s = 0.0
+        self.size_buckets = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+
+        self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._thread.start()
+
+    def embed(self, text: str, timeout: Optional[float] = 30.0) -> np.ndarray:
+        """Vector for one query; blocks until its batch has been encoded."""
+        with self._count_lock:
+            self.queries += 1
+        cache = self.embedder.cache
+        if cache is not None:
+            vector = cache.get(text)
+            if vector is not None:
+                with self._count_lock:
+                    self.cache_hits += 1
+                return vector
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._encode(batch)
+
+    def _encode(self, batch: List[Tuple[str, Future]]) -> None:
+        # Identical concurrent queries (an incident makes everyone search
+        # the same thing) are encoded once.
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+        texts = list(unique)
+
+        t0 = time.perf_counter()
+        try:
+            vectors = self.embedder.embed_texts(texts)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        self.encode_s += time.perf_counter() - t0
+        self.batches += 1
+        self.size_sum += len(texts)
+        self.size_buckets[bisect_left(BATCH_SIZE_BUCKETS, len(texts))] += 1
+
+        cache = self.embedder.cache
+        for text, row in unique.items():
+            if cache is not None:
+                cache.put(text, vectors[row])
+        for text, future in batch:
+            future.set_result(vectors[unique[text]])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "batches": self.batches,
+            "mean_batch_size": round(self.size_sum / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": {
+                **{str(b): n for b, n in zip(BATCH_SIZE_BUCKETS, self.size_buckets)},
+                "+Inf": self.size_buckets[-1],
+            },
+            "encode_ms_total": round(self.encode_s * 1000.0, 1),
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def render(self) -> str:
+        """Prometheus exposition: batch-size histogram and encode time."""
+        lines = [
+            "# HELP query_embed_batch_size Unique queries encoded per model call.",
+            "# TYPE query_embed_batch_size histogram",
+        ]
+        cumulative = 0
+        for bound, n in zip(BATCH_SIZE_BUCKETS, self.size_buckets):
+            cumulative += n
+            lines.append(f'query_embed_batch_size_bucket{{le="{bound}"}} {cumulative}')
+        lines += [
+            f'query_embed_batch_size_bucket{{le="+Inf"}} {self.batches}',
+            f"query_embed_batch_size_sum {self.size_sum}",
+            f"query_embed_batch_size_count {self.batches}",
+            "# HELP query_embed_encode_seconds_total Time spent in batched model.encode calls.",
+            "# TYPE query_embed_encode_seconds_total counter",
+            f"query_embed_encode_seconds_total {self.encode_s:.6f}",
+            "# HELP query_embed_queries_total Queries submitted to the batcher.",
+            "# TYPE query_embed_queries_total counter",
+            f"query_embed_queries_total {self.queries}",
+            "# HELP query_embed_cache_hits_total Queries answered from the cache without queueing.",
+            "# TYPE query_embed_cache_hits_total counter",
+            f"query_embed_cache_hits_total {self.cache_hits}",
+        ]
+        return "\n".join(lines) + "\n"
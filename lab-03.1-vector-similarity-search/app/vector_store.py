@@ -0,0 +1,88 @@
+"""
+Backend-neutral vector store interface.
+
+Everything the API and the ingest pipeline need from a store. Filters are
+plain {payload field: exact value} dicts so callers never build
+backend-specific filter objects. Backends:
+
+- "qdrant": QdrantVectorStore (app/qdrant_store.py), the default
+- "local":  LocalVectorStore (app/local_store.py), in-process NumPy index
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+Vector = Union[np.ndarray, Sequence[float]]
+
+
+class VectorStore(ABC):
+    collection: str
+
+    @abstractmethod
+    def ensure_collection(self, vector_size: int) -> None:
+        """Create the collection, or raise ValueError if it exists with another size."""
+
+    @abstractmethod
+    def upsert_vectors(
+        self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]
+    ) -> None:
+        """Insert or replace points; `vectors` is (len(ids), dim) float32."""
+
+    @abstractmethod
+    def delete_points(self, ids: List[str]) -> None: ...
+
+    @abstractmethod
+    def count(self) -> int:
+        """Live points (0 if the collection does not exist yet)."""
+
+    @abstractmethod
+    def search(
+        self,
+        query_vector: Vector,
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Hits as {"id", "score", "payload"}, best first (cosine similarity)."""
+
+    def describe(self) -> Dict[str, Any]:
+        """Backend details for /stats."""
+        return {"backend": type(self).__name__, "collection": self.collection}
+
+
+def make_vector_store(settings) -> VectorStore:
+    """Backend selected by settings.vector_backend; only that backend is imported."""
+    if settings.vector_backend == "local":
+        from app.local_store import LocalVectorStore
+
+        return LocalVectorStore(
+            settings.local_store_dir or None,
+            settings.qdrant_collection,
+            ivf_min_points=settings.local_ivf_min_points,
+            nprobe=settings.local_ivf_nprobe,
+        )
+    if settings.vector_backend == "qdrant":
+        from app.collection_profiles import get_profile
+        from app.qdrant_store import QdrantVectorStore
+
+        return QdrantVectorStore(
+            settings.qdrant_url,
+            settings.qdrant_collection,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            grpc_port=settings.qdrant_grpc_port,
+            upsert_batch_size=settings.qdrant_upsert_batch_size,
+            upsert_workers=settings.qdrant_upsert_workers,
+            max_retries=settings.qdrant_upsert_retries,
+            backoff_s=settings.qdrant_upsert_backoff_s,
+            profile=get_profile(
+                settings.collection_profile,
+                hnsw_m=settings.hnsw_m,
+                hnsw_ef_construct=settings.hnsw_ef_construct,
+                search_hnsw_ef=settings.search_hnsw_ef,
+                oversampling=settings.quantization_oversampling,
+            ),
+        )
+    raise ValueError(f"Unknown VECTOR_BACKEND {settings.vector_backend!r} (qdrant|local)")
@@ -0,0 +1,195 @@
+"""
+Recall@k vs latency vs memory for each collection profile.
+
+Loads the same corpus into one Qdrant collection per profile
+(bench_<profile>), then runs the same queries against each. Exact NumPy
+search over the float32 vectors is the ground truth. Needs a running Qdrant
+server (QDRANT_URL), since quantization and on-disk storage have no effect in
+the client's in-memory mode.
+
+    python scripts/bench_profiles.py --docs 20000
+    python scripts/bench_profiles.py --data app/data/runbooks.json --queries 50
+    python scripts/bench_profiles.py --synthetic-vectors --docs 200000 --dim 768
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.collection_profiles import PROFILES, estimate_memory  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.hash_index import point_id  # noqa: E402
+from app.ingest_pipeline import iter_runbooks, runbook_text  # noqa: E402
+from app.qdrant_store import QdrantVectorStore  # noqa: E402
+
+SERVICES = {
+    "platform": ["pods in CrashLoopBackOff", "node DiskPressure", "OOMKilled containers",
+                 "ImagePullBackOff on deploy", "kubelet not ready"],
+    "api": ["high p95 latency", "5xx spike after release", "upstream timeouts",
+            "rate limiter rejecting traffic", "TLS handshake failures"],
+    "db": ["connection pool exhaustion", "replication lag", "slow queries after index drop",
+           "deadlocks on checkout table", "disk full on primary"],
+    "security": ["certificate expiring", "leaked credentials in logs", "WAF blocking users",
+                 "unexpected IAM role assumption", "SSH brute force attempts"],
+}
+ACTIONS = ["check logs", "describe the resource", "roll back the last deploy", "scale out",
+           "review resource limits", "rotate secrets", "page the owning team",
+           "compare with the previous release", "inspect dashboards", "open an incident"]
+SEVERITIES = ["low", "medium", "high"]
+
+
+def synthetic_runbooks(n: int, seed: int = 0):
+    """runbooks.json-shaped records built from templates."""
+    rng = np.random.default_rng(seed)
+    services = list(SERVICES)
+    for i in range(n):
+        service = services[rng.integers(len(services))]
+        symptom = SERVICES[service][rng.integers(len(SERVICES[service]))]
+        steps = ", ".join(rng.choice(ACTIONS, size=4, replace=False))
+        yield {
+            "id": f"rb-{i:07d}",
+            "title": f"{symptom.capitalize()} in {service} ({i})",
+            "service": service,
+            "severity": SEVERITIES[rng.integers(3)],
+            "content": f"When you see {symptom}: {steps}.",
+        }
+
+
+def load_corpus(args):
+    """(payloads, vectors, query vectors) for the benchmark."""
+    rng = np.random.default_rng(args.seed)
+    if args.synthetic_vectors:
+        centers = rng.normal(size=(max(8, args.docs // 500), args.dim))
+        vectors = centers[rng.integers(0, len(centers), args.docs)]
+        vectors = vectors + 0.5 * rng.normal(size=vectors.shape)
+        payloads = [{"doc_id": f"v-{i}"} for i in range(args.docs)]
+        picks = rng.choice(args.docs, size=args.queries, replace=False)
+        queries = vectors[picks] + 0.3 * rng.normal(size=(args.queries, args.dim))
+        return payloads, _unit(vectors), _unit(queries)
+
+    from app.embeddings import EmbeddingModel
+
+    records = list(iter_runbooks(Path(args.data))) if args.data else list(
+        synthetic_runbooks(args.docs, args.seed)
+    )
+    embedder = EmbeddingModel(settings.embed_model)
+    vectors = embedder.embed_texts([runbook_text(rb) for rb in records])
+    picks = rng.choice(len(records), size=min(args.queries, len(records)), replace=False)
+    # Queries read like an on-call engineer's search, not like the runbook
+    queries = embedder.embed_texts(
+        [f"{records[i]['title'].split(' (')[0].lower()} how to fix" for i in picks]
+    )
+    payloads = [
+        {k: rb[k] for k in ("title", "service", "severity")} | {"doc_id": rb["id"]}
+        for rb in records
+    ]
+    return payloads, _unit(vectors), _unit(queries)
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def wait_until_indexed(store: QdrantVectorStore, timeout_s: float = 600.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout_s:
+        info = store.client.get_collection(store.collection)
+        if info.status == "green":
+            return time.perf_counter() - start
+        time.sleep(0.5)
+    raise TimeoutError(f"{store.collection} still optimizing after {timeout_s}s")
+
+
+def bench_profile(name, args, payloads, vectors, queries, truth):
+    # Force HNSW even on small corpora, otherwise Qdrant full-scans and every
+    # profile reports recall 1.0
+    profile = replace(PROFILES[name], indexing_threshold_kb=1, full_scan_threshold_kb=1)
+    store = QdrantVectorStore(
+        settings.qdrant_url,
+        f"bench_{name}",
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+        upsert_batch_size=settings.qdrant_upsert_batch_size,
+        upsert_workers=settings.qdrant_upsert_workers,
+        profile=profile,
+    )
+    store.client.delete_collection(store.collection)
+    store.ensure_collection(vectors.shape[1])
+
+    ids = [point_id(p["doc_id"]) for p in payloads]
+    t0 = time.perf_counter()
+    store.upsert_vectors(ids, vectors, payloads)
+    ingest_s = time.perf_counter() - t0
+    index_s = wait_until_indexed(store)
+
+    id_to_row = {pid: i for i, pid in enumerate(ids)}
+    for q in queries[:5]:
+        store.search(q, limit=args.k)  # warm up caches and connections
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        hits = store.search(q, limit=args.k)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        got = {id_to_row[str(h["id"])] for h in hits}
+        recalls.append(len(got & set(expected.tolist())) / args.k)
+
+    if not args.keep:
+        store.client.delete_collection(store.collection)
+    memory = estimate_memory(profile, len(vectors), vectors.shape[1])
+    return {
+        "profile": name,
+        f"recall@{args.k}": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "ingest_s": round(ingest_s, 1),
+        "index_s": round(index_s, 1),
+        "ram_mb": round(memory["ram_bytes"] / 2**20, 1),
+        "disk_mb": round(memory["disk_bytes"] / 2**20, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark collection profiles")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--data", help="JSON/JSONL runbooks file (default: synthetic runbooks)")
+    parser.add_argument("--docs", type=int, default=20_000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--synthetic-vectors",
+        action="store_true",
+        help="Clustered random vectors instead of the embedding model (fast, any --dim)",
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Dimension for --synthetic-vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep bench_* collections")
+    parser.add_argument("--json-out", help="Also write the results to this file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    payloads, vectors, queries = load_corpus(args)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries\n")
+
+    results = [bench_profile(n, args, payloads, vectors, queries, truth) for n in args.profiles]
+    columns = list(results[0])
+    print("  ".join(f"{c:>12}" for c in columns))
+    for row in results:
+        print("  ".join(f"{row[c]!s:>12}" for c in columns))
+    print("\nram_mb/disk_mb are estimates of vector + HNSW storage (payloads excluded).")
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
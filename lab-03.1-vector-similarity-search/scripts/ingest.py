@@ -1,8 +1,20 @@
+import argparse
+
 import httpx
 
 API = "http://localhost:8000"
 
 if __name__ == "__main__":
-    r = httpx.post(f"{API}/ingest", timeout=120.0)
+    parser = argparse.ArgumentParser(description="Trigger a streaming ingest")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument(
+        "--no-resume", action="store_true", help="Ignore the checkpoint and start from record 1"
+    )
+    args = parser.parse_args()
+
+    params = {"resume": not args.no_resume}
+    if args.batch_size:
+        params["batch_size"] = args.batch_size
+    r = httpx.post(f"{API}/ingest", params=params, timeout=None)
     r.raise_for_status()
     print(r.json())
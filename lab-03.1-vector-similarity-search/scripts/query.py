@@ -5,17 +5,19 @@ API = "http://localhost:8000"
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python scripts/query.py \"your query here\"")
+        print("Usage: python scripts/query.py \"your query here\" [vector|lexical|hybrid]")
         raise SystemExit(1)
 
     query = sys.argv[1]
     payload = {"query": query, "top_k": 5}
+    if len(sys.argv) > 2:
+        payload["mode"] = sys.argv[2]
 
     r = httpx.post(f"{API}/search", json=payload, timeout=60.0)
     r.raise_for_status()
     data = r.json()
 
-    print(f"\nQuery: {data['query']}\n")
+    print(f"\nQuery: {data['query']} ({data['mode']}, {data['timings_ms']['total']:.1f} ms)\n")
     for i, h in enumerate(data["hits"], start=1):
         print(f"{i}. score={h['score']:.4f} | {h['title']} | service={h['service']} | severity={h['severity']}")
         print(f"   {h['content']}\n")
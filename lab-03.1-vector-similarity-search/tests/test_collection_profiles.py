@@ -0,0 +1,54 @@
+import pytest
+from qdrant_client.http import models as rest
+
+from app.collection_profiles import (
+    PROFILES,
+    create_collection_kwargs,
+    estimate_memory,
+    get_profile,
+    search_params,
+)
+
+
+def test_default_profile_matches_plain_collection():
+    kwargs = create_collection_kwargs(PROFILES["default"], 384)
+    assert kwargs["vectors_config"].size == 384
+    assert not kwargs["vectors_config"].on_disk
+    assert "quantization_config" not in kwargs
+    assert search_params(PROFILES["default"]) is None
+
+
+@pytest.mark.parametrize(
+    "name, quantization_type",
+    [("int8", rest.ScalarQuantization), ("binary", rest.BinaryQuantization)],
+)
+def test_quantized_profiles_keep_codes_in_ram_and_rescore(name, quantization_type):
+    profile = PROFILES[name]
+    kwargs = create_collection_kwargs(profile, 384)
+    assert isinstance(kwargs["quantization_config"], quantization_type)
+    assert kwargs["vectors_config"].on_disk is True
+
+    params = search_params(profile)
+    assert params.quantization.rescore is True
+    assert params.quantization.oversampling > 1.0
+
+
+def test_overrides_and_unknown_profiles():
+    profile = get_profile("low_memory", hnsw_m=4, search_hnsw_ef=None, indexing_threshold_kb=1)
+    kwargs = create_collection_kwargs(profile, 8)
+    assert kwargs["hnsw_config"].m == 4 and kwargs["hnsw_config"].on_disk is True
+    assert kwargs["on_disk_payload"] is True
+    assert kwargs["optimizers_config"].indexing_threshold == 1
+    with pytest.raises(ValueError, match="Unknown collection profile"):
+        get_profile("tiny")
+
+
+def test_memory_estimates_rank_profiles():
+    ram = {
+        name: estimate_memory(profile, 10_000_000, 384)["ram_bytes"]
+        for name, profile in PROFILES.items()
+    }
+    assert ram["default"] > ram["int8"] > ram["binary"]
+    assert ram["on_disk"] == 0
+    # int8 codes are a quarter of the float32 vectors
+    assert estimate_memory(PROFILES["int8"], 1000, 384)["ram_bytes"] == 1000 * 384 + 1000 * 16 * 8
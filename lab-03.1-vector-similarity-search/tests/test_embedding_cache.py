@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.embedding_cache import DiskCache, EmbeddingCache, LRUCache, cache_key
+
+
+def vec(*values):
+    return np.asarray(values, dtype=np.float32)
+
+
+def test_keys_normalize_text_but_not_model():
+    cache = EmbeddingCache()
+    cache.bind("model-a", 3, lowercases=True)
+    assert cache.key("Pod  CrashLoop\n") == cache.key("pod crashloop")
+    cache.model_name = "model-b"
+    assert cache.key("pod crashloop") != cache_key("model-a", "pod crashloop")
+
+
+def test_case_is_folded_only_for_models_that_lowercase():
+    cased = EmbeddingCache()
+    cased.bind("cased-model", 3)
+    assert cased.key("OOMKilled  pod") == cased.key("OOMKilled pod")
+    assert cased.key("OOMKilled") != cased.key("oomkilled")
+    assert not cased.stats()["casefold"]
+
+    forced = EmbeddingCache(casefold=False)
+    forced.bind("uncased-model", 3, lowercases=True)
+    assert forced.key("OOMKilled") != forced.key("oomkilled")
+
+    # Entries written with folding never answer unfolded lookups
+    uncased = EmbeddingCache()
+    uncased.bind("model-a", 3, lowercases=True)
+    forced.model_name = "model-a"
+    assert uncased.key("oomkilled") != forced.key("oomkilled")
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_items=2)
+    lru.put(b"a", vec(1))
+    lru.put(b"b", vec(2))
+    lru.get(b"a")
+    lru.put(b"c", vec(3))
+    assert lru.get(b"b") is None
+    assert lru.get(b"a") is not None and lru.evictions == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.embedding_cache.time.monotonic", lambda: now[0])
+    lru = LRUCache(max_items=10, ttl_s=60)
+    lru.put(b"a", vec(1))
+    now[0] += 61
+    assert lru.get(b"a") is None
+
+
+def test_disk_tier_survives_restart_and_warms_memory(tmp_path):
+    cache = EmbeddingCache(max_items=10, disk_dir=str(tmp_path), disk_capacity=8)
+    cache.bind("model-a", 3, lowercases=True)
+    cache.put("pod crashloop", vec(0.1, 0.2, 0.3))
+    cache.disk.flush()
+
+    restarted = EmbeddingCache(max_items=10, disk_dir=str(tmp_path), disk_capacity=8)
+    restarted.bind("model-a", 3, lowercases=True)
+    np.testing.assert_allclose(restarted.get("Pod CrashLoop"), [0.1, 0.2, 0.3])
+    assert restarted.get("pod crashloop") is not None
+    assert restarted.stats() == {
+        "hits_memory": 1,
+        "hits_disk": 1,
+        "misses": 0,
+        "hit_ratio": 1.0,
+        "casefold": True,
+        "memory_entries": 1,
+        "memory_evictions": 0,
+        "disk_entries": 1,
+    }
+
+
+def test_disk_ring_overwrites_oldest(tmp_path):
+    disk = DiskCache(tmp_path, dim=2, capacity=2)
+    # Keys ending in NUL bytes must round-trip
+    keys = [b"k1" + b"\0" * 14, b"k2" + b"\0" * 14, b"k3" + b"\0" * 14]
+    for i, key in enumerate(keys):
+        disk.put(key, vec(i, i))
+    assert disk.get(keys[0]) is None
+    np.testing.assert_allclose(disk.get(keys[2]), [2, 2])
+
+    reopened = DiskCache(tmp_path, dim=2, capacity=2)
+    assert len(reopened) == 2
+    np.testing.assert_allclose(reopened.get(keys[1]), [1, 1])
+
+
+class FakeSentenceTransformer:
+    """Uncased, like all-MiniLM-L6-v2: its tokenizer lowercases the input."""
+
+    encoded = []
+    tokenizer = SimpleNamespace(do_lower_case=True)
+
+    def __init__(self, name):
+        pass
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.asarray([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_repeated_queries_skip_the_model(monkeypatch):
+    embeddings = pytest.importorskip("app.embeddings")
+    monkeypatch.setattr(embeddings, "SentenceTransformer", FakeSentenceTransformer)
+    model = embeddings.EmbeddingModel("fake", cache=EmbeddingCache(max_items=10))
+
+    first = model.embed_one("pod crashloop")
+    batch = model.embed_queries(["Pod CrashLoop", "disk pressure"])
+    assert batch.dtype == np.float32 and batch.shape == (2, 2)
+    np.testing.assert_array_equal(batch[0], first)
+    assert FakeSentenceTransformer.encoded == ["pod crashloop", "disk pressure"]
+    assert model.cache.stats()["hits_memory"] == 1
+
+
+def test_cased_models_encode_each_case(monkeypatch):
+    embeddings = pytest.importorskip("app.embeddings")
+
+    class CasedSentenceTransformer(FakeSentenceTransformer):
+        encoded = []
+        tokenizer = SimpleNamespace(do_lower_case=False)
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", CasedSentenceTransformer)
+    model = embeddings.EmbeddingModel("fake-cased", cache=EmbeddingCache(max_items=10))
+
+    model.embed_one("OOMKilled")
+    model.embed_one("oomkilled")
+    model.embed_one("OOMKilled")
+    assert CasedSentenceTransformer.encoded == ["OOMKilled", "oomkilled"]
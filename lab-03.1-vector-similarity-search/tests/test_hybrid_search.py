@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.hybrid_search import HybridSearcher, rrf_fuse
+from app.lexical_index import BM25Index
+from app.local_store import LocalVectorStore
+
+RUNBOOKS = [
+    ("p1", "Pods in CrashLoopBackOff", "Check logs of the restarting pod.", [1.0, 0.0, 0.0]),
+    ("p2", "Container OOMKilled", "Raise the pod memory limit.", [0.0, 1.0, 0.0]),
+    ("p3", "Pod restarts after deploy", "Roll back the release.", [0.9, 0.1, 0.0]),
+    ("p4", "Slow queries", "Check the query plan.", [0.0, 0.0, 1.0]),
+]
+
+
+class FakeEmbedder:
+    """Every query embeds to 'restarting pods', whatever it says."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return np.array([1.0, 0.05, 0.0], dtype=np.float32)
+
+
+class FakeReranker:
+    """Prefers shorter documents; costs 10 ms per pair."""
+
+    def __init__(self):
+        self.seen = []
+
+    def score(self, query, texts):
+        self.seen.append(len(texts))
+        return np.array([-len(t) for t in texts], dtype=np.float32)
+
+    def affordable(self, remaining_ms):
+        return max(int(remaining_ms / 10.0), 0)
+
+
+@pytest.fixture
+def searcher():
+    ids = [r[0] for r in RUNBOOKS]
+    payloads = [
+        {"doc_id": pid, "title": title, "content": content, "service": "platform"}
+        for pid, title, content, _ in RUNBOOKS
+    ]
+    store = LocalVectorStore(None, "runbooks")
+    store.ensure_collection(3)
+    store.upsert_vectors(ids, np.array([r[3] for r in RUNBOOKS], dtype=np.float32), payloads)
+    lexical = BM25Index()
+    lexical.add(ids, payloads)
+    return HybridSearcher(store, lexical, FakeEmbedder())
+
+
+def ranked(result):
+    return [str(h["id"]) for h in result["hits"]]
+
+
+def test_rrf_rewards_agreement_between_lists():
+    vector = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}, {"id": "c", "score": 0.7}]
+    lexical = [{"id": "c", "score": 12.0}, {"id": "d", "score": 3.0}]
+    fused = rrf_fuse([vector, lexical], k=60)
+    assert [h["id"] for h in fused] == ["c", "a", "b", "d"]
+    assert fused[0]["score"] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_modes(searcher):
+    assert ranked(searcher.search("oomkilled", limit=2, mode="vector")) == ["p1", "p3"]
+
+    result = searcher.search("oomkilled", limit=2, mode="lexical")
+    assert ranked(result) == ["p2"]
+    assert searcher.embed.calls == 1  # lexical mode never embeds
+    assert "embed" not in result["timings_ms"]
+
+    # The exact token the vectors missed makes it into the hybrid top 3
+    assert "p2" in ranked(searcher.search("oomkilled", limit=3, mode="hybrid"))
+    with pytest.raises(ValueError):
+        searcher.search("oomkilled", mode="fuzzy")
+
+
+def test_rerank_within_budget(searcher):
+    searcher.reranker = FakeReranker()
+
+    result = searcher.search("pod", limit=4, mode="hybrid", rerank_top_n=3)
+    assert result["reranked"] == 3 and searcher.reranker.seen == [3]
+    scores = [h["score"] for h in result["hits"][:3]]
+    assert scores == sorted(scores, reverse=True)
+
+    # 25 ms buys two pairs at 10 ms each, 15 ms one, 5 ms none
+    assert searcher.search("pod", mode="hybrid", rerank_top_n=3, budget_ms=25)["reranked"] == 2
+    single = searcher.search("pod", limit=1, mode="hybrid", rerank_top_n=3, budget_ms=15)
+    assert single["reranked"] == 1
+    # The lone reranked hit carries the cross-encoder score, not its RRF score
+    text = single["hits"][0]["payload"]["title"] + "\n" + single["hits"][0]["payload"]["content"]
+    assert single["hits"][0]["score"] == -len(text)
+    assert searcher.search("pod", mode="hybrid", rerank_top_n=3, budget_ms=5)["reranked"] == 0
+    assert searcher.reranker.seen == [3, 2, 1]
+
+    assert searcher.search("pod", mode="hybrid", rerank_top_n=1)["reranked"] == 1
@@ -0,0 +1,240 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.hash_index import HashIndex, point_id
+from app.ingest_pipeline import iter_runbooks, run_ingest
+from app.lexical_index import BM25Index
+
+
+def make_runbooks(n):
+    return [
+        {
+            "id": f"rb-{i:04d}",
+            "title": f"Runbook {i}",
+            "service": "api",
+            "severity": "low",
+            "content": "step " * (i % 7 + 1),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def embed_texts(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return np.asarray([[len(t), 1.0, 0.0] for t in texts], dtype=np.float32)
+
+
+class FakeStore:
+    def __init__(self, fail_on_batch=None):
+        self.points = {}
+        self.batches = 0
+        self.fail_on_batch = fail_on_batch
+
+    def ensure_collection(self, vector_size):
+        self.vector_size = vector_size
+
+    def count(self):
+        return len(self.points)
+
+    def upsert_vectors(self, ids, vectors, payloads):
+        assert isinstance(vectors, np.ndarray) and vectors.shape == (len(ids), 3)
+        self.batches += 1
+        if self.batches == self.fail_on_batch:
+            raise RuntimeError("qdrant unavailable")
+        for i, payload in zip(ids, payloads):
+            self.points[i] = payload
+
+    def delete_points(self, ids):
+        for i in ids:
+            self.points.pop(i, None)
+
+    def doc_ids(self):
+        return sorted(p["doc_id"] for p in self.points.values())
+
+
+def write(path, runbooks):
+    path.write_text(json.dumps(runbooks, indent=2), encoding="utf-8")
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    runbooks = make_runbooks(25)
+    path = tmp_path / "runbooks.json"
+    write(path, runbooks)
+    return path, runbooks
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = HashIndex(tmp_path / "index.sqlite")
+    yield idx
+    idx.close()
+
+
+def test_iter_runbooks_streams_json_array_across_chunks(corpus):
+    path, runbooks = corpus
+    assert list(iter_runbooks(path, chunk_chars=17)) == runbooks
+
+
+def test_iter_runbooks_reads_jsonl(tmp_path):
+    runbooks = make_runbooks(4)
+    path = tmp_path / "runbooks.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in runbooks) + "\n", encoding="utf-8")
+    assert list(iter_runbooks(path)) == runbooks
+
+
+def test_ingest_batches_and_reports_progress(corpus, index, tmp_path):
+    path, runbooks = corpus
+    store, embedder, progress = FakeStore(), FakeEmbedder(), []
+
+    stats = run_ingest(
+        path,
+        embedder,
+        store,
+        index,
+        batch_size=10,
+        on_progress=lambda s: progress.append(s.inserted),
+    )
+
+    assert stats.inserted == 25 and stats.batches == 3
+    assert embedder.calls == 3
+    assert progress == [10, 20, 25]
+    assert store.points[point_id("rb-0001")]["doc_id"] == "rb-0001"
+    assert store.doc_ids() == [rb["id"] for rb in runbooks]
+    assert not (tmp_path / "runbooks.json.checkpoint.json").exists()
+
+
+def test_overlapping_ingests_never_delete_live_runbooks(tmp_path, index):
+    runbooks = make_runbooks(200)
+    path = tmp_path / "runbooks.json"
+    write(path, runbooks)
+    store = FakeStore()
+    results = {}
+    second_started = threading.Event()
+
+    def ingest(name, on_progress, resume):
+        results[name] = run_ingest(
+            path,
+            FakeEmbedder(),
+            store,
+            index,
+            batch_size=10,
+            resume=resume,
+            on_progress=on_progress,
+        )
+
+    def second_progress(stats):
+        if not second_started.is_set():
+            second_started.set()
+            time.sleep(0.1)
+
+    def first_progress(stats):
+        # Start a second ingest just before the first one sweeps unseen ids;
+        # unserialized, its start_pass() would clear the first run's marks
+        if stats.batches == 20:
+            second.start()
+            second_started.wait(0.5)
+
+    # resume=False: the second run starts a full pass of its own
+    second = threading.Thread(target=ingest, args=("second", second_progress, False))
+    ingest("first", first_progress, True)
+    second.join()
+
+    assert results["first"].deleted == 0 and results["second"].deleted == 0
+    assert store.doc_ids() == [rb["id"] for rb in runbooks]
+
+
+def test_ingest_resumes_after_failure(corpus, index):
+    path, runbooks = corpus
+    store = FakeStore(fail_on_batch=2)
+
+    with pytest.raises(RuntimeError):
+        run_ingest(path, FakeEmbedder(), store, index, batch_size=10)
+    assert len(store.points) == 10
+
+    store.fail_on_batch = None
+    embedder = FakeEmbedder()
+    stats = run_ingest(path, embedder, store, index, batch_size=10)
+
+    assert stats.resumed_from == 10
+    assert stats.inserted == 15 and stats.deleted == 0
+    assert embedder.texts == 15
+    assert store.doc_ids() == [rb["id"] for rb in runbooks]
+
+
+def test_reingest_embeds_only_changes_and_deletes_removed(corpus, index):
+    path, runbooks = corpus
+    store = FakeStore()
+    run_ingest(path, FakeEmbedder(), store, index, batch_size=10)
+    first_ids = dict(store.points)
+
+    # Reordered, one edited, one removed, one added
+    edited = dict(runbooks[3], content="new steps")
+    updated = [edited] + runbooks[4:][::-1] + runbooks[:3] + make_runbooks(26)[-1:]
+    removed = updated.pop(5)["id"]
+    write(path, updated)
+
+    embedder = FakeEmbedder()
+    stats = run_ingest(path, embedder, store, index, batch_size=10)
+
+    assert embedder.texts == 2  # the edited and the new runbook
+    assert stats.unchanged == 23 and stats.deleted == 1
+    assert removed not in store.doc_ids()
+    assert store.doc_ids() == sorted(rb["id"] for rb in updated)
+    # Reordering kept every untouched runbook on the same point
+    for pid, payload in first_ids.items():
+        if payload["doc_id"] not in (removed, edited["id"]):
+            assert store.points[pid] == payload
+    assert store.points[point_id(edited["id"])]["content"] == "new steps"
+
+
+def test_lost_collection_triggers_full_reingest(corpus, index):
+    path, _ = corpus
+    run_ingest(path, FakeEmbedder(), FakeStore(), index, batch_size=10)
+
+    embedder = FakeEmbedder()
+    stats = run_ingest(path, embedder, FakeStore(), index, batch_size=10)
+    assert embedder.texts == 25 and stats.unchanged == 0
+
+
+def test_model_change_invalidates_hashes(corpus, index):
+    path, _ = corpus
+    store = FakeStore()
+    run_ingest(path, FakeEmbedder(), store, index, hash_salt="model-a")
+
+    embedder = FakeEmbedder()
+    run_ingest(path, embedder, store, index, hash_salt="model-b")
+    assert embedder.texts == 25
+
+
+def test_bm25_index_follows_the_store(corpus, index):
+    path, runbooks = corpus
+    store, lexical = FakeStore(), BM25Index()
+    run_ingest(path, FakeEmbedder(), store, index, batch_size=10, lexical=lexical)
+    assert lexical.count() == 25
+
+    edited = dict(runbooks[0], content="OOMKilled again")
+    write(path, [edited] + runbooks[2:])
+    run_ingest(path, FakeEmbedder(), store, index, batch_size=10, lexical=lexical)
+
+    assert lexical.count() == 24
+    assert [h["payload"]["doc_id"] for h in lexical.search("oomkilled")] == ["rb-0001"]
+    assert point_id("rb-0002") not in {h["id"] for h in lexical.search("runbook", limit=30)}
+
+    # A fresh (empty) BM25 index is rebuilt from the source alone: nothing is
+    # re-embedded or re-upserted
+    embedder, fresh, batches = FakeEmbedder(), BM25Index(), store.batches
+    stats = run_ingest(path, embedder, store, index, batch_size=10, lexical=fresh)
+    assert embedder.texts == 0 and store.batches == batches
+    assert stats.lexical_rebuilt == 24 and fresh.count() == 24
+    assert [h["payload"]["doc_id"] for h in fresh.search("oomkilled")] == ["rb-0001"]
@@ -0,0 +1,51 @@
+from app.lexical_index import BM25Index, tokenize
+
+RUNBOOKS = {
+    "p1": {"title": "Pods in CrashLoopBackOff", "content": "Check logs of the restarting pod.",
+           "service": "platform", "severity": "high"},
+    "p2": {"title": "Container OOMKilled", "content": "Raise the pod memory limit.",
+           "service": "platform", "severity": "medium"},
+    "p3": {"title": "API 503 from gateway", "content": "Pod api-gateway-7d9f fails readiness.",
+           "service": "api", "severity": "high"},
+    "p4": {"title": "Slow queries", "content": "Check the query plan and missing indexes.",
+           "service": "db", "severity": "low"},
+}
+
+
+def make_index(path=None):
+    index = BM25Index(path)
+    index.add(list(RUNBOOKS), list(RUNBOOKS.values()))
+    return index
+
+
+def test_tokenize_keeps_exact_tokens_and_their_parts():
+    assert list(tokenize("Pod api-gateway-7d9f in CrashLoopBackOff")) == [
+        "pod", "api-gateway-7d9f", "api", "gateway", "7d9f",
+        "crashloopbackoff", "crash", "loop", "back", "off",
+    ]
+
+
+def test_exact_tokens_rank_first():
+    index = make_index()
+    assert index.search("OOMKilled")[0]["id"] == "p2"
+    assert index.search("crashloopbackoff")[0]["id"] == "p1"
+    assert [h["id"] for h in index.search("api-gateway-7d9f")] == ["p3"]
+    # "pod" is in three runbooks; the rarer token decides the ranking
+    assert index.search("pod oomkilled")[0]["id"] == "p2"
+    assert index.search("nothing matches here") == []
+
+
+def test_filters_and_updates(tmp_path):
+    index = make_index(tmp_path / "bm25.sqlite")
+    hits = index.search("pod", limit=10, filters={"service": "platform", "severity": "high"})
+    assert [h["id"] for h in hits] == ["p1"]
+
+    index.add(["p4"], [dict(RUNBOOKS["p4"], content="Replica lag on the primary")])
+    assert index.search("plan") == []
+    index.remove(["p1"])
+    index.close()
+
+    reopened = BM25Index(tmp_path / "bm25.sqlite")
+    assert reopened.count() == 3
+    assert [h["id"] for h in reopened.search("replica lag")] == ["p4"]
+    assert all(h["id"] != "p1" for h in reopened.search("crashloopbackoff pod", limit=10))
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from app.local_store import LocalVectorStore
+
+SERVICES = ("api", "db", "platform")
+SEVERITIES = ("low", "high")
+
+
+def corpus(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"p{i}" for i in range(n)]
+    payloads = [
+        {"doc_id": f"rb-{i}", "service": SERVICES[i % 3], "severity": SEVERITIES[i % 2]}
+        for i in range(n)
+    ]
+    return ids, vectors, payloads
+
+
+def brute_force(vectors, query, k, mask=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    return [f"p{i}" for i in np.argsort(-scores)[:k]]
+
+
+def loaded(n=200, directory=None, **kwargs):
+    ids, vectors, payloads = corpus(n)
+    store = LocalVectorStore(directory, "runbooks", **kwargs)
+    store.ensure_collection(vectors.shape[1])
+    store.upsert_vectors(ids, vectors, payloads)
+    return store, vectors
+
+
+def test_exact_search_matches_brute_force():
+    store, vectors = loaded()
+    query = vectors[7] + 0.1
+    hits = store.search(query, limit=5)
+    assert [h["id"] for h in hits] == brute_force(vectors, query, 5)
+    assert hits[0]["payload"]["doc_id"] == "rb-7"
+    assert hits[0]["score"] >= hits[-1]["score"]
+
+
+def test_filters_on_service_and_severity():
+    store, vectors = loaded()
+    query = vectors[0]
+    hits = store.search(query, limit=4, filters={"service": "db", "severity": "high"})
+
+    mask = np.array([(i % 3 == 1) and (i % 2 == 1) for i in range(len(vectors))])
+    assert [h["id"] for h in hits] == brute_force(vectors, query, 4, mask)
+    assert store.search(query, filters={"service": "unknown"}) == []
+    with pytest.raises(ValueError):
+        store.search(query, filters={"title": "x"})
+
+
+def test_threshold_delete_and_overwrite():
+    store, vectors = loaded(n=10)
+    assert len(store.search(vectors[3], limit=10, score_threshold=0.999)) == 1
+
+    store.delete_points(["p3"])
+    assert store.count() == 9
+    assert "p3" not in [h["id"] for h in store.search(vectors[3], limit=10)]
+
+    store.upsert_vectors(["p4"], vectors[5:6], [{"service": "db", "severity": "low"}])
+    assert store.count() == 9
+    assert store.search(vectors[5], limit=2)[0]["id"] in ("p4", "p5")
+
+
+def test_persists_to_memory_mapped_file(tmp_path):
+    store, vectors = loaded(n=1500, directory=str(tmp_path))
+    store.delete_points(["p1"])
+    before = store.search(vectors[42], limit=5, filters={"severity": "low"})
+
+    reopened = LocalVectorStore(str(tmp_path), "runbooks")
+    assert reopened.count() == 1499
+    assert reopened.search(vectors[42], limit=5, filters={"severity": "low"}) == before
+    assert (tmp_path / "runbooks" / "vectors.f32").exists()
+    with pytest.raises(ValueError):
+        reopened.ensure_collection(8)
+
+
+def test_ivf_recall_against_exact():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(40, 16))
+    vectors = (centers[rng.integers(0, 40, 4000)] + 0.3 * rng.normal(size=(4000, 16))).astype(
+        np.float32
+    )
+    ids = [f"p{i}" for i in range(len(vectors))]
+    payloads = [{"service": "api", "severity": "low"}] * len(vectors)
+    store = LocalVectorStore(None, "runbooks", ivf_min_points=1000, nprobe=8)
+    store.ensure_collection(16)
+    store.upsert_vectors(ids, vectors, payloads)
+
+    recall = []
+    for q in vectors[rng.choice(len(vectors), 50, replace=False)] + 0.05:
+        expected = set(brute_force(vectors, q, 10))
+        got = {h["id"] for h in store.search(q, limit=10)}
+        recall.append(len(expected & got) / 10)
+    assert store._ivf is not None
+    assert np.mean(recall) >= 0.9
+
+    # Points written after the build are still found (exact tail scan)
+    store.upsert_vectors(["new"], np.ones((1, 16), dtype=np.float32), payloads[:1])
+    assert store.search(np.ones(16), limit=1)[0]["id"] == "new"
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from app.hash_index import point_id
+from app.qdrant_store import QdrantVectorStore
+
+
+@pytest.fixture
+def store():
+    # Local in-process Qdrant: same client API, no server needed
+    return QdrantVectorStore(":memory:", "runbooks")
+
+
+def spy(monkeypatch, obj, name):
+    calls = []
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(kwargs or args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+def test_schema_validated_once_with_payload_indexes(store, monkeypatch):
+    index_calls = spy(monkeypatch, store.client, "create_payload_index")
+    info_calls = spy(monkeypatch, store.client, "get_collection")
+
+    store.ensure_collection(3)
+    store.ensure_collection(3)
+    store.ensure_collection(3)
+
+    assert len(info_calls) == 1
+    assert sorted(c["field_name"] for c in index_calls) == ["service", "severity"]
+    assert store.describe()["schema"] == {
+        "vector_size": 3,
+        "distance": "Cosine",
+        "indexed_fields": ("service", "severity"),
+        "quantization": None,
+        "on_disk_vectors": False,
+    }
+    with pytest.raises(ValueError, match="vector size 3"):
+        store.ensure_collection(4)
+
+
+def test_existing_collection_is_validated_not_recreated(store):
+    store.ensure_collection(3)
+    store.schema = None  # as after a restart
+    with pytest.raises(ValueError):
+        store.ensure_collection(5)
+
+
+def test_filtered_query_points_search(store):
+    store.ensure_collection(3)
+    payloads = [
+        {"doc_id": "rb-1", "service": "api", "severity": "high"},
+        {"doc_id": "rb-2", "service": "db", "severity": "high"},
+        {"doc_id": "rb-3", "service": "db", "severity": "low"},
+    ]
+    store.upsert_vectors(
+        [point_id(p["doc_id"]) for p in payloads], np.eye(3, dtype=np.float32), payloads
+    )
+    assert store.count() == 3
+
+    query = np.array([1.0, 0.9, 0.1], dtype=np.float32)
+    assert [h["payload"]["doc_id"] for h in store.search(query, limit=3)] == [
+        "rb-1",
+        "rb-2",
+        "rb-3",
+    ]
+    hits = store.search(query, limit=3, filters={"service": "db", "severity": "low"})
+    assert [h["payload"]["doc_id"] for h in hits] == ["rb-3"]
+
+    store.delete_points([point_id("rb-1")])
+    assert store.count() == 2
+
+
+def test_parallel_batched_upsert_with_barrier(monkeypatch):
+    store = QdrantVectorStore(":memory:", "runbooks", upsert_batch_size=10, upsert_workers=3)
+    store.ensure_collection(4)
+    calls = spy(monkeypatch, store.client, "upsert")
+    rng = np.random.default_rng(0)
+    ids = [point_id(f"rb-{i}") for i in range(95)]
+
+    store.upsert_vectors(ids, rng.normal(size=(95, 4)).astype(np.float32), [{}] * 95)
+
+    assert store.count() == 95
+    waits = [c["wait"] for c in calls]
+    assert waits == [False] * 10 + [True]
+    metrics = store.describe()["upsert"]
+    assert metrics["batches"] == 11 and metrics["points"] == 96
+    assert metrics["last_call"]["batches"] == 10
+    assert sum(metrics["batch_latency_ms_histogram"].values()) == 11
+
+
+def test_transient_errors_are_retried_with_backoff(monkeypatch):
+    from qdrant_client.http.exceptions import ResponseHandlingException
+
+    store = QdrantVectorStore(":memory:", "runbooks", backoff_s=0.0)
+    store.ensure_collection(3)
+    original = store.client.upsert
+    failures = [ResponseHandlingException(ConnectionError("reset"))] * 2
+
+    def flaky(**kwargs):
+        if failures:
+            raise failures.pop()
+        return original(**kwargs)
+
+    monkeypatch.setattr(store.client, "upsert", flaky)
+    store.upsert_vectors([point_id("rb-1")], np.ones((1, 3), dtype=np.float32), [{}])
+    assert store.count() == 1
+    assert store.upsert_metrics.retries == 2
+
+
+def test_client_errors_fail_fast(monkeypatch):
+    from qdrant_client.http.exceptions import UnexpectedResponse
+
+    store = QdrantVectorStore(":memory:", "runbooks", backoff_s=0.0)
+    attempts = []
+
+    def bad_request(**kwargs):
+        attempts.append(kwargs)
+        raise UnexpectedResponse(400, "Bad Request", b"wrong vector size", None)
+
+    monkeypatch.setattr(store.client, "upsert", bad_request)
+    with pytest.raises(UnexpectedResponse):
+        store.upsert_vectors([point_id("rb-1")], np.ones((1, 3), dtype=np.float32), [{}])
+    assert len(attempts) == 1
+    assert store.upsert_metrics.failures == 1
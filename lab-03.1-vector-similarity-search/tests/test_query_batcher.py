@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.embedding_cache import EmbeddingCache
+from app.query_batcher import QueryBatcher
+
+
+class FakeEmbedder:
+    def __init__(self, cache=None, fail=False):
+        self.cache = cache
+        self.fail = fail
+        self.calls = []
+
+    def embed_texts(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return np.asarray([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def make_batcher():
+    batchers = []
+
+    def make(embedder, **kwargs):
+        batcher = QueryBatcher(embedder, **kwargs)
+        batchers.append(batcher)
+        return batcher
+
+    yield make
+    for b in batchers:
+        b.close()
+
+
+def run_concurrently(batcher, texts):
+    results = [None] * len(texts)
+    barrier = threading.Barrier(len(texts))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.embed(texts[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_queries_share_one_encode(make_batcher):
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch=64, max_wait_ms=200)
+    texts = [f"query {'x' * i}" for i in range(8)]
+
+    results = run_concurrently(batcher, texts)
+
+    for text, vector in zip(texts, results):
+        np.testing.assert_array_equal(vector, [len(text), ord(text[0])])
+    assert len(embedder.calls) < len(texts)
+    stats = batcher.stats()
+    assert stats["queries"] == 8 and stats["batches"] == len(embedder.calls)
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+
+def test_batch_size_is_capped(make_batcher):
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch=3, max_wait_ms=200)
+    run_concurrently(batcher, [f"q{i}" for i in range(9)])
+    assert max(len(c) for c in embedder.calls) <= 3
+
+
+def test_duplicate_queries_encoded_once(make_batcher):
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch=64, max_wait_ms=200)
+    results = run_concurrently(batcher, ["pod crashloop"] * 6)
+    assert sum(len(c) for c in embedder.calls) <= len(embedder.calls)
+    assert all(np.array_equal(r, results[0]) for r in results)
+
+
+def test_cache_hits_skip_the_queue(make_batcher):
+    embedder = FakeEmbedder(cache=EmbeddingCache(max_items=10))
+    batcher = make_batcher(embedder, max_batch=8, max_wait_ms=1)
+    first = batcher.embed("disk pressure")
+    second = batcher.embed("disk  pressure")
+
+    np.testing.assert_array_equal(first, second)
+    assert len(embedder.calls) == 1
+    assert batcher.stats()["cache_hits"] == 1
+
+
+def test_encoder_errors_reach_every_caller(make_batcher):
+    batcher = make_batcher(FakeEmbedder(fail=True), max_batch=8, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.embed("anything")
+
+
+def test_render_exposes_batch_size_histogram(make_batcher):
+    batcher = make_batcher(FakeEmbedder(), max_batch=8, max_wait_ms=1)
+    batcher.embed("one")
+    text = batcher.render()
+    assert 'query_embed_batch_size_bucket{le="1"} 1' in text
+    assert "query_embed_batch_size_count 1" in text
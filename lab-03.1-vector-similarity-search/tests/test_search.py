@@ -7,7 +7,9 @@ def test_ingest_then_search():
     # Ingest
     r = httpx.post(f"{API}/ingest", timeout=120.0)
     assert r.status_code == 200
-    assert r.json()["inserted"] > 0
+    # Re-ingesting an unchanged corpus embeds nothing
+    body = r.json()
+    assert body["inserted"] + body["unchanged"] > 0
 
     # Search (semantic)
     payload = {"query": "pod keeps restarting crash loop", "top_k": 3}
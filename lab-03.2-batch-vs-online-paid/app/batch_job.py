@@ -1,19 +1,27 @@
 import json
 import time
+from functools import lru_cache
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Dict, List
 
 from config import get_settings
-from otel_setup import setup_otel
+from otel_setup import get_meter, get_tracer, telemetry_stats
 from cost_model import estimate_batch_cost
 
 DATA_PATH = Path(__file__).parent / "data" / "input.jsonl"
 
-tracer, meter = setup_otel()
-record_latency = meter.create_histogram("record_latency_ms")
-batch_processing_time = meter.create_histogram("batch_processing_ms")
-batch_records_count = meter.create_counter("batch_total_records")
-batch_cost_metric = meter.create_histogram("batch_cost_usd")
+
+@lru_cache
+def instruments() -> SimpleNamespace:
+    # Created on first use so importing the job does not start OTel
+    meter = get_meter()
+    return SimpleNamespace(
+        record_latency=meter.create_histogram("record_latency_ms"),
+        batch_processing_time=meter.create_histogram("batch_processing_ms"),
+        batch_records_count=meter.create_counter("batch_total_records"),
+        batch_cost_metric=meter.create_histogram("batch_cost_usd"),
+    )
 
 
 def process_record(record: Dict) -> Dict:
@@ -21,13 +29,16 @@ def process_record(record: Dict) -> Dict:
     features = record["features"]
     prediction = float(sum(features))
     latency = (time.time() - start) * 1000
-    record_latency.record(latency)
+    instruments().record_latency.record(latency)
     return {"id": record["id"], "prediction": prediction}
 
 
 def run_batch(path: Path = DATA_PATH) -> List[Dict]:
     settings = get_settings()
 
+    tracer = get_tracer()
+    metrics = instruments()
+
     start_batch = time.time()
     results = []
 
@@ -42,12 +53,12 @@ def run_batch(path: Path = DATA_PATH) -> List[Dict]:
                 results.append(res)
 
     batch_ms = (time.time() - start_batch) * 1000
-    batch_processing_time.record(batch_ms)
-    batch_records_count.add(len(results))
+    metrics.batch_processing_time.record(batch_ms)
+    metrics.batch_records_count.add(len(results))
 
     # Cost calculation
     cost = estimate_batch_cost(len(results), settings.cost_per_1k_predictions)
-    batch_cost_metric.record(cost)
+    metrics.batch_cost_metric.record(cost)
 
     return results
 
@@ -62,7 +73,8 @@ def main():
             "records": len(results),
             "estimated_cost_usd": estimate_batch_cost(
                 len(results), get_settings().cost_per_1k_predictions
-            )
+            ),
+            "telemetry": telemetry_stats(),
         }
     }))
 
@@ -5,6 +5,18 @@ class Settings:
     def __init__(self):
         self.cpu_burn_ms = int(os.getenv("CPU_BURN_MS", "20"))
         self.cost_per_1k_predictions = float(os.getenv("COST_PER_1K_PRED", "0.002"))
+        # Standard OTel switch: true = no SDK import, no-op tracer and meter
+        self.otel_sdk_disabled = os.getenv("OTEL_SDK_DISABLED", "false").lower() == "true"
+        # Telemetry export: otlp, memory (ring buffer), spool (disk-backed OTLP) or none
+        self.otel_exporter = os.getenv("OTEL_EXPORTER", "otlp").lower()
+        if self.otel_exporter not in ("otlp", "memory", "spool", "none"):
+            raise ValueError("OTEL_EXPORTER must be one of otlp, memory, spool, none")
+        self.otel_collector_endpoint = os.getenv(
+            "OTEL_COLLECTOR_ENDPOINT", "http://otel-collector-paid:4318"
+        )
+        self.otel_spool_dir = os.getenv("OTEL_SPOOL_DIR", "/tmp/otel-spool")
+        self.otel_spool_max_mb = int(os.getenv("OTEL_SPOOL_MAX_MB", "64"))
+        self.otel_memory_max_spans = int(os.getenv("OTEL_MEMORY_MAX_SPANS", "10000"))
 
 @lru_cache
 def get_settings():
@@ -1,27 +1,76 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
 from opentelemetry import trace, metrics
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+from config import get_settings
+
+# Exporters setup_otel() built, for telemetry_stats()
+_pipeline: Dict[str, Any] = {}
+
+_lock = threading.Lock()
+_otel: Optional[Tuple[Any, Any]] = None
 
 def setup_otel():
+    # The SDK and OTLP/protobuf exporter stack are imported here, not at module
+    # import, so loading the job (or --help) does not pay for them.
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from telemetry_exporters import make_metric_reader, make_span_exporter
+
+    settings = get_settings()
     resource = Resource.create({"service.name": "lab-3-1-paid"})
 
-    # Tracing
+    # Tracing: exporter chosen by OTEL_EXPORTER (otlp, memory, spool, none)
     tracer_provider = TracerProvider(resource=resource)
-    span_exporter = OTLPSpanExporter(endpoint="http://otel-collector-paid:4318/v1/traces")
-    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    span_exporter = make_span_exporter(settings)
+    if span_exporter is not None:
+        tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    _pipeline["spans"] = span_exporter
     trace.set_tracer_provider(tracer_provider)
     tracer = trace.get_tracer(__name__)
 
     # Metrics
-    metric_exporter = OTLPMetricExporter(endpoint="http://otel-collector-paid:4318/v1/metrics")
-    reader = PeriodicExportingMetricReader(metric_exporter)
-    meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
+    reader = make_metric_reader(settings)
+    _pipeline["metrics"] = getattr(reader, "_exporter", reader)
+    meter_provider = MeterProvider(
+        resource=resource, metric_readers=[reader] if reader else []
+    )
     metrics.set_meter_provider(meter_provider)
     meter = metrics.get_meter(__name__)
 
     return tracer, meter
+
+def get_otel():
+    """
+    (tracer, meter), set up on first call. With OTEL_SDK_DISABLED=true these
+    are the API's no-op objects and the SDK is never imported.
+    """
+    global _otel
+    if _otel is None:
+        with _lock:
+            if _otel is None:
+                if get_settings().otel_sdk_disabled:
+                    _otel = trace.NoOpTracer(), metrics.NoOpMeter("disabled")
+                else:
+                    _otel = setup_otel()
+    return _otel
+
+def get_tracer():
+    return get_otel()[0]
+
+def get_meter():
+    return get_otel()[1]
+
+def telemetry_stats() -> Dict[str, Any]:
+    """Buffer sizes and drop counters of the configured exporters."""
+    if get_settings().otel_sdk_disabled:
+        return {"exporter": "disabled"}
+    out: Dict[str, Any] = {"exporter": get_settings().otel_exporter}
+    for name, exporter in _pipeline.items():
+        if hasattr(exporter, "stats"):
+            out[name] = exporter.stats()
+    return out
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+APP_DIR = Path(__file__).resolve().parent
+
+DEFERRED_MODULE = "telemetry_exporters"
+
+# Top-level packages worth calling out in the report
+GROUPS = ("opentelemetry", "google.protobuf", "fastapi", "pydantic", "starlette", "numpy", "requests")
+
+
+def import_profile(module: str, env: Optional[Dict[str, str]] = None) -> List[dict]:
+    """
+    Import `module` in a fresh interpreter with `python -X importtime` and
+    parse its report: one row per module with self and cumulative microseconds.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+        )
+    return rows
+
+
+def summarize(rows: List[dict], module: str, top: int = 10) -> dict:
+    total_us = next(
+        (r["cumulative_us"] for r in rows if r["module"] == module and r["depth"] == 0),
+        sum(r["self_us"] for r in rows),
+    )
+    groups = {
+        g: round(
+            sum(r["self_us"] for r in rows if r["module"] == g or r["module"].startswith(g + "."))
+            / 1000,
+            1,
+        )
+        for g in GROUPS
+    }
+    slowest = sorted(
+        (r for r in rows if r["depth"] <= 1), key=lambda r: r["cumulative_us"], reverse=True
+    )
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules_imported": len(rows),
+        "by_package_ms": {g: ms for g, ms in groups.items() if ms},
+        "slowest": [
+            {"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)}
+            for r in slowest[:top]
+        ],
+    }
+
+
+def run(module: str, repeat: int = 3, top: int = 10) -> Dict[str, dict]:
+    """
+    Cold-import `module` with telemetry on and with OTEL_SDK_DISABLED=true,
+    plus the deferred telemetry stack (DEFERRED_MODULE) on its own. Each
+    scenario keeps the fastest of `repeat` runs to damp disk-cache noise.
+    """
+    scenarios = {
+        "app (telemetry enabled)": (module, {"OTEL_SDK_DISABLED": "false"}),
+        "app (OTEL_SDK_DISABLED=true)": (module, {"OTEL_SDK_DISABLED": "true"}),
+        f"deferred: {DEFERRED_MODULE}": (DEFERRED_MODULE, {}),
+    }
+    report = {}
+    for name, (mod, env) in scenarios.items():
+        runs = [summarize(import_profile(mod, env), mod, top) for _ in range(repeat)]
+        report[name] = min(runs, key=lambda r: r["total_ms"])
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cold-start import time report (python -X importtime)"
+    )
+    parser.add_argument(
+        "--module", default="batch_job", help="Module to import (default: batch_job)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = run(args.module, args.repeat, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, result in report.items():
+        print(f"\n{name}: {result['total_ms']} ms, {result['modules_imported']} modules")
+        for pkg, ms in result["by_package_ms"].items():
+            print(f"  {pkg:<18} {ms:>8} ms")
+        print("  slowest:")
+        for row in result["slowest"]:
+            print(f"    {row['module']:<40} {row['cumulative_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+from opentelemetry.exporter.otlp.proto.common.metrics_encoder import encode_metrics
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (
+    ExportMetricsServiceRequest,
+)
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+from opentelemetry.sdk.metrics.export import (
+    InMemoryMetricReader,
+    MetricExporter,
+    MetricExportResult,
+    MetricReader,
+    MetricsData,
+    PeriodicExportingMetricReader,
+)
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+EXPORTERS = ("otlp", "memory", "spool", "none")
+PROTOBUF = {"Content-Type": "application/x-protobuf"}
+
+# Outcomes of one POST to the collector
+SENT, RETRY, REJECTED = "sent", "retry", "rejected"
+
+
+class RingBufferSpanExporter(SpanExporter):
+    """
+    Keeps the last `max_spans` spans in process memory, for debugging
+    without a collector. Older spans are evicted and counted as dropped.
+    """
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self.max_spans = max_spans
+        self._spans: "deque[ReadableSpan]" = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            overflow = len(self._spans) + len(spans) - self.max_spans
+            self.dropped += max(0, overflow)
+            self._spans.extend(spans)
+            self.exported += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self) -> List[ReadableSpan]:
+        with self._lock:
+            return list(self._spans)
+
+    def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "buffered_spans": len(self._spans),
+                "max_spans": self.max_spans,
+                "exported": self.exported,
+                "dropped": self.dropped,
+            }
+
+
+class FileSpool:
+    """
+    Directory of serialized OTLP request bodies waiting to be sent.
+
+    Files are named by creation time so replay is oldest first, and they
+    survive restarts. Total size is capped at `max_bytes`; when a new batch
+    does not fit, the oldest batches are deleted and counted as dropped.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self._bytes = sum(p.stat().st_size for p in self._files())
+
+    def _files(self) -> List[Path]:
+        return sorted(self.directory.glob("*.pb"))
+
+    def put(self, body: bytes) -> bool:
+        if len(body) > self.max_bytes:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            files = self._files()
+            while files and self._bytes + len(body) > self.max_bytes:
+                oldest = files.pop(0)
+                self._bytes -= oldest.stat().st_size
+                oldest.unlink()
+                self.dropped += 1
+            self._seq += 1
+            path = self.directory / f"{time.time_ns():020d}-{os.getpid()}-{self._seq}.pb"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            tmp.rename(path)
+            self._bytes += len(body)
+            self.spooled += 1
+        return True
+
+    def replay(self, send: Callable[[bytes], str], limit: int = 100) -> int:
+        """
+        Send up to `limit` spooled batches, oldest first. Stops at the first
+        RETRY; a REJECTED batch is deleted so it cannot block the ones behind it.
+        """
+        sent = 0
+        for path in self._files()[:limit]:
+            try:
+                body = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            outcome = send(body)
+            if outcome == RETRY:
+                break
+            with self._lock:
+                path.unlink(missing_ok=True)
+                self._bytes -= len(body)
+                if outcome == SENT:
+                    self.replayed += 1
+            if outcome == SENT:
+                sent += 1
+        return sent
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending_batches": len(self._files()),
+                "pending_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+                "dropped": self.dropped,
+            }
+
+
+class _SpoolingSender:
+    """
+    POSTs OTLP protobuf bodies; spools them while the collector is unreachable
+    or overloaded (connection errors, 429, 5xx). Any other 4xx will fail the
+    same way on every retry, so that batch is dropped and counted as rejected.
+    """
+
+    def __init__(self, url: str, spool: FileSpool, timeout_s: float = 5.0) -> None:
+        self.url = url
+        self.spool = spool
+        self.timeout_s = timeout_s
+        self.sent = 0
+        self.rejected = 0
+        self._session = requests.Session()
+
+    def _post(self, body: bytes) -> str:
+        try:
+            resp = self._session.post(
+                self.url, data=body, headers=PROTOBUF, timeout=self.timeout_s
+            )
+        except requests.RequestException:
+            return RETRY
+        if 200 <= resp.status_code < 300:
+            return SENT
+        if resp.status_code == 429 or resp.status_code >= 500:
+            return RETRY
+        self.rejected += 1
+        return REJECTED
+
+    def send(self, body: bytes) -> bool:
+        """True when the batch was delivered or safely spooled."""
+        outcome = self._post(body)
+        if outcome == SENT:
+            self.sent += 1
+            # Collector is reachable again: drain the backlog
+            self.spool.replay(self._post)
+            return True
+        if outcome == REJECTED:
+            return False
+        return self.spool.put(body)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sent": self.sent, "rejected": self.rejected, **self.spool.stats()}
+
+
+class SpoolingSpanExporter(SpanExporter):
+    def __init__(self, endpoint: str, spool_dir: str, max_bytes: int) -> None:
+        self._sender = _SpoolingSender(
+            f"{endpoint}/v1/traces", FileSpool(os.path.join(spool_dir, "traces"), max_bytes)
+        )
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        body = encode_spans(spans).SerializeToString()
+        if self._sender.send(body):
+            return SpanExportResult.SUCCESS
+        return SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return self._sender.stats()
+
+
+class SpoolingMetricExporter(MetricExporter):
+    def __init__(self, endpoint: str, spool_dir: str, max_bytes: int) -> None:
+        super().__init__()
+        self._sender = _SpoolingSender(
+            f"{endpoint}/v1/metrics", FileSpool(os.path.join(spool_dir, "metrics"), max_bytes)
+        )
+
+    def export(
+        self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs
+    ) -> MetricExportResult:
+        body = encode_metrics(metrics_data).SerializeToString()
+        if self._sender.send(body):
+            return MetricExportResult.SUCCESS
+        return MetricExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return self._sender.stats()
+
+
+def make_span_exporter(settings) -> Optional[SpanExporter]:
+    """Span exporter selected by OTEL_EXPORTER; None disables span export."""
+    kind = settings.otel_exporter
+    endpoint = settings.otel_collector_endpoint.rstrip("/")
+    if kind == "otlp":
+        return OTLPSpanExporter(endpoint=f"{endpoint}/v1/traces")
+    if kind == "memory":
+        return RingBufferSpanExporter(settings.otel_memory_max_spans)
+    if kind == "spool":
+        return SpoolingSpanExporter(
+            endpoint, settings.otel_spool_dir, settings.otel_spool_max_mb * 1024 * 1024
+        )
+    return None
+
+
+def make_metric_reader(settings) -> Optional[MetricReader]:
+    """Metric reader selected by OTEL_EXPORTER; None disables metric export."""
+    kind = settings.otel_exporter
+    endpoint = settings.otel_collector_endpoint.rstrip("/")
+    if kind == "otlp":
+        return PeriodicExportingMetricReader(
+            OTLPMetricExporter(endpoint=f"{endpoint}/v1/metrics")
+        )
+    if kind == "memory":
+        # Holds only the latest collection, so memory is bounded by instrument count
+        return InMemoryMetricReader()
+    if kind == "spool":
+        return PeriodicExportingMetricReader(
+            SpoolingMetricExporter(
+                endpoint, settings.otel_spool_dir, settings.otel_spool_max_mb * 1024 * 1024
+            )
+        )
+    return None
+
+
+class LocalCollector:
+    """
+    Minimal OTLP/HTTP collector stand-in for tests and laptops: accepts
+    /v1/traces and /v1/metrics, counts what it receives, and can be told to
+    fail (`available = False`) to simulate an outage, or to answer 400
+    (`reject = True`) to simulate a batch it will never accept.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.spans = 0
+        self.metric_requests = 0
+        self.available = True
+        self.reject = False
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not collector.available or collector.reject:
+                    self.send_response(400 if collector.reject else 503)
+                    self.end_headers()
+                    return
+                if self.path == "/v1/traces":
+                    request = ExportTraceServiceRequest.FromString(body)
+                    collector.spans += sum(
+                        len(ss.spans)
+                        for rs in request.resource_spans
+                        for ss in rs.scope_spans
+                    )
+                elif self.path == "/v1/metrics":
+                    ExportMetricsServiceRequest.FromString(body)
+                    collector.metric_requests += 1
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-protobuf")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LocalCollector":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    with LocalCollector(port=4318) as c:
+        print(f"Local OTLP collector listening on {c.endpoint} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"spans={c.spans} metric_requests={c.metric_requests}")
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,9 @@
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from config import Settings
 from otel_setup import setup_otel
+from telemetry_exporters import LocalCollector, SpoolingSpanExporter, make_span_exporter
 
 
 def test_otel_initializes():
@@ -9,3 +14,44 @@ def test_otel_initializes():
     # Create metric instruments to ensure no errors
     hist = meter.create_histogram("test_metric")
     hist.record(10)
+
+
+def test_spool_exporter_replays_to_local_collector(tmp_path):
+    with LocalCollector() as collector:
+        exporter = SpoolingSpanExporter(collector.endpoint, str(tmp_path), 1 << 20)
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer("test")
+
+        collector.available = False
+        with tracer.start_as_current_span("record"):
+            pass
+        assert exporter.stats()["pending_batches"] == 1
+
+        collector.available = True
+        with tracer.start_as_current_span("record"):
+            pass
+        assert collector.spans == 2
+        assert exporter.stats()["pending_batches"] == 0
+
+
+def test_exporter_disabled(monkeypatch):
+    monkeypatch.setenv("OTEL_EXPORTER", "none")
+    assert make_span_exporter(Settings()) is None
+
+
+def test_disabled_telemetry_uses_noop_objects(monkeypatch):
+    import otel_setup
+    from config import get_settings
+
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setattr(otel_setup, "_otel", None)
+    get_settings.cache_clear()
+    try:
+        with otel_setup.get_tracer().start_as_current_span("record") as span:
+            assert not span.is_recording()
+        otel_setup.get_meter().create_histogram("record_latency_ms").record(1.0)
+        assert otel_setup.telemetry_stats() == {"exporter": "disabled"}
+    finally:
+        monkeypatch.undo()
+        get_settings.cache_clear()
@@ -1,11 +1,13 @@
 from fastapi import FastAPI
 from models import Alert
 from agent import InfrastructureAgent
+from red_metrics import install as install_red_metrics
 
 app = FastAPI(
     title="Lab 4.1 Paid - Infrastructure Investigation Agent",
     version="1.0.0",
 )
+red_metrics = install_red_metrics(app)
 
 _agent = InfrastructureAgent()
 
@@ -0,0 +1,347 @@
+"""
+RED (rate, errors, duration) metrics for FastAPI/Starlette apps.
+
+Dependency-free ASGI middleware: per (method, route template, status) it
+counts requests, keeps a fixed-bucket duration histogram and sums request
+and response body sizes, plus a global in-flight gauge. Label cardinality
+is bounded: routes are the matched path template (never the raw path),
+unmatched requests share one label, and at most `max_routes` templates are
+tracked before further ones fold into "<other>".
+
+Exposed as Prometheus text on /metrics via install(). register_otel()
+exports the same series through OpenTelemetry observable instruments, but
+only lab-02.2 has an OTel meter to pass it; the other labs serve Prometheus
+text only.
+
+Each lab keeps its own copy of this file; run `python red_metrics.py` for
+the per-request overhead benchmark.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS_S = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+UNMATCHED = "<unmatched>"
+OTHER = "<other>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Key = Tuple[str, str, str]
+
+
+class _Series:
+    __slots__ = ("count", "duration_sum", "buckets", "request_bytes", "response_bytes")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.count = 0
+        self.duration_sum = 0.0
+        # One slot per bound plus +Inf; cumulated only when rendering
+        self.buckets = [0] * (n_buckets + 1)
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class REDMetrics:
+    """
+    Metric store. record() runs on the event loop thread for every request,
+    so it does one dict lookup and a few integer updates and takes no lock;
+    readers (render(), OTel callbacks) only read.
+    """
+
+    def __init__(
+        self,
+        max_routes: int = 100,
+        buckets_s: Iterable[float] = DEFAULT_BUCKETS_S,
+        prefix: str = "http",
+    ) -> None:
+        self.max_routes = max_routes
+        self.bounds = tuple(sorted(buckets_s))
+        self.prefix = prefix
+        self.in_flight = 0
+        self.overflow = 0
+        self._series: Dict[Key, _Series] = {}
+        self._routes: set = set()
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def route_label(self, route: Optional[str]) -> str:
+        if route is None:
+            return UNMATCHED
+        if route in self._routes:
+            return route
+        if len(self._routes) >= self.max_routes:
+            self.overflow += 1
+            return OTHER
+        self._routes.add(route)
+        return route
+
+    def record(
+        self,
+        method: str,
+        route: Optional[str],
+        status: int,
+        duration_s: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+    ) -> None:
+        key = (
+            method if method in METHODS else "OTHER",
+            self.route_label(route),
+            str(status),
+        )
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(len(self.bounds))
+        series.count += 1
+        series.duration_sum += duration_s
+        series.buckets[bisect_left(self.bounds, duration_s)] += 1
+        series.request_bytes += request_bytes
+        series.response_bytes += response_bytes
+
+    def add_gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Expose an app-specific gauge (e.g. a queue depth) next to the RED metrics."""
+        self._gauges[name] = (help_text, read)
+
+    def snapshot(self) -> List[Tuple[Key, _Series]]:
+        return list(self._series.items())
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        p = self.prefix
+        series = sorted(self.snapshot())
+        lines = [
+            f"# HELP {p}_requests_total Requests by method, route and status.",
+            f"# TYPE {p}_requests_total counter",
+        ]
+        for key, s in series:
+            lines.append(f"{p}_requests_total{{{_labels(key)}}} {s.count}")
+
+        lines += [
+            f"# HELP {p}_request_duration_seconds Request duration.",
+            f"# TYPE {p}_request_duration_seconds histogram",
+        ]
+        for key, s in series:
+            labels = _labels(key)
+            cumulative = 0
+            for bound, n in zip(self.bounds, s.buckets):
+                cumulative += n
+                lines.append(
+                    f'{p}_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s.count}')
+            lines.append(f"{p}_request_duration_seconds_sum{{{labels}}} {s.duration_sum:.6f}")
+            lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {s.count}")
+
+        for name, attr, help_text in (
+            ("request_size_bytes", "request_bytes", "Request body bytes."),
+            ("response_size_bytes", "response_bytes", "Response body bytes."),
+        ):
+            lines += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} summary"]
+            for key, s in series:
+                labels = _labels(key)
+                lines.append(f"{p}_{name}_sum{{{labels}}} {getattr(s, attr)}")
+                lines.append(f"{p}_{name}_count{{{labels}}} {s.count}")
+
+        lines += [
+            f"# HELP {p}_requests_in_flight Requests currently being served.",
+            f"# TYPE {p}_requests_in_flight gauge",
+            f"{p}_requests_in_flight {self.in_flight}",
+            f"# HELP {p}_route_overflow_total Requests folded into the {OTHER} route label.",
+            f"# TYPE {p}_route_overflow_total counter",
+            f"{p}_route_overflow_total {self.overflow}",
+        ]
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: Key) -> str:
+    method, route, status = key
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+def _content_length(headers: List[Tuple[bytes, bytes]]) -> int:
+    for name, value in headers:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+class REDMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+
+    The route template is read from scope["route"] after the app ran:
+    FastAPI's router stores the matched APIRoute there.
+    """
+
+    def __init__(
+        self, app, metrics: REDMetrics, skip_paths: Iterable[str] = ("/metrics",)
+    ) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.record(
+                scope["method"],
+                getattr(route, "path", None),
+                status,
+                duration,
+                _content_length(scope["headers"]),
+                response_bytes,
+            )
+
+
+def install(
+    app,
+    metrics: Optional[REDMetrics] = None,
+    path: Optional[str] = "/metrics",
+    extra: Optional[Callable[[], str]] = None,
+) -> REDMetrics:
+    """
+    Add the middleware and a Prometheus `path` endpoint to a FastAPI app.
+    `extra` returns more exposition text to append. Pass path=None when the
+    app serves its own /metrics and appends render() there; scrapes of
+    /metrics are never counted either way.
+    """
+    from starlette.responses import Response
+
+    metrics = metrics or REDMetrics()
+    app.add_middleware(
+        REDMiddleware, metrics=metrics, skip_paths={path or "/metrics", "/metrics"}
+    )
+
+    if path:
+        def prometheus_metrics():
+            body = metrics.render()
+            if extra is not None:
+                body += extra()
+            return Response(body, media_type=CONTENT_TYPE)
+
+        app.add_api_route(path, prometheus_metrics, methods=["GET"], include_in_schema=False)
+    return metrics
+
+
+def register_otel(meter, metrics: REDMetrics) -> None:
+    """
+    Export through an OpenTelemetry meter using observable instruments, so
+    the request path never calls into the OTel SDK; values are read from
+    the store at each collection.
+    """
+    from opentelemetry.metrics import Observation
+
+    def attrs(key: Key) -> Dict[str, Any]:
+        method, route, status = key
+        return {
+            "http.request.method": method,
+            "http.route": route,
+            "http.response.status_code": int(status),
+        }
+
+    def observe(read: Callable[[_Series], float]):
+        def callback(_options):
+            return [Observation(read(s), attrs(k)) for k, s in metrics.snapshot()]
+        return callback
+
+    p = metrics.prefix
+    meter.create_observable_counter(
+        f"{p}.server.requests", callbacks=[observe(lambda s: s.count)], unit="{request}"
+    )
+    meter.create_observable_counter(
+        f"{p}.server.duration_sum", callbacks=[observe(lambda s: s.duration_sum)], unit="s"
+    )
+    meter.create_observable_counter(
+        f"{p}.server.request.body.size_sum",
+        callbacks=[observe(lambda s: s.request_bytes)],
+        unit="By",
+    )
+    meter.create_observable_counter(
+        f"{p}.server.response.body.size_sum",
+        callbacks=[observe(lambda s: s.response_bytes)],
+        unit="By",
+    )
+    meter.create_observable_up_down_counter(
+        f"{p}.server.active_requests",
+        callbacks=[lambda _options: [Observation(metrics.in_flight)]],
+        unit="{request}",
+    )
+
+
+def benchmark(iterations: int = 200_000) -> Dict[str, float]:
+    """Per-request cost of the middleware around a no-op ASGI app."""
+    import asyncio
+
+    class Route:
+        path = "/items/{item_id}"
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def noop_send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    wrapped = REDMiddleware(endpoint, REDMetrics())
+
+    async def run(app) -> float:
+        start = time.perf_counter()
+        for i in range(iterations):
+            scope = {
+                "type": "http",
+                "path": f"/items/{i}",
+                "method": "GET",
+                "headers": [(b"content-length", b"0")],
+            }
+            await app(scope, receive, noop_send)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    bare_us = asyncio.run(run(endpoint))
+    red_us = asyncio.run(run(wrapped))
+    return {
+        "bare_us": round(bare_us, 3),
+        "with_red_us": round(red_us, 3),
+        "overhead_us": round(red_us - bare_us, 3),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    result = benchmark()
+    print(result)
+    # Budget: 10 us per request
+    sys.exit(0 if result["overhead_us"] < 10.0 else 1)
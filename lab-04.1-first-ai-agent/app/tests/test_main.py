@@ -24,3 +24,9 @@ def test_alerts_endpoint():
     assert "steps" in data
     assert "episodic_id" in data
     assert "memory_snapshot" in data
+
+
+def test_metrics_endpoint_reports_red_metrics():
+    client.get("/health")
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
@@ -7,8 +7,11 @@ from fastapi.responses import Response
 from src.chain import InvestigatorChain
 from src.db import get_db_session
 from src.models import AuditLog
+from src.red_metrics import install as install_red_metrics
 
 app = FastAPI(title="LangChain Investigator API")
+# Serves its own /metrics below, so only the middleware is installed
+red_metrics = install_red_metrics(app, path=None)
 
 # Prometheus metrics
 REQUEST_COUNT = Counter("request_count", "Total API requests")
@@ -27,7 +30,8 @@ def root():
 
 @app.get("/metrics")
 def metrics():
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    body = generate_latest() + red_metrics.render().encode()
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
 
 
 @app.post("/investigate")
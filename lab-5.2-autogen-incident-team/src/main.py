@@ -4,8 +4,10 @@ from typing import Optional, Dict, Any
 
 from src.workflow.coordination import run_incident_workflow
 from src.workflow.scenarios import get_scenario
+from src.utils.red_metrics import install as install_red_metrics
 
 app = FastAPI(title="AutoGen Incident Response Team", version="1.0.0")
+red_metrics = install_red_metrics(app)
 
 
 class IncidentRequest(BaseModel):
@@ -6,8 +6,10 @@ from src.websocket_handler import handle_ws_connection
 from src.registry import load_tool_registry
 from src.context_store import init_redis
 from src.audit.db import init_db
+from src.red_metrics import install as install_red_metrics
 
 app = FastAPI()
+red_metrics = install_red_metrics(app)
 
 CONFIG_PATH = os.getenv("APP_CONFIG_PATH", "/app/configs/app_config.yaml")
 